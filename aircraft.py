@@ -8,7 +8,6 @@ from surface import *
 
 from link import HoldLink
 from config import Config
-from utils import get_seconds_after
 import re
 
 AIRLINES_TO_CODE = {
@@ -90,12 +89,81 @@ class State(enum.Enum):
     atGate = 9
 
 
+class AircraftProfile:
+    """`AircraftProfile` holds the kinematic constants (speeds in feet per
+    second, distances in feet) shared by all the aircraft of a model. The
+    constants are read from `aircraft_model` in the configuration, and the
+    entry of the model under `aircraft_model.profiles` overrides them.
+    """
+
+    FIELDS = ("init_speed", "pushback_speed", "ramp_speed", "max_speed",
+              "ideal_speed", "ideal_acc", "ideal_distance", "min_distance")
+
+    __slots__ = ("model",) + FIELDS
+
+    # {(model, values of FIELDS): AircraftProfile}
+    __profiles = {}
+
+    def __init__(self, model, values):
+        self.model = model
+        for field, value in zip(self.FIELDS, values):
+            setattr(self, field, float(value))
+
+    @classmethod
+    def get(cls, model):
+        """Returns the profile of a model. The aircraft of the same model
+        share the same profile object as long as the configuration doesn't
+        change.
+        """
+        params = Config.params["aircraft_model"]
+        overrides = (params.get("profiles") or {}).get(model, {})
+        values = tuple(overrides.get(field, params[field])
+                       for field in cls.FIELDS)
+
+        key = (model, values)
+        if key not in cls.__profiles:
+            cls.__profiles[key] = AircraftProfile(model, values)
+        return cls.__profiles[key]
+
+    def __deepcopy__(self, memo):
+        # Profiles are never modified so copies of an aircraft share them
+        return self
+
+    def __repr__(self):
+        return "<AircraftProfile: %s>" % self.model
+
+
 class Aircraft:
-    """`Aircraft` represents an aircraft in the airport.
+    """`Aircraft` represents an aircraft in the airport. The kinematic
+    constants of the aircraft are kept in its `AircraftProfile`.
     """
     LOCATION_LEVEL_COARSE = 0
     LOCATION_LEVEL_PRECISE = 1
 
+    __slots__ = ("logger", "callsign", "model", "profile",
+                 "__coarse_location", "__precise_location", "itinerary",
+                 "is_departure", "speed", "fronter_info", "fronter_aircraft",
+                 "speed_uncertainty", "is_reroute_necessary", "take_off",
+                 "tick_count", "ramp_distance", "ramp_flag",
+                 "calculate_ramp_distance", "prev_tick_count", "status",
+                 "delayed", "estimated_time", "real_time", "appear_time",
+                 "sim_time", "__ahead_itinerary", "__ahead_state", "__ahead",
+                 "__state_itinerary", "__state_key", "__state",
+                 "__state_clears_ramp_flag")
+
+    # Attributes changed while the aircraft moves, under their mangled name,
+    # see `snapshot`
+    SNAPSHOT_ATTRS = tuple(
+        "_Aircraft" + attr if attr.startswith("__") else attr
+        for attr in __slots__
+        if attr not in ("logger", "callsign", "model", "profile",
+                        "is_departure"))
+
+    # Look-ahead queries answered from the cache (hits) or computed (misses)
+    # by all the aircraft, see `get_ahead_intersections_and_link`
+    ahead_cache_hits = 0
+    ahead_cache_misses = 0
+
     def __init__(self, fullname, model, location, is_departure):
 
         self.logger = logging.getLogger(__name__)
@@ -103,6 +171,9 @@ class Aircraft:
         self.callsign = self.fullname2callsign(fullname)
         self.model = model
 
+        # Kinematic constants shared by the aircraft of the same model
+        self.profile = AircraftProfile.get(model)
+
         # Aircraft's location as a vertex in on the node-link graph
         # If it's on the middle of a link, the coarse location will be the next node it will traverse.
         self.__coarse_location = location
@@ -111,15 +182,7 @@ class Aircraft:
 
         self.itinerary = None
         self.is_departure = is_departure
-        self.speed = self.speed_knots_to_ft_per_sec(Config.params["aircraft_model"]["init_speed"])
-        self.pushback_speed = self.speed_knots_to_ft_per_sec(Config.params["aircraft_model"]["pushback_speed"])
-        self.ramp_speed = self.speed_knots_to_ft_per_sec(Config.params["aircraft_model"]["ramp_speed"])
-        # self.queue_speed = self.speed_knots_to_ft_per_sec(Config.params["aircraft_model"]["queue_speed"])
-        self.IDEAL_DISTANCE = Config.params["aircraft_model"]["ideal_distance"]
-        self.MIN_DISTANCE = Config.params["aircraft_model"]["min_distance"]
-        self.MAX_SPEED = self.speed_knots_to_ft_per_sec(Config.params["aircraft_model"]["max_speed"])
-        self.IDEAL_SPEED = self.speed_knots_to_ft_per_sec(Config.params["aircraft_model"]["ideal_speed"])
-        self.IDEAL_ACC = Config.params["aircraft_model"]["ideal_acc"]
+        self.speed = self.profile.init_speed
         self.fronter_info = None
         self.fronter_aircraft = None
         self.speed_uncertainty = 0
@@ -134,11 +197,51 @@ class Aircraft:
         self.status = None
         self.delayed = False
 
-        self.estimated_time = ""
-        self.real_time = ""
-        self.appear_time = ""
+        # Times in seconds since the start of the simulated day
+        self.estimated_time = None
+        self.real_time = None
+        self.appear_time = None
         self.sim_time = 0
 
+        # State of the itinerary at the position it was computed, see `state`
+        self.__state_itinerary = None
+        self.__state_key = None
+        self.__state = State.stop
+        self.__state_clears_ramp_flag = False
+
+        # Look-ahead of the itinerary at the state it was computed
+        self.__ahead_itinerary = None
+        self.__ahead_state = None
+        self.__ahead = None
+
+    @property
+    def pushback_speed(self):
+        return self.profile.pushback_speed
+
+    @property
+    def ramp_speed(self):
+        return self.profile.ramp_speed
+
+    @property
+    def IDEAL_DISTANCE(self):
+        return self.profile.ideal_distance
+
+    @property
+    def MIN_DISTANCE(self):
+        return self.profile.min_distance
+
+    @property
+    def MAX_SPEED(self):
+        return self.profile.max_speed
+
+    @property
+    def IDEAL_SPEED(self):
+        return self.profile.ideal_speed
+
+    @property
+    def IDEAL_ACC(self):
+        return self.profile.ideal_acc
+
     @staticmethod
     def fullname2callsign(fullname):
         flight_number = re.search('[0-9]+', fullname).group()
@@ -223,20 +326,21 @@ class Aircraft:
         # print ("{0}: {1}".format(self.callsign, self.state))
         # if self.is_delayed:
         #     return 0
+        profile = self.profile
         if fronter_info is None:
             acceleration = 0.0
             if state is State.pushback:
-                new_speed = self.pushback_speed
+                new_speed = profile.pushback_speed
             elif state is State.ramp:
-                new_speed = self.ramp_speed
+                new_speed = profile.ramp_speed
             else:
-                new_speed = self.IDEAL_SPEED
+                new_speed = profile.ideal_speed
             if self.speed < new_speed:
                 # acceleration phase
-                acceleration = self.IDEAL_ACC
+                acceleration = profile.ideal_acc
             elif self.speed > new_speed:
                 # deceleration phase
-                acceleration = -self.IDEAL_ACC
+                acceleration = -profile.ideal_acc
 
             if acceleration > 0:
                 new_speed = min(self.speed + acceleration, new_speed)
@@ -244,8 +348,8 @@ class Aircraft:
                 new_speed = max(self.speed + acceleration, new_speed)
             if new_speed < 0:
                 new_speed = 0
-            if new_speed > self.MAX_SPEED:
-                new_speed = self.MAX_SPEED
+            if new_speed > profile.max_speed:
+                new_speed = profile.max_speed
             return new_speed            
 
         # calculate the new speed when it is following another aircraft
@@ -257,7 +361,7 @@ class Aircraft:
             return self.brake_hard()
 
         # Brake hard if less than MIN_DISTANCE
-        if relative_distance <= self.MIN_DISTANCE:
+        if relative_distance <= profile.min_distance:
             return 0
             return self.brake_hard()
 
@@ -265,11 +369,11 @@ class Aircraft:
         """ Calculate the speed based on following model."""
 
         # Adjust the speed
-        if relative_distance > self.IDEAL_DISTANCE:
+        if relative_distance > profile.ideal_distance:
             # acceleration phase
             c, l, m = 1.1, 0.1, 0.2
             acc_flag = True
-        elif relative_distance < self.IDEAL_DISTANCE or fronter_speed < self.speed:
+        elif relative_distance < profile.ideal_distance or fronter_speed < self.speed:
             # deceleration phase
             c, l, m = -2, 1.2, 0.7
         else:
@@ -282,8 +386,8 @@ class Aircraft:
         new_speed = self.speed + acceleration
         if new_speed < 0:
             new_speed = 0
-        if new_speed > self.MAX_SPEED:
-            new_speed = self.MAX_SPEED
+        if new_speed > profile.max_speed:
+            new_speed = profile.max_speed
         return new_speed
 
 
@@ -293,8 +397,8 @@ class Aircraft:
         if speed < 0:
             self.speed = 0
             return
-        if speed > self.MAX_SPEED:
-            self.speed = self.MAX_SPEED
+        if speed > self.profile.max_speed:
+            self.speed = self.profile.max_speed
             return
 
         self.speed = speed
@@ -321,6 +425,7 @@ class Aircraft:
     def set_itinerary(self, itinerary):
         """Sets the itinerary of this aircraft."""
         self.itinerary = itinerary
+        self.__ahead_itinerary = None
         # self.logger.debug("%s: Roger, %s received.", self, itinerary)
 
         # for target in itinerary.targets:
@@ -341,19 +446,30 @@ class Aircraft:
         #                   self, delay_added_at)
 
     def tick(self):
-        if self.real_time != "":
+        """Ticks on this aircraft and its subobjects to move to the next state.
+        """
+        passed_links = self.move()
+        if self.itinerary:
+            new_speed = self.get_next_speed(self.fronter_info, self.state) + self.speed_uncertainty
+            self.set_speed(new_speed)
+
+        self.logger.info("%s at %s", self, self.__coarse_location)
+        return passed_links
+
+    def move(self):
+        """Moves this aircraft along its itinerary by the distance of this tick
+        without updating its speed, see `tick`. Returns the links passed.
+        """
+        if self.real_time is not None:
             # print(self.estimated_time < self.real_time)
             if (self.estimated_time < self.real_time):
                 self.delayed = True
-        """Ticks on this aircraft and its subobjects to move to the next state.
-        """
         passed_links = None
         if self.itinerary:
+            self.__ahead_itinerary = None
             self.tick_count += 1
             print("AIR %s: aircraft tick.", self)
             passed_links = self.itinerary.tick(self.tick_distance)
-            new_speed = self.get_next_speed(self.fronter_info, self.state) + self.speed_uncertainty
-            self.set_speed(new_speed)
             if self.itinerary.is_completed:
                 self.logger.debug("%s: %s completed.", self, self.itinerary)
             last_target = self.itinerary.backup[-1]
@@ -369,69 +485,64 @@ class Aircraft:
             print("AIR %s: No itinerary request.", self)
             pass
 
-        self.logger.info("%s at %s", self, self.__coarse_location)
         return passed_links
 
     def count_intersection(self):
-        count = 0
-        targetIdx = self.itinerary.current_target_index
-        targetLen = len(self.itinerary.targets)
-        # print(targetIdx, targetLen)
-        for link in self.itinerary.targets[targetIdx: targetLen]:
-            # print(link)
-            node = link.end
-            # for node in self.itinerary.current_target.nodes:
-                
-            if node.name.startswith('I'):
-                # print(node)
-                count += 1
-        # print("count:", count)
-        return count
+        """Returns the number of intersections ahead on the itinerary."""
+        return self.itinerary.n_intersections_ahead
 
     @property
     def state(self):
-        """Identify whether the aircraft is on pushbackway or taxiway"""
+        """Identify whether the aircraft is on pushbackway or taxiway
+
+        The state only changes when the aircraft moves onto another link, its
+        itinerary changes or its ramp flag is cleared, so it's computed once
+        for each of them.
+        """
         if self.is_delayed is True:
             self.delayed = True
+
+        itinerary = self.itinerary
+        key = None if itinerary is None else \
+            (itinerary.index, itinerary.length, self.ramp_flag)
+        if self.__state_itinerary is not itinerary or \
+                self.__state_key != key:
+            self.__state, self.__state_clears_ramp_flag = self.__get_state()
+            self.__state_itinerary, self.__state_key = itinerary, key
+
+        if self.__state_clears_ramp_flag:
+            self.ramp_flag = 0
+        if self.__state is State.atGate or self.__state is State.pushback:
+            if self.real_time is None:
+                self.real_time = self.appear_time + self.sim_time * self.tick_count
+        return self.__state
+
+    def __get_state(self):
+        # Returns the state and whether the ramp flag has to be cleared
         if self.itinerary is None or self.itinerary.is_completed:
-            # self.status = State.stop
-            return State.stop
+            return State.stop, False
         if self.itinerary.next_target is None or \
                 self.itinerary.current_target is None:
-            # self.status = State.stop
-            return State.stop
+            return State.stop, False
         if self.is_departure is True: 
             if type(self.itinerary.current_target.start) is Gate:
                 #  do not update state if holdlink is added at gate
-                if self.real_time == "":
-                    self.real_time = get_seconds_after(self.appear_time, self.sim_time * self.tick_count)
-                return State.atGate
+                return State.atGate, False
             elif type(self.itinerary.current_target) is PushbackWay:
-                if self.real_time == "":
-                    self.real_time = get_seconds_after(self.appear_time, self.sim_time * self.tick_count)
-                return State.pushback
+                return State.pushback, False
             elif type(self.itinerary.current_target) is Taxiway:
                 if len(self.itinerary.current_target.nodes) > 0 and self.itinerary.current_target.nodes[0].name.startswith('I'):
-                    self.ramp_flag = 0
-                    # self.status = State.moving
-                    return State.taxi
+                    return State.taxi, True
                 if self.ramp_flag:
-                    # self.status = State.ramp
-                    return State.ramp
-            return State.taxi
+                    return State.ramp, False
+            return State.taxi, False
         elif self.is_departure is False: 
             if len(self.itinerary.current_target.nodes) > 0 and self.count_intersection() == 0: # and self.itinerary.current_target.nodes[0].name.startswith('I'):
-                # self.status = State.ramp
-                self.ramp_flag = 0
-                # self.status = State.ramp
-                return State.ramp
+                return State.ramp, True
             if not self.ramp_flag:
-                # self.status = State.ramp
-                return State.ramp
-            return State.taxi
-        # self.status = State.moving
-        return State.moving
-
+                return State.ramp, False
+            return State.taxi, False
+        return State.moving, False
 
     @property
     def is_delayed(self):
@@ -457,9 +568,33 @@ class Aircraft:
         return self.itinerary.current_target
     
     def get_ahead_intersections_and_link(self):
-        """get the intersections and future links with certain distance"""
+        """get the intersections and future links with certain distance
+
+        The controllers ask for the look-ahead several times per tick, so the
+        result is kept until the aircraft moves or its itinerary changes
+        (replaced, or delayed which makes it longer).
+        """
+        itinerary = self.itinerary
+        state = (itinerary.index, itinerary.distance, itinerary.length)
+        if self.__ahead_itinerary is itinerary and \
+                self.__ahead_state == state:
+            Aircraft.ahead_cache_hits += 1
+            return self.__ahead
+
+        Aircraft.ahead_cache_misses += 1
         ahead_distance = 800.0
-        return self.itinerary.get_ahead_intersections_and_link(ahead_distance)
+        self.__ahead = itinerary.get_ahead_intersections_and_link(
+            ahead_distance)
+        self.__ahead_itinerary, self.__ahead_state = itinerary, state
+        return self.__ahead
+
+    @classmethod
+    def get_ahead_cache_hit_rate(cls):
+        """Returns the ratio of the look-ahead queries answered from the
+        cache, or None if there was no query.
+        """
+        total = cls.ahead_cache_hits + cls.ahead_cache_misses
+        return cls.ahead_cache_hits / total if total else None
 
     def set_quiet(self, logger):
         """Sets the aircraft into quiet mode where less logs are printed."""
@@ -486,10 +621,34 @@ class Aircraft:
             fronter_callsign = self.fronter_aircraft.callsign
         return "<Aircraft: %s %s %.2f fronter: %s fronter_speed: %d relative_dist: %d>" % (self.callsign, self.state, self.speed, fronter_callsign, fronter_speed, relative_dist)
 
+    def snapshot(self):
+        """Returns the mutable state of this aircraft, including the position
+        of its itinerary, to be restored by `restore`.
+        """
+        itinerary = self.itinerary
+        return (tuple(getattr(self, attr) for attr in Aircraft.SNAPSHOT_ATTRS),
+                itinerary.snapshot() if itinerary else None)
+
+    def restore(self, snapshot):
+        """Sets the state of this aircraft back to a snapshot."""
+        values, itinerary_snapshot = snapshot
+        for attr, value in zip(Aircraft.SNAPSHOT_ATTRS, values):
+            setattr(self, attr, value)
+        if itinerary_snapshot is not None:
+            self.itinerary.restore(itinerary_snapshot)
+
     def __getstate__(self):
-        attrs = dict(self.__dict__)
-        del attrs["logger"]
+        attrs = {}
+        for attr in self.__slots__:
+            if attr == "logger":
+                continue
+            # Private attributes are stored under their mangled name
+            if attr.startswith("__"):
+                attr = "_Aircraft" + attr
+            if hasattr(self, attr):
+                attrs[attr] = getattr(self, attr)
         return attrs
 
     def __setstate__(self, attrs):
-        self.__dict__.update(attrs)
+        for attr, value in attrs.items():
+            setattr(self, attr, value)
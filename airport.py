@@ -1,7 +1,6 @@
 """`Airport` represents both the static and dynamic surface states of an
 airport.
 """
-import itertools
 import logging
 import os
 from collections import deque
@@ -10,10 +9,12 @@ from aircraft import Aircraft
 from config import Config
 from conflict import Conflict
 from controller import Controller
+from link_occupancy import LinkOccupancy
+from kinematics import Kinematics
 from surface import SurfaceFactory
+from spatial_index import SpatialIndex
 from link import HoldLink
-from utils import get_seconds_after
-from flight import ArrivalFlight, Flight
+from flight import ArrivalFlight
 from ramp_controller import RampController
 from intersection_controller import IntersectionController
 from terminal_controller import TerminalController
@@ -31,6 +32,13 @@ class Airport:
 
         # Runtime data
         self.aircrafts = []
+        self.aircraft_set = set()
+        # Aircraft on each link, sorted by their distance on it
+        self.occupancy = LinkOccupancy()
+
+        # Conflicts of the current state shared by all the observers of a tick
+        # as (aircrafts, conflicts), see `conflicts`
+        self.__conflicts_snapshot = None
 
         # Queues for departure flights at gates
         self.gate_queue = {}
@@ -45,6 +53,12 @@ class Airport:
         # Itinerary cache object for future flights
         self.itinerary_cache = {}
 
+        # Aircraft changed since the last schedule (dicts as ordered sets):
+        # the new ones without an itinerary and the ones which completed
+        # their itinerary
+        self.new_aircrafts = {}
+        self.completed_aircrafts = {}
+
         # Static data
         self.name = name
         self.surface = surface
@@ -62,23 +76,36 @@ class Airport:
 
         self.max_airpcrafts_running = Config.params["scheduler"]["max_airpcrafts_running"]
 
-    def apply_schedule(self, schedule):
-        """Applies a schedule onto the active aircraft in the airport."""
-        all_itineraries = {**self.itinerary_cache, **schedule.itineraries}
-
-        # Clean up the cache (previous states)
-        self.itinerary_cache = {}
+        # Updates the speeds of all the aircraft at once with NumPy
+        self.vectorized_kinematics = \
+            Config.params["simulation"]["kinematics"] == "vectorized"
 
+    def apply_schedule(self, schedule):
+        """Applies a schedule onto the active aircraft in the airport. The
+        cached itineraries are applied when their aircraft are added, so only
+        the itineraries of the schedule are looked at.
+        """
         # Apply the itinerary onto the aircraft one by one
-        for aircraft, itinerary in all_itineraries.items():
-            if aircraft in self.aircrafts:
+        for aircraft, itinerary in schedule.itineraries.items():
+            if aircraft in self.aircraft_set:
                 aircraft.set_itinerary(itinerary)
+                self.new_aircrafts.pop(aircraft, None)
             else:
                 # If the aircraft is not found, we cache the itinerary for it
                 self.logger.debug("%s hasn't found yet, we will cache its "
                                   "itinerary", aircraft)
                 self.itinerary_cache[aircraft] = itinerary
 
+        # The scheduler has seen the completed ones
+        self.completed_aircrafts.clear()
+
+    @property
+    def aircrafts_to_schedule(self):
+        """Returns the aircraft which need an itinerary, in the order they
+        were added.
+        """
+        return list(self.new_aircrafts)
+
     def apply_priority(self, priority):
         self.priority = priority
 
@@ -95,12 +122,16 @@ class Airport:
         we have a cached itinerary for it.
         """
         self.aircrafts.append(aircraft)
+        self.aircraft_set.add(aircraft)
+        self.__conflicts_snapshot = None
 
         if aircraft in self.itinerary_cache:
-            itinerary = self.itinerary_cache[aircraft]
+            itinerary = self.itinerary_cache.pop(aircraft)
             aircraft.set_itinerary(itinerary)
             self.logger.debug("Applied %s on %s from itinerary cache",
                               itinerary, aircraft)
+        elif aircraft.itinerary is None:
+            self.new_aircrafts[aircraft] = None
 
     def __add_aircrafts_from_queue(self):
         # limit the maximum number of airplanes that running in the airport at the same time
@@ -140,11 +171,9 @@ class Airport:
     def __add_aircrafts_from_scenario(self, scenario, now, sim_time, scheduler):
 
         # NOTE: we will only focus on departures now
-        next_tick_time = get_seconds_after(now, sim_time)
         # Only if the scheduled appear time is between now and next tick
-        current_tick_flight = scenario.departures.irange(Flight(None, now), Flight(None, next_tick_time), (True, False))
         # For all departure flights
-        for flight in list(current_tick_flight):
+        for flight in scenario.get_departures_at(now):
             gate, aircraft = flight.from_gate, flight.aircraft
             spot = gate.get_spots()
 
@@ -153,6 +182,12 @@ class Airport:
                 runway = self.surface.get_link(runway_name)
                 flight.set_runway(runway)
 
+            # Sets up the aircraft before it's added; it may get a cached
+            # itinerary when added
+            aircraft.set_estimated(flight.departure_time)
+            aircraft.set_appear_time(flight.appear_time)
+            aircraft.set_sim_time(sim_time)
+
             if self.is_occupied_at(gate) or self.num_aircrafts_running >= self.max_airpcrafts_running or not self.terminal_controller.get_departure_access(gate.name):
                 # Adds the flight to queue
                 queue = self.gate_queue.get(gate, deque())
@@ -176,14 +211,9 @@ class Airport:
                 self.logger.info("Adds %s into the airport, runway %s",
                                  flight,flight.runway)
 
-            aircraft.set_estimated(flight.departure_time)
-            aircraft.set_appear_time(flight.appear_time)
-            aircraft.set_sim_time(sim_time)
-
         # # Deal with the arrival flights, assume that the runway is always not
         # # occupied because this is an arrival flight
-        current_tick_flight = scenario.arrivals.irange(Flight(None, now), Flight(None, next_tick_time), (True, False))
-        for flight in list(current_tick_flight):
+        for flight in scenario.get_arrivals_at(now):
             gate, aircraft = flight.to_gate, flight.aircraft
             self.terminal_controller.add_arrival_gate(aircraft, gate.name)
             spot = gate.get_spots()
@@ -229,6 +259,7 @@ class Airport:
     def remove_aircrafts(self, scenario):
         """Removes departure aircraft if they've moved to the runway.
         """
+        self.__conflicts_snapshot = None
         to_remove_aircraft_departure = []
         to_remove_aircraft_arrival = []
 
@@ -249,16 +280,27 @@ class Airport:
             self.__add_aircraft_to_departure_queue(aircraft, scenario)
             self.departure_info.append(aircraft)
             self.aircrafts.remove(aircraft)
+            self.__discard_aircraft(aircraft)
             self.intersection_control.remove_aircraft(aircraft)
+            self.occupancy.remove(aircraft)
             self.terminal_controller.remove_departure(aircraft)
+            # The departure queue keeps the aircraft until it takes off
+            scenario.get_flight(aircraft).release_aircraft()
 
         for aircraft in to_remove_aircraft_arrival:
             self.logger.info("Removes arrive %s from the airport", aircraft)
             print("Removes arrive %s from the airport", aircraft)
             # self.intersection_control.unblock_intersections_lock_by_aircraft(aircraft)
             self.aircrafts.remove(aircraft)
+            self.__discard_aircraft(aircraft)
             self.intersection_control.remove_aircraft(aircraft)
+            self.occupancy.remove(aircraft)
             self.terminal_controller.remove_arrival(aircraft)
+            scenario.get_flight(aircraft).release_aircraft()
+
+    def __discard_aircraft(self, aircraft):
+        self.aircraft_set.discard(aircraft)
+        self.new_aircrafts.pop(aircraft, None)
 
     def remove_departure_aircrafts(self, aircrafts):
         for aircraft in aircrafts:
@@ -267,8 +309,15 @@ class Airport:
     @property
     def conflicts(self):
         """Retrieve a list of conflicts observed in the current airport state.
+        The conflicts are computed once and kept until the airport changes
+        (tick, aircraft added or removed), so all the observers of a tick
+        share the same result.
         """
-        return self.__get_conflicts()
+        if self.__conflicts_snapshot is None or \
+                self.__conflicts_snapshot[0] != self.aircrafts:
+            self.__conflicts_snapshot = (list(self.aircrafts),
+                                         self.__get_conflicts())
+        return self.__conflicts_snapshot[1]
 
     @property
     def next_conflicts(self):
@@ -280,41 +329,58 @@ class Airport:
 
     def __get_conflicts(self, is_next=False):
         # Remove departed aircraft or
-        __conflicts = []
-        __conflicts_dist = []
-        aircraft_pairs = list(itertools.combinations(self.aircrafts, 2))
-        for pair in aircraft_pairs:
-            if pair[0] == pair[1]:
-                continue
-
-            if is_next:
-                loc1, loc2 = pair[0].get_next_location(Aircraft.LOCATION_LEVEL_PRECISE), \
-                             pair[1].get_next_location(Aircraft.LOCATION_LEVEL_PRECISE)
-            else:
-                loc1, loc2 = pair[0].precise_location, pair[1].precise_location
-            if not loc1 or not loc2 or not loc1.is_close_to(loc2):
-                continue
-            dist = loc1.get_distance_to(loc2)
-
-            __conflicts.append(Conflict((loc1, loc2), pair))
-            __conflicts_dist.append(dist)
-        return __conflicts, __conflicts_dist
+        if is_next:
+            locations = self.__get_next_locations()
+        else:
+            locations = [aircraft.precise_location
+                         for aircraft in self.aircrafts]
+        threshold = Config.params["simulation"]["close_node_threshold"]
+        return self.__find_conflicts(locations, threshold)
 
     def __get_next_conflict(self):
+        threshold = Config.params["scheduler"]["conflict_threshold"]
+        __conflicts, _ = self.__find_conflicts(self.__get_next_locations(),
+                                               threshold)
+        return __conflicts
+
+    def __get_next_locations(self):
+        # No aircraft is asked for its next location if there's nothing to
+        # compare with
+        if len(self.aircrafts) < 2:
+            return []
+        return [aircraft.get_next_location(Aircraft.LOCATION_LEVEL_PRECISE)
+                for aircraft in self.aircrafts]
+
+    def __find_conflicts(self, locations, threshold):
+        """Finds the pairs of aircraft whose locations are within `threshold`
+        feet. Locations are bucketed into a grid so only the aircraft in the
+        neighbouring cells are compared. The conflicts are returned in the same
+        order as comparing every pair of aircraft.
+        """
         __conflicts = []
         __conflicts_dist = []
-        aircraft_pairs = list(itertools.combinations(self.aircrafts, 2))
-        for pair in aircraft_pairs:
-            if pair[0] == pair[1]:
-                continue
-            loc1, loc2 = pair[0].get_next_location(Aircraft.LOCATION_LEVEL_PRECISE), \
-                         pair[1].get_next_location(Aircraft.LOCATION_LEVEL_PRECISE)
-            if not loc1 or not loc2 or not loc1.is_close_to_plan(loc2):
+
+        index = SpatialIndex(threshold)
+        for i, location in enumerate(locations):
+            if location:
+                index.add(location, i)
+
+        for i, loc1 in enumerate(locations):
+            if not loc1:
                 continue
-            dist = loc1.get_distance_to(loc2)
-            __conflicts.append(Conflict((loc1, loc2), pair))
-            __conflicts_dist.append(dist)
-        return __conflicts
+            for j in index.query(loc1, threshold):
+                if j <= i:
+                    continue
+                pair = (self.aircrafts[i], self.aircrafts[j])
+                if pair[0] == pair[1]:
+                    continue
+                loc2 = locations[j]
+                if not loc1.is_within(loc2, threshold):
+                    continue
+                dist = loc1.get_distance_to(loc2)
+                __conflicts.append(Conflict((loc1, loc2), pair))
+                __conflicts_dist.append(dist)
+        return __conflicts, __conflicts_dist
 
     def is_occupied_at(self, node):
         """Check if an aircraft is occupied at the given node."""
@@ -341,7 +407,50 @@ class Airport:
                 continue
         return aircrafts
 
+    def get_next_event_time(self, scenario, now, sim_time):
+        """Gets the time of the next tick where something may happen on the
+        airport: `now` if any aircraft is on the surface or waiting at a gate
+        or a spot, otherwise the earlier of the next flight appearance and the
+        next take-off from the departure queues. Returns None if nothing is
+        going to happen anymore.
+
+        Gates are only freed by the aircraft moving away from them, so there's
+        nothing to wait for at the gates of an empty airport.
+        """
+        if self.aircrafts:
+            return now
+        for queues in [self.gate_queue, self.runway_gate_queue,
+                       self.ramp_control.spot_queue]:
+            if any(queues.values()):
+                return now
+
+        event_times = []
+
+        appear_time = scenario.get_next_appear_time(now)
+        if appear_time is not None:
+            event_times.append(appear_time)
+
+        # The n-th slot of a departure queue is released in the n-th tick
+        for runway_queue in self.departure_queue.values():
+            for n_ticks, aircraft in enumerate(runway_queue):
+                if aircraft is not None:
+                    event_times.append(now + n_ticks * sim_time)
+                    break
+
+        return min(event_times) if event_times else None
+
+    def skip_ticks(self, n_ticks):
+        """Moves the airport `n_ticks` idle ticks forward by releasing the
+        empty slots of the departure queues.
+        """
+        for runway_queue in self.departure_queue.values():
+            for _ in range(min(n_ticks, len(runway_queue))):
+                runway_queue.popleft()
+
     def tick(self, predict=False):
+        # Aircraft are moving so the conflicts have to be found again
+        self.__conflicts_snapshot = None
+
         # Ground Controller should observe all the activities on the ground.
         if predict is False:
             self.controller.tick()
@@ -368,9 +477,17 @@ class Airport:
             if not terminal_spot_access[aircraft]:
                 continue
             if self.intersection_control.is_lock_by(aircraft) is True:
-                passed_links = aircraft.tick()
+                if self.vectorized_kinematics:
+                    # Speeds are updated all at once below
+                    passed_links = aircraft.move()
+                else:
+                    passed_links = aircraft.tick()
                 # passed.append(passed_links)
                 passed[aircraft] = passed_links
+
+        if self.vectorized_kinematics:
+            Kinematics([aircraft for aircraft in passed
+                        if aircraft.itinerary]).update()
         
         # for passed_links in passed:
         #     passed_intersections = []
@@ -380,6 +497,8 @@ class Airport:
         #         passed_intersections.append(link.end)
         #     self.intersection_control.unlock_intersections(passed_intersections)
         for aircraft, passed_links in passed.items():
+            if passed_links and aircraft.itinerary.is_completed:
+                self.completed_aircrafts[aircraft] = None
             passed_intersections = []
             for link in passed_links:
                 if type(link) is HoldLink:
@@ -395,6 +514,83 @@ class Airport:
         #         print("delay aircraft!")
         # self.intersection_control.reset_all_intersections()
 
+    def snapshot(self):
+        """Returns the mutable state of this airport: the aircraft (and the
+        position of their itineraries), the queues and the states of the
+        controllers, to be restored by `restore`. The surface is never
+        changed so it isn't part of the snapshot.
+        """
+        aircraft_states = {}
+        for aircraft in self.all_aircrafts:
+            aircraft_states[id(aircraft)] = (aircraft, aircraft.snapshot())
+
+        return {
+            "aircrafts": list(self.aircrafts),
+            "gate_queue": self.__snapshot_queues(self.gate_queue),
+            "runway_gate_queue": self.__snapshot_queues(
+                self.runway_gate_queue),
+            "departure_queue": self.__snapshot_queues(self.departure_queue),
+            "departure_info": list(self.departure_info),
+            "itinerary_cache": dict(self.itinerary_cache),
+            "new_aircrafts": dict(self.new_aircrafts),
+            "completed_aircrafts": dict(self.completed_aircrafts),
+            "takeoff_count": self.takeoff_count,
+            "takeoff_ticks_count": self.takeoff_ticks_count,
+            "priority": self.priority,
+            "aircraft_states": list(aircraft_states.values()),
+            "intersection_control": self.intersection_control.snapshot(),
+            "terminal_controller": self.terminal_controller.snapshot(),
+            "ramp_control": self.ramp_control.snapshot()
+        }
+
+    def restore(self, snapshot):
+        """Sets the state of this airport back to a snapshot."""
+        self.aircrafts = list(snapshot["aircrafts"])
+        self.aircraft_set = set(self.aircrafts)
+        self.gate_queue = self.__restore_queues(snapshot["gate_queue"])
+        self.runway_gate_queue = self.__restore_queues(
+            snapshot["runway_gate_queue"])
+        self.departure_queue = self.__restore_queues(
+            snapshot["departure_queue"])
+        self.departure_info = list(snapshot["departure_info"])
+        self.itinerary_cache = dict(snapshot["itinerary_cache"])
+        self.new_aircrafts = dict(snapshot["new_aircrafts"])
+        self.completed_aircrafts = dict(snapshot["completed_aircrafts"])
+        self.takeoff_count = snapshot["takeoff_count"]
+        self.takeoff_ticks_count = snapshot["takeoff_ticks_count"]
+        self.priority = snapshot["priority"]
+        for aircraft, aircraft_snapshot in snapshot["aircraft_states"]:
+            aircraft.restore(aircraft_snapshot)
+        self.intersection_control.restore(snapshot["intersection_control"])
+        self.terminal_controller.restore(snapshot["terminal_controller"])
+        self.ramp_control.restore(snapshot["ramp_control"])
+
+        self.__conflicts_snapshot = None
+        # Rebuilt by the ground controller on its next observation
+        self.occupancy = LinkOccupancy()
+
+    @property
+    def all_aircrafts(self):
+        """Returns an iterator of the aircraft on the surface and in the
+        queues.
+        """
+        yield from self.aircrafts
+        yield from self.departure_info
+        for queues in [self.gate_queue, self.runway_gate_queue,
+                       self.departure_queue, self.ramp_control.spot_queue]:
+            for queue in queues.values():
+                for aircraft in queue:
+                    if aircraft is not None:
+                        yield aircraft
+
+    @classmethod
+    def __snapshot_queues(cls, queues):
+        return {key: tuple(queue) for key, queue in queues.items()}
+
+    @classmethod
+    def __restore_queues(cls, queues):
+        return {key: deque(queue) for key, queue in queues.items()}
+
     def print_stats(self):
         """Prints a summary of the current airport state.
         """
@@ -408,17 +604,16 @@ class Airport:
     def __setstate__(self, attrs):
         self.__dict__.update(attrs)
 
-    def set_quiet(self, logger):
+    def set_quiet(self, logger, surface=True):
         """Puts the aircraft object to quiet mode where only important logs are
-        printed.
+        printed. The surface is left as it is if `surface` is false (e.g. it's
+        shared with another airport).
         """
         self.logger = logger
-        self.surface.set_quiet(logger)
-        for aircraft in self.aircrafts:
+        if surface:
+            self.surface.set_quiet(logger)
+        for aircraft in self.all_aircrafts:
             aircraft.set_quiet(logger)
-        for queue in self.gate_queue.values():
-            for airport in queue:
-                airport.set_quiet(logger)
 
     @classmethod
     def create(cls, name):
@@ -11,7 +11,7 @@ matplotlib.use('Agg')
 import matplotlib.pyplot as plt
 import pandas as pd
 
-from utils import get_time_delta, get_output_dir_name
+from utils import seconds2str, get_output_dir_name
 from config import Config
 from flight import ArrivalFlight
 
@@ -74,13 +74,13 @@ class MakespanMetric():
 
     @property
     def __is_ready(self):
-        return self.aircraft_first_time and self.aircraft_last_time
+        return self.aircraft_first_time is not None and \
+            self.aircraft_last_time is not None
 
     @property
     def makespan(self):
         """Returns the makespan value."""
-        return (get_time_delta(self.aircraft_last_time,
-                               self.aircraft_first_time)
+        return (self.aircraft_last_time - self.aircraft_first_time
                 if self.__is_ready else 0)
 
     @property
@@ -296,14 +296,16 @@ class Analyst:
     def observe_on_tick(self, simulation):
         """Observe the simulation state on tick."""
 
-        now = simulation.now
+        # Metrics are indexed by the time string, the makespan is counted in
+        # seconds
+        now = seconds2str(simulation.now)
         airport = simulation.airport
         aircrafts = airport.aircrafts
         scenario = simulation.scenario
-        conflicts = simulation.airport.conflicts
+        conflicts, _ = simulation.airport.conflicts
 
         self.taxitime_metric.update_on_tick(aircrafts, scenario)
-        self.makespan_metric.update_on_tick(aircrafts, now)
+        self.makespan_metric.update_on_tick(aircrafts, simulation.now)
         self.aircraft_count_metric.update_on_tick(aircrafts, now)
         self.conflict_metric.update_on_tick(conflicts, now)
         self.gate_queue_metric.update_on_tick(airport, now)
@@ -312,7 +314,7 @@ class Analyst:
     def observe_on_reschedule(self, simulation):
         """Observe the simulation state on reschedule."""
 
-        now = simulation.now
+        now = seconds2str(simulation.now)
         self.execution_time_metric.update_on_reschedule(
             simulation.last_schedule_exec_time, now)
 
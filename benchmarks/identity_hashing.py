@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""Measures the cost of creating the objects which used to compute a SHA-1
+hash value in their constructor, against the cost of that hash value alone.
+
+Example:
+
+    Run from the root folder of the project:
+
+        $ python benchmarks/identity_hashing.py
+
+"""
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from node import Node, get_middle_node
+from link import Link
+from itinerary import Itinerary
+from conflict import Conflict
+from utils import str2sha1
+
+REPEAT = 5
+NUMBER = 2000
+
+
+class FakeAircraft:
+    """Stands for an aircraft since a conflict only reads its callsign."""
+
+    def __init__(self, callsign):
+        self.callsign = callsign
+
+
+def legacy_node_hash(name, geo_pos):
+    return str2sha1("%s#%.5f#%.5f" % (name, geo_pos["lat"], geo_pos["lng"]))
+
+
+def legacy_link_hash(link):
+    return str2sha1("%s#%s" % (link.name, link.nodes))
+
+
+def legacy_itinerary_hash(targets):
+    return str2sha1("#".join(str(targets)))
+
+
+def legacy_conflict_hash(locations, aircrafts):
+    callsigns = sorted(aircraft.callsign for aircraft in aircrafts)
+    return str2sha1("%s#%s" % ("#".join(callsigns),
+                               "#".join(str(locations))))
+
+
+def measure(statement):
+    """Returns the best time of a statement in microseconds."""
+    best = min(timeit.repeat(statement, repeat=REPEAT, number=NUMBER))
+    return best / NUMBER * 1e6
+
+
+def main():
+    """Prints the construction cost of each object and the cost of the SHA-1
+    hash value it used to compute.
+    """
+
+    geo_pos = {"lat": 37.615223, "lng": -122.389977}
+    nodes = [Node("N%d" % i, {"lat": 37.615223 + i * 1e-4,
+                              "lng": -122.389977})
+             for i in range(10)]
+    links = [Link("L%d" % i, nodes[i:i + 2]) for i in range(9)]
+    link = Link("L", nodes)
+    locations = (get_middle_node(nodes[0], nodes[1], 0.3),
+                 get_middle_node(nodes[0], nodes[1], 0.6))
+    aircrafts = (FakeAircraft("UA123"), FakeAircraft("AA456"))
+
+    cases = [
+        ("Node", lambda: Node("N", geo_pos),
+         lambda: legacy_node_hash("N", geo_pos)),
+        ("Link.reverse", lambda: link.reverse,
+         lambda: legacy_link_hash(link)),
+        ("Itinerary", lambda: Itinerary(links),
+         lambda: legacy_itinerary_hash(links)),
+        ("Conflict", lambda: Conflict(locations, aircrafts),
+         lambda: legacy_conflict_hash(locations, aircrafts)),
+    ]
+
+    print("%-14s %14s %14s" % ("", "create (us)", "SHA-1 (us)"))
+    for name, create, legacy_hash in cases:
+        print("%-14s %14.2f %14.2f" % (name, measure(create),
+                                       measure(legacy_hash)))
+
+
+if __name__ == "__main__":
+    main()
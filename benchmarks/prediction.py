@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""Measures the cost of copying a simulation for each conflict resolution
+attempt of the scheduler with `deepcopy` (how `ClonedSimulation` used to do
+it) against restoring a snapshot of a `PredictionContext`.
+
+Example:
+
+    Run from the root folder of the project:
+
+        $ python benchmarks/prediction.py plans/real-west-all-terminals.yaml
+
+"""
+import os
+import io
+import sys
+import timeit
+import logging
+import contextlib
+
+from copy import deepcopy, copy
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from config import Config
+from utils import str2seconds
+
+REPEAT = 5
+NUMBER = 10
+PREDICT_FROM = "0900"
+
+
+def legacy_clone(simulation):
+    """Copies a simulation the way `ClonedSimulation` used to."""
+    clock = deepcopy(simulation.clock)
+    airport = deepcopy(simulation.airport)
+    scenario = copy(simulation.scenario)
+    logger = logging.getLogger("QUIET_MODE")
+    airport.set_quiet(logger)
+    scenario.set_quiet(logger)
+    return clock, airport, scenario
+
+
+def measure(statement):
+    """Returns the best time of a statement in milliseconds."""
+    best = min(timeit.repeat(statement, repeat=REPEAT, number=NUMBER))
+    return best / NUMBER * 1e3
+
+
+def main():
+    """Prints the cost of preparing a prediction per attempt."""
+
+    Config.load_plan(sys.argv[1])
+    Config.params["simulator"]["test_mode"] = True
+    logging.disable(logging.CRITICAL)
+
+    from simulation import Simulation
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        simulation = Simulation()
+        while simulation.now < str2seconds(PREDICT_FROM):
+            simulation.tick()
+
+    prediction = simulation.copy
+    snapshot = prediction.snapshot()
+
+    print("%d aircraft on the surface" % len(simulation.airport.aircrafts))
+    print("%-28s %10.3f ms" % ("deepcopy (per attempt)",
+                               measure(lambda: legacy_clone(simulation))))
+    print("%-28s %10.3f ms" % ("PredictionContext (once)",
+                               measure(lambda: simulation.copy)))
+    print("%-28s %10.3f ms" % ("snapshot (once)",
+                               measure(prediction.snapshot)))
+    print("%-28s %10.3f ms" % ("restore (per attempt)",
+                               measure(lambda: prediction.restore(snapshot))))
+
+
+if __name__ == "__main__":
+    main()
@@ -3,6 +3,8 @@ import os
 import pickle
 import logging
 
+from config import Config
+
 CACHE_DIR = "./cache/"
 LOGGER = logging.getLogger(__name__)
 
@@ -28,17 +30,21 @@ def get(key):
 
 
 def get_hash(links, nodes):
-    """Gets the hash value of the given links and nodes."""
+    """Gets the hash value of the given links and nodes. The lengths of the
+    cached links depend on the distance model, so it's part of the hash.
+    """
 
     import hashlib
 
     __hash = 0.0
     for link in links:
-        __hash += link.__hash__()
-        __hash += link.__hash__()
+        __hash += link.get_digest()
+        __hash += link.get_digest()
 
     for node in nodes:
-        __hash += node.__hash__()
-        __hash += node.__hash__()
+        __hash += node.get_digest()
+        __hash += node.get_digest()
 
-    return hashlib.md5(('%d' % __hash).encode('utf-8')).hexdigest()
+    distance_model = Config.params["simulation"]["distance_model"]
+    return hashlib.md5(('%d#%s' % (__hash, distance_model))
+                       .encode('utf-8')).hexdigest()
@@ -1,32 +1,48 @@
 """`Clock` keeps the simulated time of the simulation and it raises a
 `ClockException` if it's the end of the day.
 """
-from datetime import time
 from config import Config
-from utils import get_seconds_after
+from utils import seconds2str
 
 
 class Clock:
-    """`Clock` simulates the the virtual time used in the simulation."""
+    """`Clock` simulates the the virtual time used in the simulation. The time
+    is counted in seconds since the start (00:00) of the simulated day and is
+    only converted into a time string for output, so the simulation can run
+    past midnight (e.g. until "26:00").
+    """
+
+    # Starts at 07:00
+    START_TIME = 7 * 60 * 60
 
     def __init__(self):
 
-        # Starts at 00:00
-        self.now = time(7, 0)
+        self.now = Clock.START_TIME
         self.sim_time = Config.params["simulation"]["time_unit"]
         end_time_raw = Config.params["simulation"]["end_time"].split(":")
-        self.end_time = time(int(end_time_raw[0]), int(end_time_raw[1]))
+        self.end_time = (int(end_time_raw[0]) * 60 + int(end_time_raw[1])) * 60
 
     def tick(self):
         """Moves the clock to next tick."""
 
-        time_after_tick = get_seconds_after(self.now, self.sim_time)
+        time_after_tick = self.now + self.sim_time
         if time_after_tick > self.end_time:
             raise ClockException("End of the day")
         self.now = time_after_tick
 
+    def skip(self, n_ticks):
+        """Moves the clock `n_ticks` ticks forward at once without going past
+        the end of the day, and returns the number of ticks actually skipped.
+        """
+
+        n_ticks = min(n_ticks, (self.end_time - self.now) // self.sim_time)
+        if n_ticks <= 0:
+            return 0
+        self.now += n_ticks * self.sim_time
+        return n_ticks
+
     def __repr__(self):
-        return "<Clock: %s>" % self.now
+        return "<Clock: %s>" % seconds2str(self.now)
 
 
 class ClockException(Exception):
@@ -1,7 +1,7 @@
 """Class file for `Conflict`."""
-from utils import str2sha1
 from flight import ArrivalFlight
 
+
 class Conflict:
     """`Conflict` represents two aircrafts are too close to each other in an
     airport.
@@ -11,15 +11,22 @@ class Conflict:
 
         self.locations = locations
         self.aircrafts = aircrafts
+        self.__hash = None
 
-        callsigns = []
-        for aircraft in aircrafts:
-            callsigns.append(aircraft.callsign)
-        callsigns.sort()
-
-        self.hash = str2sha1("%s#%s" %
-                             ("#".join(callsigns),
-                              "#".join(str(self.locations))))
+    @property
+    def hash(self):
+        """Returns the hash value of the aircrafts and the locations, computed
+        on first use.
+        """
+        if self.__hash is None:
+            callsigns = sorted(aircraft.callsign
+                               for aircraft in self.aircrafts)
+            self.__hash = hash((
+                tuple(callsigns),
+                tuple((location.geo_pos["lat"], location.geo_pos["lng"])
+                      for location in self.locations)
+            ))
+        return self.__hash
 
     @property
     def detailed_description(self):
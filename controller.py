@@ -2,7 +2,7 @@
 Ground Controller oversees the aircraft movement on the ground. It continuously observes the world and sends
 commands to pilots when there is a notable situation.
 """
-import collections
+import itertools
 
 from config import Config
 
@@ -20,26 +20,20 @@ class Controller:
 
     def __observe(self):
         aircraft_list = self.ground.aircrafts
+        occupancy = self.ground.occupancy
 
-        self.aircraft_location_lookup = collections.defaultdict(list)  # {link: (aircraft, distance_on_link)}
         self.aircraft_ahead_lookup = {}  # {aircraft: (target_speed, relative_distance)}
 
         self.conflicts = []
 
         """
-        Observe the invertedAircraftLocations = {link: (aircraft, distance_on_link)} set.
+        Observe the {link: (aircraft, distance_on_link)} index of the airport; only the aircraft which
+        moved since the last tick are re-indexed.
         Observe the closestAircraft = {aircraft: (target_speed, relative_distance)} dict.
         Observe potential conflicts.
         """
         for aircraft in aircraft_list:
-            if aircraft.itinerary.is_completed:
-                continue
-            link, distance = aircraft.itinerary.current_target, aircraft.itinerary.current_distance
-            self.aircraft_location_lookup[link].append((aircraft, distance))
-
-        # Sort the {link: (aircraft, distance_on_link)} by distance_on_link.
-        for _, aircraft_pair in self.aircraft_location_lookup.items():
-            aircraft_pair.sort(key=lambda pair: pair[1])
+            occupancy.update(aircraft)
 
         for aircraft in aircraft_list:
             if aircraft.itinerary.is_completed:
@@ -58,34 +52,37 @@ class Controller:
                 pass
 
     def __find_aircraft_ahead(self, aircraft):
-        link_index, link_distance = aircraft.itinerary.current_target_index, aircraft.itinerary.current_distance
-
-        relative_distance = -link_distance
-        for index in range(link_index, aircraft.itinerary.length):
-            link = aircraft.itinerary.targets[index]
+        itinerary = aircraft.itinerary
+        link_index, link_distance = itinerary.current_target_index, itinerary.current_distance
+        occupancy = self.ground.occupancy
 
-            aircraft_on_same_link = self.aircraft_location_lookup.get(link, [])
-            rear_aircraft, rear_dist = None, -1
-            for item in aircraft_on_same_link:
-                item_aircraft, item_distance = item
-                # Skip if the item is behind the aircraft
-                if index == link_index and item_distance <= link_distance:
-                    continue
+        # Only the links starting within the pilot vision are looked at; one
+        # more link is taken since the offsets may round the other way than
+        # the distance below
+        end_index = min(itinerary.get_end_index(self.PILOT_VISION) + 1, itinerary.length)
 
+        relative_distance = -link_distance
+        for index in range(link_index, end_index):
+            if relative_distance > self.PILOT_VISION:
+                break
+            link = itinerary.targets[index]
+
+            # Skip the aircraft behind on the current link
+            aircraft_ahead = occupancy.get_aircraft_ahead(
+                link, link_distance if index == link_index else None)
+            closest = next(aircraft_ahead, None)
+            if closest is not None:
                 # Found an aircraft ahead!
-                relative_distance += item_distance
-
-                if relative_distance < self.CLOSE_NODE_THRESHOLD:
+                for item_distance, item_aircraft in itertools.chain([closest], aircraft_ahead):
+                    if relative_distance + item_distance >= self.CLOSE_NODE_THRESHOLD:
+                        break
                     self.conflicts.append((aircraft, item_aircraft))
 
+                item_distance, item_aircraft = closest
+                relative_distance += item_distance
                 if relative_distance > self.PILOT_VISION:
-                    continue
-                if rear_aircraft is None:
-                    rear_aircraft, rear_dist = item_aircraft, relative_distance
-                elif relative_distance < rear_dist:
-                    rear_aircraft, rear_dist = item_aircraft, relative_distance
-            if rear_aircraft is not None:
-                return rear_aircraft.speed, rear_dist, rear_aircraft
+                    break
+                return item_aircraft.speed, relative_distance, item_aircraft
 
             relative_distance += link.length
 
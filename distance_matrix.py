@@ -0,0 +1,124 @@
+"""`DistanceMatrix` holds the distances between every pair of nodes on an
+airport surface, computed in one vectorized pass over their planar
+coordinates, together with the closeness masks of the configured thresholds.
+"""
+import numpy
+
+
+class DistanceMatrix:
+    """`DistanceMatrix` stores the planar distances between the given surface
+    nodes and a boolean mask for each threshold where `masks[threshold][i, j]`
+    is true if node i and node j are within `threshold` feet. The masks are
+    computed with the same arithmetic as `Node.is_within` so a lookup always
+    agrees with the planar distance.
+
+    Nodes are looked up by their hash, so copies of a surface node (e.g.
+    loaded from cache or deep copied by the scheduler) share the same entry.
+    Nodes which are not on the surface (e.g. the location of an aircraft in
+    the middle of a link) are not indexed and the caller falls back to the
+    planar distance.
+    """
+
+    def __init__(self, nodes, thresholds):
+
+        # nodes[i] is the node at index i or None if the index is not used
+        self.nodes = []
+        positions = {}
+        ambiguous = set()
+        coordinates = []
+
+        for node in nodes:
+            if node.projection is None:
+                continue
+            if node.hash in positions:
+                # Equal nodes at a slightly different position
+                if positions[node.hash] != (node.x, node.y):
+                    ambiguous.add(node.hash)
+                continue
+            positions[node.hash] = (node.x, node.y)
+            self.nodes.append(node)
+            coordinates.append((node.x, node.y))
+
+        self.nodes = [None if node.hash in ambiguous else node
+                      for node in self.nodes]
+        self.__build_index()
+
+        self.size = len(coordinates)
+        self.coordinates = numpy.array(coordinates,
+                                       dtype=float).reshape(self.size, 2)
+
+        # All pairs at once: d_x[i, j] = x[i] - x[j]
+        d_x = self.coordinates[:, 0, None] - self.coordinates[None, :, 0]
+        d_y = self.coordinates[:, 1, None] - self.coordinates[None, :, 1]
+        distance_squares = d_x * d_x + d_y * d_y
+        self.distances = numpy.sqrt(distance_squares)
+
+        self.masks = {}
+        for threshold in thresholds:
+            self.masks[threshold] = distance_squares < threshold * threshold
+
+    def __build_index(self):
+        self.index_of = {node.hash: i for i, node in enumerate(self.nodes)
+                         if node is not None}
+
+    def index(self, node):
+        """Returns the index of a node in the matrix or None if the node is
+        not indexed.
+        """
+        return self.index_of.get(node.hash)
+
+    def get_distance(self, node, another_node):
+        """Returns the distance between two nodes in feet or None if any of
+        them is not indexed.
+        """
+        i, j = self.index(node), self.index(another_node)
+        if i is None or j is None:
+            return None
+        return float(self.distances[i, j])
+
+    def is_close(self, node, another_node, threshold):
+        """Returns if two nodes are within `threshold` feet, or None if the
+        answer is not in the matrix (unknown nodes or threshold).
+        """
+        mask = self.masks.get(threshold)
+        if mask is None:
+            return None
+        i = self.index_of.get(node.hash)
+        j = self.index_of.get(another_node.hash)
+        if i is None or j is None:
+            return None
+        return bool(mask[i, j])
+
+    def __len__(self):
+        return self.size
+
+    def __getstate__(self):
+        attrs = dict(self.__dict__)
+        del attrs["index_of"]
+        return attrs
+
+    def __setstate__(self, attrs):
+        self.__dict__.update(attrs)
+        # The nodes loaded from cache have the IDs of this run
+        self.__build_index()
+
+    def __deepcopy__(self, memo):
+        # The matrix is never modified after being built so copies of a
+        # surface (e.g. in cloned simulations) share it
+        return self
+
+
+_ACTIVE_DISTANCE_MATRIX = None
+
+
+def set_active_distance_matrix(distance_matrix):
+    """Sets the distance matrix used by the nodes for closeness checks.
+    Passing None makes the nodes always compute the distance.
+    """
+    global _ACTIVE_DISTANCE_MATRIX
+    _ACTIVE_DISTANCE_MATRIX = distance_matrix
+
+
+def get_active_distance_matrix():
+    """Returns the distance matrix used by the nodes."""
+    return _ACTIVE_DISTANCE_MATRIX
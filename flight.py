@@ -2,21 +2,64 @@
 possible flight that is planned before the simulation started.
 """
 from aircraft import Aircraft, State
+from utils import seconds2str
 
 
 class Flight:
     """`Flight` is the parent class for the `ArrivalFlight` and
     `DepartureFlight`.
+
+    A flight only keeps the record of its aircraft (name and model) until the
+    aircraft is needed, i.e. when the flight appears. The `Aircraft` object is
+    created on the first access of `aircraft` and released by
+    `release_aircraft` once the aircraft has left the airport surface.
     """
 
-    def __init__(self, aircraft, appear_time):
-        self.aircraft = aircraft
+    __slots__ = ("fullname", "callsign", "model", "is_departure", "runway",
+                 "appear_time", "__aircraft", "__logger")
+
+    def __init__(self, fullname, model, is_departure, appear_time):
+        self.fullname = fullname
+        self.callsign = Aircraft.fullname2callsign(fullname)
+        self.model = model
+        self.is_departure = is_departure
         self.runway = None
         self.appear_time = appear_time
+        self.__aircraft = None
+        self.__logger = None
+
+    @property
+    def aircraft(self):
+        """Returns the aircraft of this flight; creates it if it doesn't exist
+        yet.
+        """
+        if self.__aircraft is None:
+            self.__aircraft = Aircraft(self.fullname, self.model, None,
+                                       self.is_departure)
+            if self.__logger is not None:
+                self.__aircraft.set_quiet(self.__logger)
+        return self.__aircraft
+
+    @property
+    def has_aircraft(self):
+        """Returns true if the aircraft of this flight exists."""
+        return self.__aircraft is not None
+
+    def release_aircraft(self):
+        """Drops the reference of this flight to its aircraft."""
+        self.__aircraft = None
 
     def set_runway(self, runway):
         self.runway = runway
 
+    def set_quiet(self, logger):
+        """Puts the aircraft of this flight, including the one not created
+        yet, into quiet mode.
+        """
+        self.__logger = logger
+        if self.__aircraft is not None:
+            self.__aircraft.set_quiet(logger)
+
     def __gt__(self, other):
         return self.appear_time > other.appear_time
 
@@ -26,16 +69,19 @@ class ArrivalFlight(Flight):
     time, runway, spot position, and gate are assigned.
     """
 
+    __slots__ = ("from_airport", "to_gate", "arrival_time")
+
     def __init__(self, callsign, model, from_airport, to_gate,
                  arrival_time, appear_time):
-        super().__init__(Aircraft(callsign, model, None, False), appear_time)
+        super().__init__(callsign, model, False, appear_time)
         self.from_airport = from_airport
         self.to_gate = to_gate
         self.arrival_time = arrival_time
 
     def __repr__(self):
         return "<Arrival:%s time:%s appear:%s>" \
-               % (self.aircraft.callsign, self.arrival_time, self.appear_time)
+               % (self.callsign, seconds2str(self.arrival_time),
+                  seconds2str(self.appear_time))
 
 
 class DepartureFlight(Flight):
@@ -43,14 +89,17 @@ class DepartureFlight(Flight):
     departure time, gate, spot position, and runway are assigned.
     """
 
+    __slots__ = ("to_airport", "from_gate", "departure_time")
+
     def __init__(self, callsign, model, to_airport, from_gate,
                  departure_time, appear_time):
-        super().__init__(Aircraft(callsign, model, None, True), appear_time)
+        super().__init__(callsign, model, True, appear_time)
         self.to_airport = to_airport
         self.from_gate = from_gate
         self.departure_time = departure_time
 
     def __repr__(self):
         return "<Departure:%s time:%s appear:%s>" % \
-               (self.aircraft.callsign, self.departure_time, self.appear_time)
+               (self.callsign, seconds2str(self.departure_time),
+                seconds2str(self.appear_time))
 
@@ -19,3 +19,35 @@ def get_new_node_id():
     i = LastAssignedId.node_id
     LastAssignedId.node_id += 1
     return i
+
+
+class InternedIds:
+    """Static class that stores the IDs assigned to interned keys. Only the
+    static identities of a simulation (nodes and links of the surface) are
+    interned, so the table doesn't grow while the simulation runs. IDs keep
+    increasing for the whole process, even when the table is cleared.
+    """
+    ids = {}
+    last_id = 0
+
+
+def get_interned_id(key):
+    """Retrieve the ID of a key. Equal keys get the same ID within a
+    simulation run, so the ID can be used as the identity of an object. IDs
+    are assigned in the order the keys are first seen and must not be stored
+    across runs (e.g. in the cache).
+    """
+    ids = InternedIds.ids
+    i = ids.get(key)
+    if i is None:
+        i = ids[key] = InternedIds.last_id
+        InternedIds.last_id += 1
+    return i
+
+
+def reset_interned_ids():
+    """Clears the interned keys, e.g. before a new simulation loads its
+    surface. IDs are never reused, so an object interned before is never
+    equal to one interned after, even if their keys are equal.
+    """
+    InternedIds.ids = {}
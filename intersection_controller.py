@@ -1,8 +1,99 @@
 from config import Config
+from spatial_index import SpatialIndex
 import copy
+import heapq
+import itertools
 
 import matplotlib.pyplot as plt
 
+"""
+LockQueue holds the aircraft waiting for the lock of one intersection. Each
+entry is (distance, seq, aircraft) where distance is how far the aircraft was
+from the intersection when it asked for the lock and seq is the order of the
+requests, so ties are resolved first come first served. Entries are kept in a
+heap per approach (the link the aircraft was on when it asked for the lock)
+and the aircraft holding the lock is cached until the queue changes.
+
+The lock is given according to the policy:
+    distance: the closest aircraft (in any approach)
+    qsize: the closest aircraft of the approach with the most aircraft
+           waiting; ties are given to the approach with the closest aircraft
+"""
+class LockQueue:
+    def __init__(self, policy):
+        if policy not in ("distance", "qsize"):
+            raise Exception("Unknown intersection policy: %s" % policy)
+        self.policy = policy
+        self.approaches = {}
+        self.size = 0
+        self.counter = itertools.count()
+        # aircraft of the latest request
+        self.last = None
+        self.holder = None
+
+    def push(self, distance, aircraft, approach):
+        heapq.heappush(self.approaches.setdefault(approach, []),
+                       (distance, next(self.counter), aircraft))
+        self.size += 1
+        self.last = aircraft
+        self.holder = None
+
+    def peek(self):
+        if self.holder is None and self.size > 0:
+            self.holder = self.__get_holder()
+        return self.holder
+
+    def __get_holder(self):
+        if self.policy == "qsize":
+            queue = min(self.approaches.values(),
+                        key=lambda queue: (-len(queue), queue[0][:2]))
+        else:
+            queue = min(self.approaches.values(),
+                        key=lambda queue: queue[0][:2])
+        return queue[0][2]
+
+    def remove(self, aircraft):
+        for approach in list(self.approaches):
+            queue = self.approaches[approach]
+            remaining = [entry for entry in queue if entry[2] != aircraft]
+            if len(remaining) == len(queue):
+                continue
+            self.size -= len(queue) - len(remaining)
+            if remaining:
+                heapq.heapify(remaining)
+                self.approaches[approach] = remaining
+            else:
+                del self.approaches[approach]
+        self.holder = None
+        self.last = None
+        if self.size > 0:
+            self.last = max((entry for queue in self.approaches.values()
+                             for entry in queue), key=lambda t: t[1])[2]
+
+    def clear(self):
+        self.approaches = {}
+        self.size = 0
+        self.last = None
+        self.holder = None
+
+    def snapshot(self):
+        """Returns the state of this queue to be restored by `restore`."""
+        return ({approach: list(queue) for approach, queue in self.approaches.items()},
+                self.size, self.last, self.holder)
+
+    def restore(self, snapshot):
+        approaches, self.size, self.last, self.holder = snapshot
+        self.approaches = {approach: list(queue) for approach, queue in approaches.items()}
+
+    def __iter__(self):
+        for queue in self.approaches.values():
+            for _, _, aircraft in queue:
+                yield aircraft
+
+    def __len__(self):
+        return self.size
+
+
 """
 IntersectionController is used to control the aircraft movment near the intesections.
 To avoid aircraft collision, aircrafts need to lock intersection before it pass the 
@@ -13,6 +104,9 @@ to pass the intersection.
 """
 class IntersectionController:
     def __init__(self, airport):
+        self.close_node_threshold = \
+            Config.params["simulation"]["close_node_threshold"]
+
         # get all the unique nodes
         all_nodes = self._get_all_nodes(airport.surface.gates, airport.surface.links)
         unique_nodes = self._remove_overlapping_nodes(all_nodes)
@@ -23,7 +117,10 @@ class IntersectionController:
         # map intersection to links
         self.intersection_link_map = self._init_intersection_links_map(self.intersection_list, airport.surface.links)
         # self.intersection_available_link_map = {}
+        self.policy = Config.params["controller"]["intersection"]
         self.intersection_lock_queue = {}
+        # reverse index: the intersections each aircraft is queued for
+        self.aircraft_intersections = {}
         self.intersections_status = {}
         for intersection in self.intersection_list:
             # available for pass
@@ -31,8 +128,11 @@ class IntersectionController:
             # self.intersection_available_link_map[intersection] = None
         
         self.node_map = {}
+        intersection_index = SpatialIndex.from_nodes(self.intersection_list,
+                                                     self.close_node_threshold)
         for node in all_nodes:
-            for intersection in self.intersection_list:
+            for intersection in intersection_index.query(
+                    node, self.close_node_threshold):
                 if intersection.is_close_to(node):
                     self.node_map[node] = intersection
 
@@ -83,6 +183,9 @@ class IntersectionController:
     def lock_intersections(self, aircraft):
         ahead_intersections, distances_to_intersections = aircraft.get_ahead_intersections_and_link()
         # now the aircraft can pass, lock intersections
+        if len(ahead_intersections) == 0:
+            return
+        approach = aircraft.itinerary.current_target
 
         tmp_set = set()
         for idx, ahead_intersection in enumerate(ahead_intersections):
@@ -95,20 +198,20 @@ class IntersectionController:
                 self.intersections_status[actual_intersection] = False
                 ahead_distance = distances_to_intersections[idx]
                 if actual_intersection not in self.intersection_lock_queue:
-                    self.intersection_lock_queue[actual_intersection] = []
-                if len(self.intersection_lock_queue[actual_intersection]) == 0 or self.intersection_lock_queue[actual_intersection][-1][1] != aircraft:
-                    self.intersection_lock_queue[actual_intersection].append((ahead_distance, aircraft))
+                    self.intersection_lock_queue[actual_intersection] = LockQueue(self.policy)
+                lock_queue = self.intersection_lock_queue[actual_intersection]
+                if len(lock_queue) == 0 or lock_queue.last != aircraft:
+                    lock_queue.push(ahead_distance, aircraft, approach)
+                    self.aircraft_intersections.setdefault(aircraft, set()).add(actual_intersection)
 
     
     def is_lock_by(self, aircraft):
         ahead_intersections, _ = aircraft.get_ahead_intersections_and_link()
         if len(ahead_intersections) == 0:
             return True
-        ahead_intersection = ahead_intersections[0]
-        for _, ahead_intersection in enumerate(ahead_intersections):
+        for ahead_intersection in ahead_intersections:
             actual_intersection = self.node_map[ahead_intersection]
-            sorted_queue = sorted(self.intersection_lock_queue[actual_intersection], key=lambda t : t[0])
-            lock_by_aircraft = sorted_queue[0][1]
+            lock_by_aircraft = self.intersection_lock_queue[actual_intersection].peek()
             if aircraft != lock_by_aircraft:
                 # print("LOCK INFO: ", aircraft, " has no lock")
                 # print("lock by", lock_by_aircraft)
@@ -119,7 +222,16 @@ class IntersectionController:
         for intersection in passed_intersections:
             actual_intersection = self.node_map[intersection]
             self.intersections_status[actual_intersection] = True
-            self.intersection_lock_queue[actual_intersection] = []
+            lock_queue = self.intersection_lock_queue.get(actual_intersection)
+            if lock_queue is None:
+                continue
+            for aircraft in lock_queue:
+                intersections = self.aircraft_intersections.get(aircraft)
+                if intersections is not None:
+                    intersections.discard(actual_intersection)
+                    if len(intersections) == 0:
+                        del self.aircraft_intersections[aircraft]
+            lock_queue.clear()
 
     # remove this aircraft from all the intersection lock queue(s)
     # The reason we need this function: because of technical implementation,
@@ -129,14 +241,8 @@ class IntersectionController:
     # will not be called. Therefore, we need to call this remove_aircraft when
     # an arrival aircraft reaches its terminal gate.
     def remove_aircraft(self, aircraft):
-        remove_list = []
-        for intersection, aircraft_queue in self.intersection_lock_queue.items():
-            for idx, tp in enumerate(aircraft_queue):
-                _, cur_aircraft = tp
-                if cur_aircraft == aircraft:
-                    remove_list.append((intersection, idx))
-        for intersection, aircraft_idx in remove_list:
-            del self.intersection_lock_queue[intersection][aircraft_idx]
+        for intersection in self.aircraft_intersections.pop(aircraft, ()):
+            self.intersection_lock_queue[intersection].remove(aircraft)
 
     # def unblock_intersections_lock_by_aircraft(self, aircraft):
     #     remove_intersections = []
@@ -150,6 +256,26 @@ class IntersectionController:
     #     self.unlock_intersections(remove_intersections)
 
     
+    def snapshot(self):
+        """Returns the state of the locks to be restored by `restore`."""
+        lock_queues = {intersection: lock_queue.snapshot()
+                       for intersection, lock_queue in self.intersection_lock_queue.items()
+                       if len(lock_queue) > 0}
+        aircraft_intersections = {aircraft: set(intersections)
+                                  for aircraft, intersections in self.aircraft_intersections.items()}
+        return lock_queues, aircraft_intersections, dict(self.intersections_status)
+
+    def restore(self, snapshot):
+        lock_queues, aircraft_intersections, intersections_status = snapshot
+        for intersection, lock_queue in self.intersection_lock_queue.items():
+            if intersection in lock_queues:
+                lock_queue.restore(lock_queues[intersection])
+            else:
+                lock_queue.clear()
+        self.aircraft_intersections = {aircraft: set(intersections)
+                                       for aircraft, intersections in aircraft_intersections.items()}
+        self.intersections_status = dict(intersections_status)
+
     """
     Get all the nodes from airport node link structure
     Note that some of the nodes might be overlapping, 
@@ -173,12 +299,18 @@ class IntersectionController:
     def _remove_overlapping_nodes(self, all_nodes):
         all_nodes_list = list(all_nodes)
         length = len(all_nodes_list)
+        index = SpatialIndex(self.close_node_threshold)
+        for i, node in enumerate(all_nodes_list):
+            index.add(node, i)
         idx_of_removed = set()
         for i in range(length):
             if i in idx_of_removed:
                 continue
-            for j in range(i+1, length):
-                node_0, node_1 = all_nodes_list[i], all_nodes_list[j]
+            node_0 = all_nodes_list[i]
+            for j in index.query(node_0, self.close_node_threshold):
+                if j <= i:
+                    continue
+                node_1 = all_nodes_list[j]
                 if node_0.is_close_to(node_1):
                     idx_of_removed.add(j)
         unique_nodes = []
@@ -194,9 +326,13 @@ class IntersectionController:
     """
     def _init_intersection_links_map(self, intersection_list, links):
         intersection_link_map = {}
+        link_end_index = SpatialIndex.from_link_ends(
+            links, self.close_node_threshold)
         for intersection_spot in intersection_list:
             intersection_link_map[intersection_spot] = []
-            for link in links:
+            for i in sorted(set(link_end_index.query(
+                    intersection_spot, self.close_node_threshold))):
+                link = links[i]
                 if intersection_spot.is_close_to(link.start) or intersection_spot.is_close_to(link.end):
                     intersection_link_map[intersection_spot].append(link)
         return intersection_link_map
\ No newline at end of file
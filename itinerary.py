@@ -1,7 +1,7 @@
 """Class file for `Itinerary`."""
+from bisect import bisect_left, bisect_right
+from itertools import accumulate
 from link import HoldLink
-from utils import str2sha1
-from copy import deepcopy
 from node import Node
 from surface import *
 
@@ -13,18 +13,55 @@ class Itinerary:
         # unfinished_distance == 0 means it's
         self.targets = [HoldLink()] if unfinished_distance == 0 else []
         self.targets += targets if targets else []  # links\
-        self.backup = deepcopy(targets)
+        # The links are shared, only the list is copied
+        self.backup = None if targets is None else list(targets)
         self.unfinished_distance = unfinished_distance
+        self.__build_offsets()
         # distance: the distance travelled on the link
         # distance_left: the distance left for entire itinerary
         self.index, self.distance, self.distance_left = None, None, None
         self.reset()
 
-        self.hash = str2sha1("#".join(str(self.targets)))
+        self.__hash = None
         self.uncertainty_delayed_index = []
         self.scheduler_delayed_index = []
         self.links_this_tick = []
 
+    def __build_offsets(self):
+        # link_indices: the indices of the links (not the hold links) in
+        # targets; offsets[i]: the distance from the start of the first link
+        # to the start of the i-th link (offsets[-1] is the total length).
+        # Delays are only inserted at the head of the targets so the indices
+        # are stored relative to the number of delays added.
+        self.__n_delays = 0
+        self.__link_indices = [i for i, target in enumerate(self.targets)
+                               if type(target) is not HoldLink]
+        self.__offsets = [0.0] + list(accumulate(
+            self.targets[i].length for i in self.__link_indices))
+
+        # intersection_counts[i]: the number of links from the i-th link on
+        # which end at an intersection
+        self.__intersection_counts = [0]
+        for i in reversed(self.__link_indices):
+            is_intersection = self.targets[i].end.name.startswith("I")
+            self.__intersection_counts.append(
+                self.__intersection_counts[-1] + is_intersection)
+        self.__intersection_counts.reverse()
+
+    def __get_link_position(self, index):
+        """Returns the position in link_indices of the first link at or after
+        the given index of targets.
+        """
+        return bisect_left(self.__link_indices, index - self.__n_delays)
+
+    def __get_link_index(self, position):
+        """Returns the index in targets of the link at the given position of
+        link_indices.
+        """
+        if position >= len(self.__link_indices):
+            return self.length
+        return self.__link_indices[position] + self.__n_delays
+
     def tick(self, tick_distance):
         """Ticks this itinerary for moving to the next state."""
         if self.is_completed:
@@ -61,22 +98,29 @@ class Itinerary:
         if type(self.targets[index]) is HoldLink:
             return self.index + 1, self.distance, self.current_precise_location
 
-        # Find the link which the next location is on
-        while tick_distance >= self.targets[index].length - distance:
-            tick_distance -= self.targets[index].length - distance
-            self.links_this_tick.append(self.targets[index])  # append the link the aircraft will go through
-            index += 1
-            distance = 0
-            # Return the last node in the itinerary if completed
+        # Find the link which the next location is on: the last one starting
+        # before the end of this tick
+        offsets = self.__offsets
+        position = self.__get_link_position(index)
+        end = offsets[position] + distance + tick_distance
+        next_position = bisect_right(offsets, end, position + 1) - 1
 
-            while index < self.length and type(self.targets[index]) is HoldLink:
-                index += 1
+        # append the links the aircraft will go through
+        for passed_position in range(position, min(next_position,
+                                                   len(offsets) - 1)):
+            self.links_this_tick.append(
+                self.targets[self.__get_link_index(passed_position)])
 
-            if index >= self.length:
-                return completed_itinerary
-        # Update the distance on the link
+        # Return the last node in the itinerary if completed
+        if next_position >= len(offsets) - 1:
+            return completed_itinerary
 
-        return index, distance + tick_distance, self.targets[index].get_middle_node(distance + tick_distance)
+        # Update the distance on the link; it's clamped to the link since the
+        # offsets are rounded sums of the link lengths
+        index = self.__get_link_index(next_position)
+        link = self.targets[index]
+        distance = min(max(end - offsets[next_position], 0.0), link.length)
+        return index, distance, link.get_middle_node(distance)
 
     def get_nth_target(self, n):
         """ Returns the nth link/target of the route/targets """
@@ -104,29 +148,42 @@ class Itinerary:
 
     def get_ahead_intersections_and_link(self, ahead_distance):
         """get the intersections and future links with certain distance"""
+        offsets = self.__offsets
+        position = self.__get_link_position(self.index)
+        start = offsets[position] + self.distance
+
+        # The links ending within `ahead_distance`
+        end_position = bisect_right(offsets, start + ahead_distance,
+                                    position + 1) - 1
+
         ahead_intersections = []
         distances_to_intersections = []
-        index, distance = self.index, self.distance
-        relative_distance = -distance
-        while ahead_distance >= self.targets[index].length - distance:
-            if type(self.targets[index]) is HoldLink:
-                index += 1
-                continue
-            ahead_distance -= self.targets[index].length - distance
-            ahead_intersections.append(self.targets[index].end)
-            relative_distance += self.targets[index].length
+        relative_distance = -self.distance
+        for ahead_position in range(position, end_position):
+            link = self.targets[self.__get_link_index(ahead_position)]
+            ahead_intersections.append(link.end)
+            relative_distance += link.length
             distances_to_intersections.append(relative_distance)
-            index += 1
-            distance = 0
-            if index >= self.length:
-                break
         return ahead_intersections, distances_to_intersections
-    
+
+    def get_end_index(self, ahead_distance):
+        """Returns the index of targets right after the last link starting
+        within `ahead_distance` from the current location.
+        """
+        offsets = self.__offsets
+        position = self.__get_link_position(self.index)
+        start = offsets[position] + self.distance
+        end_position = bisect_right(offsets, start + ahead_distance,
+                                    position + 1)
+        return self.__get_link_index(end_position)
 
     def __add_delay(self):
         if self.is_completed:
             return None
         self.targets.insert(0, HoldLink())
+        self.__n_delays += 1
+        # The hash covers the targets
+        self.__hash = None
         return self.targets[0]
 
     def add_uncertainty_delay(self, amount=1):
@@ -155,9 +212,20 @@ class Itinerary:
         """Reset the index of this itinerary."""
         self.index = 0
         self.distance = self.unfinished_distance
-        self.distance_left = -self.unfinished_distance  # distance till destination
-        for link in self.targets:
-            self.distance_left += link.length
+        # distance till destination
+        self.distance_left = self.__offsets[-1] - self.unfinished_distance
+
+    def snapshot(self):
+        """Returns the position of this itinerary to be restored by `restore`.
+        Like `reset`, the delays added afterwards are kept on restore.
+        """
+        return self.index, self.distance, self.distance_left, \
+            self.links_this_tick
+
+    def restore(self, snapshot):
+        """Moves this itinerary back to the position of a snapshot."""
+        self.index, self.distance, self.distance_left, \
+            self.links_this_tick = snapshot
 
     @property
     def length(self):
@@ -191,23 +259,23 @@ class Itinerary:
     @property
     def current_target(self):
         """Returns the current target."""
-        index = self.index
-        while index < self.length and type(self.targets[index]) is HoldLink:
-            index += 1
-
         if self.is_completed:
             return None
 
-        return self.targets[index]
+        return self.targets[self.current_target_index]
 
     @property
     def current_target_index(self):
         """Returns the current target."""
-        index = self.index
-        while index < self.length and type(self.targets[index]) is HoldLink:
-            index += 1
+        return self.__get_link_index(self.__get_link_position(self.index))
 
-        return index
+    @property
+    def n_intersections_ahead(self):
+        """Returns the number of links from the current target on which end at
+        an intersection.
+        """
+        return self.__intersection_counts[
+            self.__get_link_position(self.index)]
 
     @property
     def current_distance(self):
@@ -220,25 +288,18 @@ class Itinerary:
     @property
     def current_coarse_location(self):
         """Returns the current location (the end node of current target/link)."""
-        index = self.index
-        while index < self.length and type(self.targets[index]) is HoldLink:
-            index += 1
-
         if self.is_completed:
             return self.targets[-1].end
-        return self.targets[index].end
+        return self.targets[self.current_target_index].end
 
     @property
     def current_precise_location(self):
         """Returns the current location (the precise node of current target/link)."""
-        index = self.index
-        while index < self.length and type(self.targets[index]) is HoldLink:
-            index += 1
-
         if self.is_completed:
             return self.targets[-1].end
 
-        return self.targets[index].get_middle_node(self.distance)
+        return self.targets[self.current_target_index].get_middle_node(
+            self.distance)
 
     @property
     def next_target(self):
@@ -279,6 +340,13 @@ class Itinerary:
     def __repr__(self):
         return "<Itinerary: %d target>" % len(self.targets)
 
+    @property
+    def hash(self):
+        """Returns the hash value of the targets, computed on first use."""
+        if self.__hash is None:
+            self.__hash = hash(tuple(target.hash for target in self.targets))
+        return self.__hash
+
     def __hash__(self):
         return self.hash
 
@@ -0,0 +1,120 @@
+"""`Kinematics` updates the speeds of all the aircraft moved in a tick at
+once. The state of the fleet is gathered into arrays (structure of arrays) so
+the car-following model of `Aircraft.get_next_speed` runs as a few vectorized
+NumPy operations instead of a Python call per aircraft.
+"""
+import numpy
+
+from aircraft import State
+
+
+class Kinematics:
+    """`Kinematics` computes the next speed of a list of aircraft with the
+    same model as `Aircraft.get_next_speed`:
+
+    - Without an aircraft ahead, the aircraft accelerates or decelerates by
+      `ideal_acc` towards the speed of its state (pushback, ramp or ideal).
+    - Behind a stopped aircraft or closer than `min_distance`, it stops.
+    - Otherwise, the acceleration is `c * speed^m * |speed - fronter_speed| /
+      gap^l` where (c, l, m) depends on whether the gap is larger than
+      `ideal_distance`.
+
+    The speeds are always kept in [0, max_speed]. They agree with the scalar
+    model up to the rounding of the power function (the last bit).
+    """
+
+    def __init__(self, aircrafts):
+
+        self.aircrafts = aircrafts
+        size = len(aircrafts)
+
+        self.speed = numpy.zeros(size)
+        self.speed_uncertainty = numpy.zeros(size)
+
+        # Free-flow speed of the state of each aircraft
+        self.target_speed = numpy.zeros(size)
+
+        # Speed of and distance to the aircraft ahead, if has_fronter is true
+        self.has_fronter = numpy.zeros(size, dtype=bool)
+        self.fronter_speed = numpy.zeros(size)
+        self.gap = numpy.zeros(size)
+
+        # Constants from the profile of each aircraft
+        self.max_speed = numpy.zeros(size)
+        self.ideal_acc = numpy.zeros(size)
+        self.ideal_distance = numpy.zeros(size)
+        self.min_distance = numpy.zeros(size)
+
+        for i, aircraft in enumerate(aircrafts):
+            profile = aircraft.profile
+            self.speed[i] = aircraft.speed
+            self.speed_uncertainty[i] = aircraft.speed_uncertainty
+            self.target_speed[i] = self.__get_target_speed(aircraft.state,
+                                                           profile)
+            if aircraft.fronter_info is not None:
+                self.has_fronter[i] = True
+                self.fronter_speed[i], self.gap[i] = aircraft.fronter_info
+            self.max_speed[i] = profile.max_speed
+            self.ideal_acc[i] = profile.ideal_acc
+            self.ideal_distance[i] = profile.ideal_distance
+            self.min_distance[i] = profile.min_distance
+
+    @classmethod
+    def __get_target_speed(cls, state, profile):
+        if state is State.pushback:
+            return profile.pushback_speed
+        if state is State.ramp:
+            return profile.ramp_speed
+        return profile.ideal_speed
+
+    def get_next_speeds(self):
+        """Returns the array of the next speed of each aircraft before adding
+        the speed uncertainty.
+        """
+        return numpy.where(self.has_fronter, self.__get_following_speeds(),
+                           self.__get_free_speeds())
+
+    def __get_free_speeds(self):
+        speed, target_speed = self.speed, self.target_speed
+
+        acceleration = numpy.where(
+            speed < target_speed, self.ideal_acc,
+            numpy.where(speed > target_speed, -self.ideal_acc, 0.0))
+        new_speed = numpy.where(
+            acceleration > 0,
+            numpy.minimum(speed + acceleration, target_speed),
+            numpy.maximum(speed + acceleration, target_speed))
+        return self.__clip(new_speed)
+
+    def __get_following_speeds(self):
+        speed, fronter_speed, gap = self.speed, self.fronter_speed, self.gap
+        ideal_distance = self.ideal_distance
+
+        accelerating = gap > ideal_distance
+        decelerating = ~accelerating & ((gap < ideal_distance) |
+                                        (fronter_speed < speed))
+        c = numpy.where(accelerating, 1.1,
+                        numpy.where(decelerating, -2.0, 0.0))
+        l = numpy.where(accelerating, 0.1, numpy.where(decelerating, 1.2, 0))
+        m = numpy.where(accelerating, 0.2, numpy.where(decelerating, 0.7, 0))
+
+        # Stops behind a stopped aircraft or when too close; the gaps of
+        # these aircraft are replaced so the power below is always defined
+        stopping = (fronter_speed <= 0) | (gap <= self.min_distance)
+        safe_gap = numpy.where(stopping | (gap <= 0), 1.0, gap)
+
+        acceleration = c * numpy.power(speed, m) * \
+            (numpy.abs(speed - fronter_speed) / numpy.power(safe_gap, l))
+        new_speed = self.__clip(speed + acceleration)
+        return numpy.where(stopping, 0.0, new_speed)
+
+    def __clip(self, speed):
+        return numpy.minimum(numpy.maximum(speed, 0.0), self.max_speed)
+
+    def update(self):
+        """Sets the next speed (with the speed uncertainty) onto each
+        aircraft.
+        """
+        next_speeds = self.get_next_speeds() + self.speed_uncertainty
+        for aircraft, speed in zip(self.aircrafts, next_speeds.tolist()):
+            aircraft.set_speed(speed)
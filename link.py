@@ -1,9 +1,12 @@
 """Class file for `Link`."""
 import random
+from bisect import bisect_left
+from copy import copy
+from itertools import accumulate
 from geopy.distance import vincenty
 
 from config import Config
-from id_generator import get_new_link_id
+from id_generator import get_new_link_id, get_interned_id
 from node import get_middle_node
 from utils import str2sha1
 # from surface import *
@@ -12,6 +15,10 @@ from utils import str2sha1
 class Link:
     """`Link` is one of the most important class in our link-node model which
     is represent a link composed by a list of nodes.
+
+    Links are never modified once built, so the itineraries (and their copies)
+    share the links of the routing table instead of cloning them; the mutable
+    parts of a route (delays and position) belong to `Itinerary`.
     """
 
     def __init__(self, name, nodes):
@@ -25,17 +32,33 @@ class Link:
         self.name = name
         self.nodes = nodes
         self.segment_lengths = [nodes[i].get_distance_to(nodes[i + 1]) for i in range(len(nodes) - 1)]
+        # segment_offsets[i] is the distance from the start to nodes[i]
+        self.segment_offsets = [0.0] + list(accumulate(self.segment_lengths))
         self.boundary = self.__calculate_boundary(nodes)
-        self.hash = str2sha1("%s#%s" % (self.name, self.nodes))
-        self.occupied = False
+        # The hash is assigned on first use since most links (e.g. reversed
+        # ones) are never put into a set or a dict
+        self.__hash = None
+
+    @property
+    def hash(self):
+        """Returns the ID of this link; links with the same name and nodes
+        share the same ID.
+        """
+        if self.__hash is None:
+            self.__hash = get_interned_id(
+                (self.name, tuple(node.hash for node in self.nodes)))
+        return self.__hash
+
+    def get_digest(self):
+        """Returns a hash value of this link which is stable across runs
+        (unlike `hash`), used for building cache keys.
+        """
+        return str2sha1("%s#%s" % (self.name, self.nodes))
 
     @property
     def length(self):
         """Returns the physical length of this link in feet."""
-        return sum(self.segment_lengths)
-
-    def refresh(self):
-        self.occupied = False
+        return self.segment_offsets[-1]
 
     @property
     def start(self):
@@ -51,7 +74,14 @@ class Link:
     def reverse(self):
         """Reverses the node orders, which means the start and end are switched.
         """
-        return type(self)(self.name, self.nodes[::-1])
+        # The segments and the boundary are the same, only in reverse order
+        reverse = copy(self)
+        reverse.nodes = self.nodes[::-1]
+        reverse.segment_lengths = self.segment_lengths[::-1]
+        reverse.segment_offsets = \
+            [0.0] + list(accumulate(reverse.segment_lengths))
+        reverse.__hash = None
+        return reverse
 
     def __calculate_boundary(self, nodes):
         """Returns the boundary nodes for the area the link formed """
@@ -148,12 +178,10 @@ class Link:
         if distance == 0.0:
             return self.nodes[0]
 
-        # Find the sub-link which the location (node) is on
-        length = 0.0
-        i = 0
-        while length < distance:
-            length += self.segment_lengths[i]
-            i += 1
+        # Find the sub-link which the location (node) is on, which is the
+        # first node at or after the distance
+        i = bisect_left(self.segment_offsets, distance)
+        length = self.segment_offsets[i]
         # Get the geo position of the location
         # i must greater than 0 because distance cannot be less than 0
         src, dst = self.nodes[i - 1], self.nodes[i]
@@ -180,6 +208,15 @@ class Link:
     def __ne__(self, other):
         return not self == other
 
+    def __setstate__(self, attrs):
+        self.__dict__.update(attrs)
+        # Links loaded from cache have the IDs of another run
+        self.__hash = None
+
+    def __deepcopy__(self, memo):
+        # Links are never modified so copies of an itinerary share them
+        return self
+
     def __repr__(self):
         return "<Link: " + self.name + ">"
 
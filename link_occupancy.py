@@ -0,0 +1,82 @@
+"""Class file for `LinkOccupancy`."""
+import itertools
+import math
+
+from sortedcontainers import SortedList
+
+
+class LinkOccupancy:
+    """`LinkOccupancy` is a persistent index of the aircraft on each link,
+    sorted by the distance they have travelled on it. It's kept in sync with
+    the ground by `update` so only the aircraft which moved since the last
+    update are re-indexed, instead of rebuilding the whole index every tick.
+
+    Aircraft at the same distance on a link are ordered by the time they were
+    first indexed, that is the order of the aircraft list of the airport.
+    """
+
+    def __init__(self):
+
+        # entries[link] = SortedList([(distance, seq, aircraft)])
+        self.entries = {}
+        # locations[aircraft] = (link, distance, seq)
+        self.locations = {}
+        self.seqs = {}
+        self.counter = itertools.count()
+
+    def update(self, aircraft):
+        """Re-indexes an aircraft if it's not at the indexed location anymore.
+        Aircraft which completed their itinerary are not indexed.
+        """
+        itinerary = aircraft.itinerary
+        if itinerary is None or itinerary.is_completed:
+            location = self.locations.get(aircraft)
+            if location is not None:
+                self.__discard(aircraft, location)
+            return
+
+        link, distance = itinerary.current_target, itinerary.current_distance
+        location = self.locations.get(aircraft)
+        if location is not None:
+            if location[0] == link and location[1] == distance:
+                return
+            self.__discard(aircraft, location)
+
+        seq = self.seqs.get(aircraft)
+        if seq is None:
+            seq = self.seqs[aircraft] = next(self.counter)
+
+        if link not in self.entries:
+            self.entries[link] = SortedList()
+        self.entries[link].add((distance, seq, aircraft))
+        self.locations[aircraft] = (link, distance, seq)
+
+    def remove(self, aircraft):
+        """Removes an aircraft leaving the ground from the index."""
+        location = self.locations.get(aircraft)
+        if location is not None:
+            self.__discard(aircraft, location)
+        self.seqs.pop(aircraft, None)
+
+    def __discard(self, aircraft, location):
+        link, distance, seq = location
+        entries = self.entries[link]
+        entries.remove((distance, seq, aircraft))
+        if not entries:
+            del self.entries[link]
+        del self.locations[aircraft]
+
+    def get_aircraft_ahead(self, link, distance=None):
+        """Returns an iterator of (distance, aircraft) of the aircraft on a
+        link, closest first, which are strictly ahead of the given distance
+        (or all of them if distance is None).
+        """
+        entries = self.entries.get(link)
+        if entries is None:
+            return iter(())
+        minimum = None if distance is None else (distance, math.inf)
+        return ((item_distance, item_aircraft) for item_distance, _, item_aircraft
+                in entries.irange(minimum))
+
+    def __len__(self):
+        return len(self.locations)
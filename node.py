@@ -1,13 +1,23 @@
 """Class file for `Node`."""
+import math
 from utils import is_valid_geo_pos, str2sha1
 from geopy.distance import vincenty
 from config import Config
-from id_generator import get_new_node_id
+from id_generator import get_new_node_id, get_interned_id
+from projection import get_active_projection
+from distance_matrix import get_active_distance_matrix
 
 
 class Node:
     """`Node` is one of the most important class in our link-node model where
     is represents a physical node in the aircraft surface.
+
+    If a projection is active when the node is created (that is, an airport
+    surface has been loaded in planar distance mode), the node caches its
+    planar coordinates `x` and `y` in feet, and the distance between two nodes
+    on the same projection is computed on the plane. Otherwise, the geodesic
+    distance is used. Closeness between two surface nodes is looked up from
+    the distance matrix of the surface.
     """
 
     def __init__(self, name, geo_pos):
@@ -20,12 +30,42 @@ class Node:
 
         self.name = name
         self.geo_pos = geo_pos
-        self.hash = str2sha1("%s#%.5f#%.5f" %
-                             (name, geo_pos["lat"], geo_pos["lng"]))
+        self.hash = self.__get_id()
+        self.__project()
+
+    def __get_id(self):
+        # Nodes with the same name at the same position (up to 5 decimals) are
+        # the same node
+        return get_interned_id((self.name, round(self.geo_pos["lat"], 5),
+                                round(self.geo_pos["lng"], 5)))
+
+    def get_digest(self):
+        """Returns a hash value of this node which is stable across runs
+        (unlike `hash`), used for building cache keys.
+        """
+        return str2sha1("%s#%.5f#%.5f" % (self.name, self.geo_pos["lat"],
+                                          self.geo_pos["lng"]))
+
+    def __project(self):
+        projection = get_active_projection()
+        if projection is not None and projection.covers(self.geo_pos):
+            self.projection = projection
+            self.x, self.y = projection.project(self.geo_pos["lat"],
+                                                self.geo_pos["lng"])
+        else:
+            self.projection, self.x, self.y = None, None, None
 
-    
     def get_distance_to(self, node):
         """Returns the distance from this node to another in feets."""
+        if self.projection is not None and \
+                self.projection is node.projection:
+            return round(math.hypot(self.x - node.x, self.y - node.y),
+                         Config.DECIMAL_ROUND)
+        return self.get_geodesic_distance_to(node)
+
+    def get_geodesic_distance_to(self, node):
+        """Returns the geodesic distance from this node to another in feets.
+        """
         this_node = self.geo_pos
         another_node = node.geo_pos
         distance = vincenty(
@@ -34,29 +74,51 @@ class Node:
         )
         return round(distance.feet, Config.DECIMAL_ROUND)
 
+    def is_within(self, node, threshold):
+        """Returns true if the distance to another node is less than
+        `threshold` feet. On the plane, the squared distance is compared so no
+        square root is taken.
+        """
+        distance_matrix = get_active_distance_matrix()
+        if distance_matrix is not None:
+            is_close = distance_matrix.is_close(self, node, threshold)
+            if is_close is not None:
+                return is_close
+
+        if self.projection is not None and \
+                self.projection is node.projection:
+            d_x, d_y = self.x - node.x, self.y - node.y
+            return d_x * d_x + d_y * d_y < threshold * threshold
+        return self.get_geodesic_distance_to(node) < threshold
+
     def is_close_to(self, node):
         """If the node is in CLOSE_NODE_THRESHOLD_FEET feet from the current
         node, we take them as the same node.
         """
-        distance_feet = self.get_distance_to(node)
         threshold = Config.params["simulation"]["close_node_threshold"]
-        return distance_feet < threshold
+        return self.is_within(node, threshold)
 
     def is_close_to_gate(self, node):
         """If the node is in CLOSE_NODE_THRESHOLD_FEET feet from the current
         node, we take them as the same node.
         """
-        distance_feet = self.get_distance_to(node)
         threshold = Config.params["simulation"]["close_node_threshold"]
-        return distance_feet < threshold
+        return self.is_within(node, threshold)
 
     def is_close_to_plan(self, node):
         """If the node is in CLOSE_NODE_THRESHOLD_FEET feet from the current
         node, we take them as the same node.
         """
-        distance_feet = self.get_distance_to(node)
         threshold = Config.params["scheduler"]["conflict_threshold"]
-        return distance_feet < threshold
+        return self.is_within(node, threshold)
+
+    def __setstate__(self, attrs):
+        self.__dict__.update(attrs)
+        # Nodes loaded from cache have the IDs of another run
+        self.hash = self.__get_id()
+        # Nodes loaded from cache may be projected in another mode
+        if self.__dict__.get("projection") is not get_active_projection():
+            self.__project()
 
     def __hash__(self):
         return self.hash
@@ -73,26 +135,64 @@ class Node:
                                      self.geo_pos["lng"])
 
 
+class Position:
+    """`Position` is a point on the surface which is not a node of the
+    link-node model, like the location of an aircraft in the middle of a link.
+    It offers the same distance methods as `Node` but has no name and no hash
+    value, so creating one on every tick is cheap. Positions are immutable and
+    compared by identity.
+    """
+
+    __slots__ = ("geo_pos", "projection", "x", "y")
+
+    # Positions are never indexed by the distance matrix
+    hash = None
+
+    def __init__(self, lat, lng):
+
+        set_attr = super().__setattr__
+        set_attr("geo_pos", {"lat": lat, "lng": lng})
+
+        projection = get_active_projection()
+        if projection is not None and projection.covers(self.geo_pos):
+            x, y = projection.project(lat, lng)
+        else:
+            projection, x, y = None, None, None
+        set_attr("projection", projection)
+        set_attr("x", x)
+        set_attr("y", y)
+
+    get_distance_to = Node.get_distance_to
+    get_geodesic_distance_to = Node.get_geodesic_distance_to
+    is_within = Node.is_within
+    is_close_to = Node.is_close_to
+    is_close_to_gate = Node.is_close_to_gate
+    is_close_to_plan = Node.is_close_to_plan
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Position is immutable")
+
+    def __getstate__(self):
+        return self.geo_pos["lat"], self.geo_pos["lng"]
+
+    def __setstate__(self, state):
+        self.__init__(*state)
+
+    def __repr__(self):
+        return "<Position: %f,%f>" % (self.geo_pos["lat"],
+                                      self.geo_pos["lng"])
+
+
 def get_middle_node(src, dst, ratio=None):
-    """Gets the middle node m between two nodes with a given `ratio` where
+    """Gets the position m between two nodes with a given `ratio` where
     |src-m| / |dst-src| is `ratio`. If the `ratio` is None, 0.5 is used as the
     ratio.
     """
 
-    if ratio is None:
-        return Node(
-            "MIDDLE_NODE", {
-                "lat": (src.geo_pos["lat"] + dst.geo_pos["lat"]) / 2,
-                "lng": (src.geo_pos["lng"] + dst.geo_pos["lng"]) / 2
-            }
-        )
-
     lat1, lat2 = src.geo_pos["lat"], dst.geo_pos["lat"]
     lng1, lng2 = src.geo_pos["lng"], dst.geo_pos["lng"]
 
-    return Node(
-        "RATIO_MIDDLE_NODE", {
-            "lat": lat1 + (lat2 - lat1) * ratio,
-            "lng": lng1 + (lng2 - lng1) * ratio
-        }
-    )
+    if ratio is None:
+        return Position((lat1 + lat2) / 2, (lng1 + lng2) / 2)
+
+    return Position(lat1 + (lat2 - lat1) * ratio, lng1 + (lng2 - lng1) * ratio)
@@ -0,0 +1,97 @@
+"""`Projection` maps geo positions onto a local tangent plane (east-north-up,
+ENU) of an airport so that distances between nodes can be computed with plain
+arithmetic instead of solving the geodesic problem on every call. The plane is
+accurate to a small fraction of a foot within the few miles an airport covers.
+
+The active projection is set once when a surface is loaded, and the nodes
+created afterwards cache their planar coordinates in feet.
+"""
+import math
+
+# WGS-84 ellipsoid (the same one used by geopy)
+WGS84_A = 6378137.0
+WGS84_F = 1 / 298.257223563
+WGS84_E2 = WGS84_F * (2 - WGS84_F)
+
+FEET_PER_METER = 3.28083989501
+
+# Nodes further than this from the origin (in either latitude or longitude)
+# are not projected; the geodesic distance is used for them instead.
+MAX_RANGE_DEGREES = 0.25
+
+
+class Projection:
+    """`Projection` is a local tangent plane centered at `origin`. Use
+    `get_projection` instead of the constructor so that nodes projected on the
+    same origin share the same `Projection` object (even after being pickled
+    or copied), which is how nodes check if their coordinates are comparable.
+    """
+
+    def __init__(self, lat, lng):
+
+        self.lat = lat
+        self.lng = lng
+
+        self.origin = self.__to_ecef(lat, lng)
+
+        phi, lam = math.radians(lat), math.radians(lng)
+        self.sin_phi, self.cos_phi = math.sin(phi), math.cos(phi)
+        self.sin_lam, self.cos_lam = math.sin(lam), math.cos(lam)
+
+    @classmethod
+    def __to_ecef(cls, lat, lng):
+        phi, lam = math.radians(lat), math.radians(lng)
+        sin_phi, cos_phi = math.sin(phi), math.cos(phi)
+        radius = WGS84_A / math.sqrt(1 - WGS84_E2 * sin_phi * sin_phi)
+        return (radius * cos_phi * math.cos(lam),
+                radius * cos_phi * math.sin(lam),
+                radius * (1 - WGS84_E2) * sin_phi)
+
+    def project(self, lat, lng):
+        """Returns the (x, y) coordinates in feet of a geo position where x
+        points to the east and y points to the north.
+        """
+        x, y, z = self.__to_ecef(lat, lng)
+        dx, dy, dz = x - self.origin[0], y - self.origin[1], z - self.origin[2]
+        east = -self.sin_lam * dx + self.cos_lam * dy
+        north = -self.sin_phi * self.cos_lam * dx \
+            - self.sin_phi * self.sin_lam * dy + self.cos_phi * dz
+        return east * FEET_PER_METER, north * FEET_PER_METER
+
+    def covers(self, geo_pos):
+        """Returns true if the given geo position is close enough to the
+        origin for the plane to be accurate.
+        """
+        return abs(geo_pos["lat"] - self.lat) < MAX_RANGE_DEGREES and \
+            abs(geo_pos["lng"] - self.lng) < MAX_RANGE_DEGREES
+
+    def __reduce__(self):
+        return (get_projection, (self.lat, self.lng))
+
+    def __repr__(self):
+        return "<Projection: %f,%f>" % (self.lat, self.lng)
+
+
+_PROJECTIONS = {}
+_ACTIVE_PROJECTION = None
+
+
+def get_projection(lat, lng):
+    """Returns the projection centered at the given position."""
+    key = (lat, lng)
+    if key not in _PROJECTIONS:
+        _PROJECTIONS[key] = Projection(lat, lng)
+    return _PROJECTIONS[key]
+
+
+def set_active_projection(projection):
+    """Sets the projection used by the nodes created from now on. Passing None
+    makes the nodes fall back to the geodesic distance.
+    """
+    global _ACTIVE_PROJECTION
+    _ACTIVE_PROJECTION = projection
+
+
+def get_active_projection():
+    """Returns the projection used by newly created nodes."""
+    return _ACTIVE_PROJECTION
@@ -36,6 +36,16 @@ class RampController:
         self.spot_queue[spot].append(aircraft)
         self.spot_gate_queue[spot].append(gate)
 
+    def snapshot(self):
+        """Returns the spot queues to be restored by `restore`."""
+        return ({spot: tuple(queue) for spot, queue in self.spot_queue.items()},
+                {spot: tuple(queue) for spot, queue in self.spot_gate_queue.items()})
+
+    def restore(self, snapshot):
+        spot_queue, spot_gate_queue = snapshot
+        self.spot_queue = {spot: deque(queue) for spot, queue in spot_queue.items()}
+        self.spot_gate_queue = {spot: deque(queue) for spot, queue in spot_gate_queue.items()}
+
     def spot_occupied(self, spot):
         if not self.spot_queue.get(spot, None):
             return False
@@ -0,0 +1,83 @@
+"""Class file for `ReservationTable`."""
+import heapq
+import itertools
+
+from sortedcontainers import SortedList
+
+
+class ReservationTable:
+    """`ReservationTable` keeps the time intervals in which the resources of
+    the surface (links and nodes) are reserved by the planned aircraft. A
+    resource can be held by a single aircraft at a time, so the intervals of a
+    resource never overlap and whether a new interval is free is answered by
+    looking at the one interval starting right before it ends.
+
+    Intervals are half-open, [start, end), in simulation seconds.
+    """
+
+    def __init__(self):
+
+        # intervals[resource] = SortedList([(start, end, owner)])
+        self.intervals = {}
+        # Heap of (end, seq, resource, interval) for releasing the past ones
+        self.expiry = []
+        self.counter = itertools.count()
+        # owned[owner] = [(resource, interval)]
+        self.owned = {}
+        self.size = 0
+
+    def is_free(self, resource, start, end):
+        """Returns True if no interval of a resource overlaps [start, end)."""
+        intervals = self.intervals.get(resource)
+        if not intervals:
+            return True
+        # The first interval starting at or after the end
+        index = intervals.bisect_left((end,))
+        return index == 0 or intervals[index - 1][1] <= start
+
+    def reserve(self, resource, start, end, owner):
+        """Reserves a resource in [start, end) for an owner; the interval has
+        to be free.
+        """
+        if end <= start:
+            return
+        if resource not in self.intervals:
+            self.intervals[resource] = SortedList()
+        interval = (start, end, owner)
+        self.intervals[resource].add(interval)
+        heapq.heappush(self.expiry,
+                       (end, next(self.counter), resource, interval))
+        self.owned.setdefault(owner, []).append((resource, interval))
+        self.size += 1
+
+    def release_before(self, time):
+        """Releases the intervals ending at or before the given time."""
+        expiry = self.expiry
+        while expiry and expiry[0][0] <= time:
+            _, _, resource, interval = heapq.heappop(expiry)
+            self.__discard(resource, interval)
+            # The intervals of an owner are reserved in time order
+            owner = interval[2]
+            items = self.owned.get(owner)
+            if items is not None and items[-1][1] is interval:
+                del self.owned[owner]
+
+    def release(self, owner):
+        """Releases all the intervals of an owner, e.g. an aircraft which
+        reached its destination earlier than planned.
+        """
+        for resource, interval in self.owned.pop(owner, ()):
+            self.__discard(resource, interval)
+
+    def __discard(self, resource, interval):
+        # An interval released by its owner is still in the expiry heap
+        intervals = self.intervals.get(resource)
+        if intervals is None or interval not in intervals:
+            return
+        intervals.remove(interval)
+        if not intervals:
+            del self.intervals[resource]
+        self.size -= 1
+
+    def __len__(self):
+        return self.size
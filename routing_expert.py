@@ -1,9 +1,14 @@
 """Class file for `RoutingExpert`."""
+import heapq
 import logging
 import cache
 
+from array import array
+
+from config import Config
 from link import Link
 from route import Route
+from spatial_index import SpatialIndex
 from surface import Runway, Spot, Gate, RunwayNode
 
 
@@ -14,8 +19,9 @@ SAVE_GRAPH = False
 class RoutingExpert:
     """`RoutingExpert` contains the knownledge of providing routes between any
     two nodes in the airport surfact. It provides `get_shortest_route`
-    interface for the scheduler to use for providing itineraries. The routes
-    are precomputed and cached per airport.
+    interface for the scheduler to use for providing itineraries. A shortest
+    path tree toward each runway and gate node is precomputed and cached per
+    airport, and `Route` objects are only built when they are requested.
     """
 
     def __init__(self, links, nodes, enable_cache):
@@ -49,16 +55,18 @@ class RoutingExpert:
 
     def __build_or_load_routes(self):
 
-        hash_key = cache.get_hash(self.links, self.nodes)
+        hash_key = "routes-" + cache.get_hash(self.links, self.nodes)
         cached = cache.get(hash_key)
 
         if cached:
-            (self.depart_routing_table, self.arrival_routing_table) = cached
+            (self.graph, self.depart_routing_table,
+             self.arrival_routing_table) = cached
             self.logger.debug("Cached routing table is loaded")
         else:
             # Builds the routes
             self.__build_routes()
-            cache.put(hash_key, (self.depart_routing_table, self.arrival_routing_table))
+            cache.put(hash_key, (self.graph, self.depart_routing_table,
+                                 self.arrival_routing_table))
 
     def __build_routes(self):
         self.logger.debug("Starts building routes, # nodes: %d # links: %d",
@@ -74,13 +82,21 @@ class RoutingExpert:
         self.logger.debug("Starts linking existing links")
         self.__link_existing_links()
 
-        # Step 3: Applies SPFA to get shortest routes for all node pairs
-        self.logger.debug("Starts SPFA for finding shortest routes")
-        self.depart_routing_table = self.__finds_shortest_route_spfa(self.runway_nodes)
-        self.arrival_routing_table = self.__finds_shortest_route_spfa(self.gate_nodes)
+        # Step 3: Packs the adjacency map into a CSR graph
+        self.graph = RoutingGraph(self.adjacency_map)
+        del self.adjacency_map
+
+        # Step 4: Applies Dijkstra to get shortest routes toward every
+        # destination node
+        self.logger.debug("Starts Dijkstra for finding shortest routes")
+        self.depart_routing_table = self.__find_shortest_trees(
+            self.runway_nodes)
+        self.arrival_routing_table = self.__find_shortest_trees(
+            self.gate_nodes)
 
         # Prints result
-        self.print_depart_route(self.depart_routing_table)
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.print_depart_route(self.depart_routing_table)
         # TODO: print arrival route
         # self.print_route(self.arrival_routing_table)
 
@@ -95,8 +111,12 @@ class RoutingExpert:
     def __link_close_nodes(self):
         counter = 0
         close_node = []
-        for start in self.nodes:
-            for end in self.nodes:
+        # The node list contains duplicates since the link ends are appended
+        unique_nodes = list(dict.fromkeys(self.nodes))
+        threshold = Config.params["simulation"]["close_node_threshold"]
+        index = SpatialIndex.from_nodes(unique_nodes, threshold)
+        for start in unique_nodes:
+            for end in index.query(start, threshold):
                 if start != end and start.is_close_to(end):
                     link = Link("CLOSE_NODE_LINK", [start, end])
                     self.adjacency_map[start][end] = link
@@ -119,44 +139,11 @@ class RoutingExpert:
                 self.adjacency_map[start][end] = link
                 self.adjacency_map[end][start] = link.reverse
 
-    def __finds_shortest_route_spfa(self, dest_nodes):
+    def __find_shortest_trees(self, dest_nodes):
         routing_table = {}
-        for r in dest_nodes:
-            routing_table[r] = {}
-
-            for n in self.nodes:
-                if n == r:
-                    continue
-                routing_table[r][n] = Route(n, r, [])
-
-            candidates = CandidateNeighbors(r)
-
-            while candidates.length:
-                u = candidates.pop()
-
-                for v in self.adjacency_map[u]:
-                    new_distance = routing_table[r][u].distance + self.adjacency_map[u][v].length \
-                        if r != u else self.adjacency_map[u][v].length
-                    old_distance = routing_table[r][v].distance if r != v else 0
-                    if new_distance < old_distance:
-                        routing_table[r][v].reset_links()
-                        routing_table[r][v].add_link(self.adjacency_map[v][u])
-                        if r != u:
-                            routing_table[r][v].add_links(routing_table[r][u].links)
-
-                        self.logger.debug("%s -> %s -> %s is shorter than "
-                                          "%s -> %s", v, u, r, v, r)
-
-                        if not candidates.has(v):
-                            candidates.push(v)
-                            candidates.re_order(routing_table[r])
-
-            for node in self.nodes:
-                # r is in the routing table; some nodes could be unreachable
-                if node not in routing_table[r] or not len(routing_table[r][node].links):
-                    continue
-                if not routing_table[r][node].is_completed:
-                    raise Exception("Incomplete route found.")
+        for dest in dest_nodes:
+            dest_id = self.graph.node_ids[dest]
+            routing_table[dest] = self.graph.shortest_tree_to(dest_id)
         return routing_table
 
     def print_depart_route(self, routing_table):
@@ -167,7 +154,7 @@ class RoutingExpert:
                 if start == end:
                     continue
                 self.logger.debug("[%s - %s]", end, start)
-                route = routing_table[start][end]
+                route = self.__get_route(routing_table, end, start)
                 if route:
                     self.logger.debug(route.description)
                 else:
@@ -182,16 +169,25 @@ class RoutingExpert:
         """
         # GEO_MIDDLE_NORTH = {"lat": 37.122000, "lng": -122.079057}
         # SP1 = Spot("SP1", GEO_MIDDLE_NORTH)
-        if end in self.runway_nodes:
-            if start not in self.depart_routing_table[end]:
-                return None
-            return self.depart_routing_table[end][start]
+        if end in self.depart_routing_table:
+            return self.__get_route(self.depart_routing_table, start, end)
 
-        if end in self.gate_nodes:
-            return self.arrival_routing_table[end][start]
+        if end in self.arrival_routing_table:
+            return self.__get_route(self.arrival_routing_table, start, end)
 
         raise Exception("End node is not a runway node nor a gate node.")
 
+    def __get_route(self, routing_table, start, end):
+        """Materializes the route from `start` to `end` out of the shortest
+        path tree rooted at `end`. A new `Route` object is returned on every
+        call, so the caller is free to modify it.
+        """
+        start_id = self.graph.node_ids.get(start)
+        if start_id is None or start == end:
+            return None
+        links = self.graph.get_links(routing_table[end], start_id)
+        return Route(start, end, links)
+
     def __getstate__(self):
         attrs = dict(self.__dict__)
         del attrs["logger"]
@@ -205,56 +201,80 @@ class RoutingExpert:
         self.logger = logger
 
 
-class CandidateNeighbor:
-    def __init__(self, node):
-        self.node = node
-        self.next = None
-        self.prev = None
-
-
-class CandidateNeighbors:
-    def __init__(self, node):
-        self.tail = self.head = CandidateNeighbor(node)
-        self.set = {node}
-
-    def pop(self):
-        if not self.head:
-            return None
-
-        node, self.head = self.head.node, self.head.next
-        if self.head:
-            self.head.prev = None
-        else:
-            self.tail = None
-
-        self.set.remove(node)
-
-        return node
-
-    def push(self, node):
-        self.set.add(node)
-
-        if self.tail:
-            self.tail.next = CandidateNeighbor(node)
-            self.tail.next.prev = self.tail
-            self.tail = self.tail.next
-        else:
-            self.tail = self.head = CandidateNeighbor(node)
-
-    def has(self, node):
-        return node in self.set
-
-    @property
-    def length(self):
-        return len(self.set)
-
-    def re_order(self, routes):
-        if routes[self.tail.node].distance < routes[self.head.node].distance:
-            front, self.head = self.head.node, self.head.next
-            if self.head:
-                self.head.prev = None
+class RoutingGraph:
+    """`RoutingGraph` is a compact form of the adjacency map used for finding
+    shortest routes. Nodes are interned into integer ids and the edges are
+    stored in compressed sparse row (CSR) arrays. Edges are reversed: row `u`
+    lists every node `v` having a link `v -> u`, so that a single Dijkstra run
+    from a destination node yields the shortest routes from all the other
+    nodes toward it.
+    """
 
-            self.push(front)
+    def __init__(self, adjacency_map):
+
+        # Interns the nodes into integer ids
+        self.nodes = list(adjacency_map.keys())
+        self.node_ids = {node: i for i, node in enumerate(self.nodes)}
+
+        incoming = [[] for _ in self.nodes]
+        for src, dsts in adjacency_map.items():
+            src_id = self.node_ids[src]
+            for dst, link in dsts.items():
+                incoming[self.node_ids[dst]].append((src_id, link))
+
+        # indptr[u]:indptr[u + 1] is the range of the edges toward u
+        self.indptr = array("i", [0])
+        # For each edge e: v -> u, indices[e] is v, heads[e] is u
+        self.indices = array("i")
+        self.heads = array("i")
+        self.weights = array("d")
+        self.links = []
+
+        for dst_id, edges in enumerate(incoming):
+            for src_id, link in edges:
+                self.indices.append(src_id)
+                self.heads.append(dst_id)
+                self.weights.append(link.length)
+                self.links.append(link)
+            self.indptr.append(len(self.indices))
+
+    def shortest_tree_to(self, dest_id):
+        """Runs a binary-heap Dijkstra toward `dest_id` and returns the
+        shortest path tree as an array storing the edge to take from each node
+        (-1 if the node is the destination or it is unreachable).
+        """
+        n_nodes = len(self.nodes)
+        distances = [float("Inf")] * n_nodes
+        next_edges = array("i", [-1]) * n_nodes
+        indptr, indices, weights = self.indptr, self.indices, self.weights
+
+        distances[dest_id] = 0.0
+        heap = [(0.0, dest_id)]
+        while heap:
+            distance, u = heapq.heappop(heap)
+            if distance > distances[u]:
+                # Stale entry, a shorter one has been popped before
+                continue
+            for e in range(indptr[u], indptr[u + 1]):
+                v = indices[e]
+                new_distance = distance + weights[e]
+                if new_distance < distances[v]:
+                    distances[v] = new_distance
+                    next_edges[v] = e
+                    heapq.heappush(heap, (new_distance, v))
+
+        return next_edges
+
+    def get_links(self, next_edges, start_id):
+        """Returns the links on the path from `start_id` to the root of the
+        shortest path tree `next_edges`.
+        """
+        links = []
+        e = next_edges[start_id]
+        while e != -1:
+            links.append(self.links[e])
+            e = next_edges[self.heads[e]]
+        return links
 
 
 def save_graph(nodes, links):
@@ -3,8 +3,10 @@ import os
 import json
 import logging
 
-from utils import str2time
+from utils import str2seconds
+from bisect import bisect_left
 from flight import ArrivalFlight, DepartureFlight
+from clock import Clock
 from config import Config
 from sortedcontainers import SortedList
 
@@ -24,11 +26,44 @@ class Scenario:
         self.arrivals = arrivals
         self.departures = departures
         self.__build_lookup_table()
+        self.__build_appearance_table()
 
     def __build_lookup_table(self):
         self.flight_table = {}
         for flight in self.arrivals + self.departures:
-            self.flight_table[flight.aircraft] = flight
+            self.flight_table[flight.callsign] = flight
+
+    def __build_appearance_table(self):
+        # {tick: [flight]} where the flights appear in the tick, in the order
+        # of their appear time
+        self.sim_time = Config.params["simulation"]["time_unit"]
+        self.arrival_buckets = self.__bucket(self.arrivals)
+        self.departure_buckets = self.__bucket(self.departures)
+        self.appearance_ticks = sorted(set(self.arrival_buckets) |
+                                       set(self.departure_buckets))
+
+    def __bucket(self, flights):
+        buckets = {}
+        for flight in flights:
+            tick = self.get_tick(flight.appear_time)
+            buckets.setdefault(tick, []).append(flight)
+        return buckets
+
+    def get_tick(self, time):
+        """Gets the number of the tick (counted from `Clock.START_TIME`) which
+        covers the given time.
+        """
+        return (time - Clock.START_TIME) // self.sim_time
+
+    def get_arrivals_at(self, now):
+        """Gets the arrival flights appearing in the tick starting at `now`."""
+        return self.arrival_buckets.get(self.get_tick(now), ())
+
+    def get_departures_at(self, now):
+        """Gets the departure flights appearing in the tick starting at
+        `now`.
+        """
+        return self.departure_buckets.get(self.get_tick(now), ())
 
     def __repr__(self):
         n_flights = len(self.arrivals) + len(self.departures)
@@ -36,7 +71,20 @@ class Scenario:
 
     def get_flight(self, aircraft):
         """Gets a flight of a given aircraft."""
-        return self.flight_table[aircraft]
+        return self.flight_table[aircraft.callsign]
+
+    def get_next_appear_time(self, now):
+        """Gets the earliest appear time of the flights appearing at or after
+        `now`, or None if there's no more flight.
+        """
+        index = bisect_left(self.appearance_ticks, self.get_tick(now))
+        if index == len(self.appearance_ticks):
+            return None
+        tick = self.appearance_ticks[index]
+        return min(flights[tick][0].appear_time
+                   for flights in [self.arrival_buckets,
+                                   self.departure_buckets]
+                   if tick in flights)
 
     def print_stats(self):
         """Prints the statistics of this scenario."""
@@ -63,7 +111,7 @@ class Scenario:
         """Sets this object into quiet mode where less logs are printed."""
         self.logger = logger
         for flight in self.departures:
-            flight.aircraft.set_quiet(logger)
+            flight.set_quiet(logger)
 
     @classmethod
     def create(cls, name, surface):
@@ -87,8 +135,8 @@ class Scenario:
                 arrival["model"],
                 arrival["airport"],
                 surface.get_node(arrival["gate"]),
-                str2time(arrival["time"]),
-                str2time(arrival["appear_time"])
+                str2seconds(arrival["time"]),
+                str2seconds(arrival["appear_time"])
             ))
 
         # Parse departure flights into the array
@@ -99,8 +147,8 @@ class Scenario:
                 departure["model"],
                 departure["airport"],
                 surface.get_node(departure["gate"]),
-                str2time(departure["time"]),
-                str2time(departure["appear_time"])
+                str2seconds(departure["time"]),
+                str2seconds(departure["appear_time"])
             ))
 
         return Scenario(arrivals, departures)
\ No newline at end of file
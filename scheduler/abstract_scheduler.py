@@ -1,7 +1,6 @@
 """Class file for the deterministic `AbstractScheduler`."""
 import logging
 
-from copy import deepcopy
 from itinerary import Itinerary
 from flight import ArrivalFlight, DepartureFlight
 from surface import Spot
@@ -70,7 +69,8 @@ class AbstractScheduler:
             trimmed_route(route, src)
 
         # Merge the new itinerary with the part of link the aircraft is going to pass
-        new_route = deepcopy(route.links) if route else None
+        # (the links of a route are shared with the routing table)
+        new_route = route.links if route else None
         distance = 0
         if aircraft.itinerary:
             unfinished_link, unfinished_distance = \
@@ -24,15 +24,13 @@ class Scheduler(AbstractScheduler):
         itineraries = {}
         priority_list = {}
 
-        # Assigns route per aircraft without any separation constraint
-        for aircraft in simulation.airport.aircrafts:
+        # Assigns route per aircraft without any separation constraint; only
+        # the new aircraft are looked at
+        for aircraft in simulation.airport.aircrafts_to_schedule:
             # NOTE: Itinerary objects are newly created the reference of these
             # object will be used in other objects; however, be ware that the
             # object will be shared instead of being cloned in the later
             # phases.
-            print("simulation.airport.aircrafts", aircraft)
-            if aircraft.itinerary is not None:
-                continue
             itinerary = self.schedule_aircraft(aircraft, simulation)
             itineraries[aircraft] = itinerary
             aircraft.set_itinerary(itinerary)
@@ -43,10 +41,13 @@ class Scheduler(AbstractScheduler):
                 cur_flight.arrival_time
             priority_list[aircraft.callsign] = calltime
 
-        # Resolves conflicts
-        # schedule, priority = self.__resolve_conflicts(itineraries, simulation,
-        #                                               priority_list)
-        schedule, priority = Schedule(itineraries, 0, 0), priority_list
+        # Resolves conflicts; otherwise the routes are applied as they are and
+        # the controllers keep the aircraft apart
+        if Config.params["scheduler"]["resolve_conflicts"]:
+            schedule, priority = self.__resolve_conflicts(
+                itineraries, simulation, priority_list)
+        else:
+            schedule, priority = Schedule(itineraries, 0, 0), priority_list
         # schedule, priority = self.__schedule(itineraries, simulation,priority_list)
 
         self.logger.info("Scheduling end")
@@ -75,22 +76,30 @@ class Scheduler(AbstractScheduler):
 
     def __resolve_conflicts(self, itineraries, simulation, priority_list):
 
+        if Config.params["scheduler"]["incremental_resolution"]:
+            return self.__resolve_conflicts_incrementally(
+                itineraries, simulation, priority_list)
+
         # Gets configuration parameters
-        (tick_times, max_attempt) = self.__get_params()
+        (tick_times, max_attempt) = self.__get_params(simulation)
 
         # Setups variables
         attempts = {}  # attempts[conflict] = count
         unsolvable_conflicts = set()
 
+        # Creates simulation copy for prediction; it's rolled back to this
+        # snapshot for every attempt instead of being copied again
+        self.__reset_itineraries(itineraries)
+        predict_simulation = simulation.copy
+        predict_simulation.airport.apply_schedule(Schedule(itineraries, 0, 0))
+        start_snapshot = predict_simulation.snapshot()
+
         while True:
 
-            # Resets the itineraries (set their state to start node)
+            # Resets the itineraries (set their state to start node) and the
+            # predicted states
             self.__reset_itineraries(itineraries)
-
-            # Creates simulation copy for prediction
-            predict_simulation = simulation.copy
-            predict_simulation.airport.apply_schedule(
-                Schedule(itineraries, 0, 0))
+            predict_simulation.restore(start_snapshot)
 
             for i in range(tick_times):
 
@@ -129,6 +138,7 @@ class Scheduler(AbstractScheduler):
 
                 if i == tick_times - 1:
                     # Done, conflicts are all handled, return the schedule
+                    predict_simulation.restore(start_snapshot)
                     self.__reset_itineraries(itineraries)
                     return Schedule(
                         itineraries,
@@ -141,14 +151,115 @@ class Scheduler(AbstractScheduler):
                 predict_simulation.tick()
                 predict_simulation.post_tick()
 
+    def __resolve_conflicts_incrementally(self, itineraries, simulation,
+                                          priority_list):
+        """Resolves the conflicts like `__resolve_conflicts` but without
+        predicting from the first tick again after each delay added.
+
+        The predicted state is checkpointed at the start of every tick. A delay
+        is added at the head of the itinerary of an aircraft so it changes the
+        prediction from the tick that aircraft started to follow its itinerary
+        on; the prediction is resumed from the checkpoint of that tick since
+        the ticks before it would be predicted the same again. Delays on the
+        aircraft which started at the tick of the conflict take effect right
+        away, so the other conflicts of that tick are resolved in the same
+        prediction. The delays added and the schedule are the same as the
+        ones of `__resolve_conflicts`.
+        """
+
+        # Gets configuration parameters
+        (tick_times, max_attempt) = self.__get_params(simulation)
+
+        # Setups variables
+        attempts = {}  # attempts[conflict] = count
+        unsolvable_conflicts = set()
+        checkpoints = []  # checkpoints[i] = predicted state at the tick i
+        start_ticks = {}  # start_ticks[aircraft] = first tick on the ground
+
+        self.__reset_itineraries(itineraries)
+        predict_simulation = simulation.copy
+        predict_simulation.airport.apply_schedule(Schedule(itineraries, 0, 0))
+
+        i = 0
+        while True:
+
+            if i == len(checkpoints):
+                checkpoints.append(predict_simulation.snapshot())
+
+            # Adds aircraft
+            predict_simulation.pre_tick(self)
+
+            # Check if all aircraft has an itinerary, if not, assign one
+            self.__schedule_new_aircrafts(simulation, predict_simulation,
+                                          itineraries, priority_list)
+            predict_simulation.airport.apply_priority(priority_list)
+            for aircraft in predict_simulation.airport.aircrafts:
+                start_ticks.setdefault(aircraft, i)
+
+            # Resolves the conflicts in current state until a delay changes
+            # the ticks predicted before
+            resume_tick = None
+            while resume_tick is None:
+                conflict = self.__get_conflict_to_solve(
+                    predict_simulation.airport.next_conflicts,
+                    unsolvable_conflicts
+                )
+                if conflict is None:
+                    break
+                try:
+                    aircraft = self.__resolve_conflict(
+                        itineraries, conflict, attempts, max_attempt)
+                except ConflictException as error:
+                    # The conflict isn't able to be solved, skip it; the last
+                    # delay added for it is kept
+                    unsolvable_conflicts.add(conflict)
+                    self.logger.warning("Gave up solving %s", conflict)
+                    aircraft = error.aircraft
+                    if aircraft is None:
+                        continue
+                if start_ticks[aircraft] < i:
+                    resume_tick = start_ticks[aircraft]
+
+            if resume_tick is not None:
+                # Rolls back to the tick the delayed aircraft started at
+                self.__reset_itineraries(itineraries)
+                predict_simulation.restore(checkpoints[resume_tick])
+                del checkpoints[resume_tick + 1:]
+                start_ticks = {aircraft: tick for aircraft, tick
+                               in start_ticks.items() if tick < resume_tick}
+                i = resume_tick
+                continue
+
+            if i == tick_times - 1:
+                # Done, conflicts are all handled, return the schedule
+                predict_simulation.restore(checkpoints[0])
+                self.__reset_itineraries(itineraries)
+                return Schedule(
+                    itineraries,
+                    self.__get_n_delay_added(attempts),
+                    len(unsolvable_conflicts)
+                ), priority_list
+
+            # After dealing with the conflicts in current state, tick to
+            # next state
+            predict_simulation.tick()
+            predict_simulation.post_tick()
+            i += 1
+
     def __schedule_new_aircrafts(self, simulation, predict_simulation,
                                  itineraries, priority_list):
-        for aircraft in predict_simulation.airport.aircrafts:
+        airport = predict_simulation.airport
+        new_itineraries = {}
+        for aircraft in airport.aircrafts_to_schedule:
             if not aircraft.itinerary:
-                # Gets a new itinerary of this new aircraft
-                itinerary = self.schedule_aircraft(aircraft, simulation)
-                # Assigns this itinerary to this aircraft
-                aircraft.set_itinerary(itinerary)
+                if aircraft in itineraries:
+                    # Scheduled in a previous attempt (with its delays)
+                    itinerary = itineraries[aircraft]
+                    itinerary.reset()
+                else:
+                    # Gets a new itinerary of this new aircraft
+                    itinerary = self.schedule_aircraft(aircraft, simulation)
+                new_itineraries[aircraft] = itinerary
                 # Store a copy of the itinerary
                 itineraries[aircraft] = itinerary
             cur_flight = simulation.scenario.get_flight(aircraft)
@@ -159,6 +270,9 @@ class Scheduler(AbstractScheduler):
 
             priority_list[aircraft.callsign] = call_time
 
+        # Assigns the itineraries to the aircraft
+        airport.apply_schedule(Schedule(new_itineraries, 0, 0))
+
     def __resolve_conflict(self, itineraries, conflict, attempts,
                            max_attempt):
 
@@ -169,32 +283,31 @@ class Scheduler(AbstractScheduler):
 
         aircraft.add_scheduler_delay()
         itineraries[aircraft] = aircraft.itinerary
-        self.__mark_attempt(attempts, max_attempt, conflict, aircraft,
-                            itineraries)
+        self.__mark_attempt(attempts, max_attempt, conflict, aircraft)
         self.logger.info("Added delay on %s", aircraft)
+        return aircraft
 
-    def __mark_attempt(self, attempts, max_attempt, conflict, aircraft,
-                       itineraries):
+    def __mark_attempt(self, attempts, max_attempt, conflict, aircraft):
         attempts[conflict] = attempts.get(conflict, 0) + 1
         if attempts[conflict] >= max_attempt:
             self.logger.error("Found deadlock")
 
             self.logger.error(conflict.detailed_description)
 
-            import pdb
-            pdb.set_trace()
-            # Reverse the delay
-            itineraries[aircraft].restore()
-            # Forget the attempts
+            # Forget the attempts; the delays added are kept
             del attempts[conflict]
-            raise ConflictException("Too many attempts")
+            raise ConflictException("Too many attempts", aircraft)
 
     @classmethod
-    def __get_params(cls):
+    def __get_params(cls, simulation):
 
         rs_time = Config.params["simulation"]["reschedule_cycle"]
         sim_time = Config.params["simulation"]["time_unit"]
         tick_times = int(rs_time / sim_time) + 1
+        # The prediction doesn't tick past the end of the day
+        clock = simulation.clock
+        tick_times = min(tick_times,
+                         (clock.end_time - clock.now) // sim_time + 1)
         max_attempt = \
             Config.params["scheduler"]["max_resolve_conflict_attempt"]
 
@@ -235,5 +348,10 @@ class Scheduler(AbstractScheduler):
 
 
 class ConflictException(Exception):
-    """Extends `Exception` for the conflicts."""
-    pass
+    """Extends `Exception` for the conflicts. `aircraft` is the aircraft
+    delayed before giving up the conflict, if any.
+    """
+
+    def __init__(self, message, aircraft=None):
+        super().__init__(message)
+        self.aircraft = aircraft
@@ -0,0 +1,192 @@
+"""Class file for the reservation `Scheduler`."""
+import heapq
+
+from itinerary import Itinerary
+from schedule import Schedule
+from config import Config
+from surface import PushbackWay
+from scheduler.abstract_scheduler import AbstractScheduler
+from flight import ArrivalFlight
+from reservation_table import ReservationTable
+
+
+class Scheduler(AbstractScheduler):
+    """The reservation scheduler implements the `AbstractScheduler` with
+    prioritized planning on a space-time reservation table. The new aircraft
+    are planned one by one, earliest call time first; each of them takes the
+    earliest route to its destination which doesn't use a link or a node in
+    the time it's reserved by an aircraft planned before, then reserves it.
+
+    Itineraries are conflict free by construction (at the nominal speeds of
+    the aircraft), so the scheduler doesn't tick a copy of the simulation and
+    its cost only grows with the number of new aircraft. As an itinerary can
+    only hold an aircraft before it starts moving, an aircraft waits at its
+    start node until a route is free, up to `max_reservation_wait` ticks; the
+    start node is reserved while it waits.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.reservations = ReservationTable()
+        # adjacency[node_id] = [(next_node_id, link)] of the routing graph
+        self.adjacency = None
+
+    def schedule(self, simulation):
+
+        self.logger.info("Scheduling start")
+        itineraries = {}
+        priority_list = {}
+        n_delay_added, n_unsolvable = 0, 0
+
+        airport = simulation.airport
+        now = simulation.now
+        self.reservations.release_before(now)
+        for aircraft in airport.completed_aircrafts:
+            self.reservations.release(aircraft.callsign)
+
+        new_aircrafts = []
+        for aircraft in airport.aircrafts_to_schedule:
+            flight = simulation.scenario.get_flight(aircraft)
+            if type(flight) is ArrivalFlight:
+                call_time = flight.arrival_time
+            else:
+                call_time = flight.departure_time
+            priority_list[aircraft.callsign] = call_time
+            new_aircrafts.append((call_time, aircraft.callsign, aircraft))
+
+        # Prioritized planning: the aircraft called earlier goes first
+        for _, _, aircraft in sorted(new_aircrafts, key=lambda x: x[:2]):
+            planned = self.__plan_aircraft(aircraft, simulation)
+            if planned is None:
+                # Falls back to the shortest route without reservation
+                self.logger.warning("No reservation found for %s", aircraft)
+                itinerary = self.schedule_aircraft(aircraft, simulation)
+                n_unsolvable += 1
+            else:
+                links, n_wait = planned
+                itinerary = Itinerary(links)
+                for _ in range(n_wait):
+                    itinerary.add_scheduler_delay()
+                n_delay_added += n_wait
+            itineraries[aircraft] = itinerary
+            aircraft.set_itinerary(itinerary)
+
+        self.logger.info("Scheduling end")
+        return Schedule(itineraries, n_delay_added, n_unsolvable), \
+            priority_list
+
+    def __plan_aircraft(self, aircraft, simulation):
+        """Finds the earliest free route of an aircraft and reserves it.
+        Returns (links, number of ticks to wait), or None if there's no free
+        route within the maximum wait.
+        """
+        graph = simulation.routing_expert.graph
+        if self.adjacency is None:
+            self.adjacency = self.__build_adjacency(graph)
+
+        flight = simulation.scenario.get_flight(aircraft)
+        if type(flight) is ArrivalFlight:
+            dst = flight.to_gate
+        else:
+            dst = flight.runway.start
+        src_id = graph.node_ids.get(aircraft.location)
+        dst_id = graph.node_ids.get(dst)
+        if src_id is None or dst_id is None or src_id == dst_id:
+            return None
+
+        sim_time = simulation.clock.sim_time
+        max_wait = Config.params["scheduler"]["max_reservation_wait"]
+        buffer = Config.params["scheduler"]["reservation_buffer"] * sim_time
+        # A new itinerary starts with a hold, the aircraft moves a tick later
+        start_time = simulation.now + sim_time
+        for n_wait in range(max_wait + 1):
+            departure_time = start_time + n_wait * sim_time
+            # The aircraft holds at its start node until it leaves; waiting
+            # longer won't help if another aircraft passes by meanwhile
+            if not self.reservations.is_free(graph.nodes[src_id],
+                                             simulation.now,
+                                             departure_time + buffer):
+                break
+            path = self.__find_path(graph, src_id, dst_id, aircraft.profile,
+                                    departure_time, sim_time)
+            if path is not None:
+                self.reservations.reserve(graph.nodes[src_id], simulation.now,
+                                          departure_time + buffer,
+                                          aircraft.callsign)
+                self.__reserve(graph, path, aircraft.callsign, sim_time)
+                return [link for _, _, link, _ in path], n_wait
+        return None
+
+    def __find_path(self, graph, src_id, dst_id, profile, start_time,
+                    sim_time):
+        """Time-dependent Dijkstra from `src_id` leaving at `start_time`.
+        Returns the earliest arriving path as a list of (enter time, exit
+        time, link, end node id) or None if the destination isn't reachable
+        without entering a reserved link or node.
+        """
+        buffer = Config.params["scheduler"]["reservation_buffer"] * sim_time
+        times = {src_id: start_time}
+        parents = {}
+        heap = [(start_time, src_id)]
+
+        while heap:
+            time, u = heapq.heappop(heap)
+            if u == dst_id:
+                break
+            if time > times[u]:
+                # Stale entry, an earlier one has been popped before
+                continue
+            for v, link in self.adjacency[u]:
+                end = time + self.__get_duration(link, profile, sim_time)
+                if end >= times.get(v, float("Inf")):
+                    continue
+                if not self.reservations.is_free(
+                        self.__get_link_resource(link), time - buffer,
+                        end + buffer):
+                    continue
+                if not self.reservations.is_free(
+                        graph.nodes[v], end - buffer, end + buffer):
+                    continue
+                times[v] = end
+                parents[v] = (u, time, link)
+                heapq.heappush(heap, (end, v))
+        else:
+            return None
+
+        path = []
+        v = dst_id
+        while v != src_id:
+            u, time, link = parents[v]
+            path.append((time, times[v], link, v))
+            v = u
+        path.reverse()
+        return path
+
+    def __reserve(self, graph, path, owner, sim_time):
+        buffer = Config.params["scheduler"]["reservation_buffer"] * sim_time
+        for start, end, link, v in path:
+            self.reservations.reserve(self.__get_link_resource(link),
+                                      start - buffer, end + buffer, owner)
+            self.reservations.reserve(graph.nodes[v], end - buffer,
+                                      end + buffer, owner)
+
+    @classmethod
+    def __build_adjacency(cls, graph):
+        adjacency = [[] for _ in graph.nodes]
+        for e, link in enumerate(graph.links):
+            adjacency[graph.indices[e]].append((graph.heads[e], link))
+        return adjacency
+
+    @classmethod
+    def __get_duration(cls, link, profile, sim_time):
+        """Returns the nominal time in seconds to go through a link."""
+        if type(link) is PushbackWay:
+            speed = profile.pushback_speed
+        else:
+            speed = profile.ideal_speed
+        return link.length / speed * sim_time
+
+    @classmethod
+    def __get_link_resource(cls, link):
+        # A link and its reverse are the same piece of taxiway
+        return frozenset((link.start, link.end))
@@ -1,7 +1,7 @@
 """`Simulation` represents an airport simulation of a day on the given
-parameters. `ClonedSimulation` is designed to be an immutable delegate of a
-simulation that can be used for other objects to observe or predict the
-simulation states.
+parameters. `PredictionContext` is designed to be a delegate of a simulation
+that can be used for other objects to observe or predict the simulation
+states, and be rolled back to try again.
 """
 import time
 import logging
@@ -14,10 +14,11 @@ from airport import Airport
 from scenario import Scenario
 from routing_expert import RoutingExpert
 from analyst import Analyst
-from utils import get_seconds_after
+from utils import seconds2str
 from uncertainty import Uncertainty
 from config import Config
 from state_logger import StateLogger
+from id_generator import reset_interned_ids
 
 
 class Simulation:
@@ -36,6 +37,10 @@ class Simulation:
         # Setups the clock
         self.clock = Clock()
 
+        # Forgets the keys of the previous surface; ids keep increasing, so its
+        # nodes and links never equal the new ones
+        reset_interned_ids()
+
         # Sets up the airport
         airport_name = params["airport"]
         self.airport = Airport.create(airport_name)
@@ -65,6 +70,9 @@ class Simulation:
             # Sets up the state logger
             self.state_logger = StateLogger()
 
+        # Skips the ticks where nothing happens on the airport
+        self.event_driven = params["simulation"]["event_driven"]
+
         # Initializes the previous schedule time
         self.last_schedule_time = None
 
@@ -76,7 +84,10 @@ class Simulation:
     def tick(self):
         """Moves the states of this simulation to the next state."""
 
-        self.logger.debug("\nCurrent Time: %s", self.now)
+        if self.event_driven:
+            self.__skip_idle_ticks()
+
+        self.logger.debug("\nCurrent Time: %s", seconds2str(self.now))
 
         try:
 
@@ -152,10 +163,25 @@ class Simulation:
             self.logger.error(traceback.format_exc())
             raise error
 
+    def __skip_idle_ticks(self):
+        # Jumps to the tick of the next event; the clock stays on the same
+        # ticks as the fixed-step mode so the ticks afterwards are the same
+        sim_time = self.clock.sim_time
+        next_event_time = self.airport.get_next_event_time(
+            self.scenario, self.now, sim_time)
+        if next_event_time is None:
+            n_ticks = (self.clock.end_time - self.now) // sim_time
+        else:
+            n_ticks = (next_event_time - self.now) // sim_time
+        n_ticks = self.clock.skip(n_ticks)
+        if n_ticks > 0:
+            self.airport.skip_ticks(n_ticks)
+            self.logger.debug("Skipped %d idle ticks", n_ticks)
+
     def __is_time_to_reschedule(self):
         reschedule_cycle = Config.params["simulation"]["reschedule_cycle"]
         last_time = self.last_schedule_time
-        next_time = (get_seconds_after(last_time, reschedule_cycle)
+        next_time = (last_time + reschedule_cycle
                      if last_time is not None else None)
         return last_time is None or next_time <= self.now
 
@@ -196,38 +222,92 @@ class Simulation:
 
     @property
     def copy(self):
-        """Obtains a immutable copy of this simulation."""
+        """Obtains a prediction context of this simulation."""
         # NOTE: If uncertainty is not None, call inject() in tick().
-        return ClonedSimulation(self)
+        return PredictionContext(self)
+
 
+class PredictionContext:
+    """PredictionContext is a copy of a `Simulation` object for predicting its
+    future states. It shares the objects which are never changed (the surface
+    and its nodes and links, the links of the itineraries, the static maps of
+    the controllers and the scenario) with the source `Simulation` object and
+    only copies the aircraft, queues and controller states.
 
-class ClonedSimulation:
-    """ClonedSimulation is a copy of a `Simulation` object; however, it shares
-    objects with the source `Simulation` object on immutable data objects in
-    order to avoid the overhead in copying.
+    Instead of cloning the simulation again for every attempt, the caller
+    takes a `snapshot()` and rolls the prediction back with `restore()`.
     The `tick()` function is divided into `pre_tick`, `tick`, and `post_tick`
     to allow the called (mainly the scheduler) to inject operations in between.
     """
 
     def __init__(self, simulation):
 
+        memo = {}
+        for shared in self.__get_shared_objects(simulation.airport):
+            memo[id(shared)] = shared
+
         self.clock = deepcopy(simulation.clock)
-        self.airport = deepcopy(simulation.airport)
+        self.airport = deepcopy(simulation.airport, memo)
         self.scenario = copy(simulation.scenario)
 
+        # The simulation already added the aircraft of this tick
+        self.start_time = self.clock.now
+
         # Sets up the logger in quiet mode
         self.logger = logging.getLogger("QUIET_MODE")
-        self.airport.set_quiet(self.logger)
+        self.airport.set_quiet(self.logger, surface=False)
         self.scenario.set_quiet(self.logger)
 
+    @classmethod
+    def __get_shared_objects(cls, airport):
+        # Links are shared by themselves (see `Link.__deepcopy__`)
+        surface = airport.surface
+        yield surface
+        yield from surface.nodes
+
+        intersection_control = airport.intersection_control
+        yield intersection_control.intersection_list
+        yield intersection_control.intersection_link_map
+        yield intersection_control.node_map
+
+        terminal_controller = airport.terminal_controller
+        yield terminal_controller.gate_2_terminal_spot_id
+        yield terminal_controller.terminal_spot_id_2_spot
+
+    def snapshot(self):
+        """Returns the current state of the prediction. Snapshots are taken
+        between ticks, that is before the `pre_tick` of the current time.
+        """
+        return self.clock.now, self.airport.snapshot()
+
+    def restore(self, snapshot):
+        """Rolls the prediction back to a snapshot. The aircraft of the flights
+        appeared since the snapshot are released so they are created again in
+        their initial state.
+        """
+        now, airport_snapshot = snapshot
+        sim_time = self.clock.sim_time
+        # The aircraft of the start time were added by the source simulation
+        first_time = now + sim_time if now == self.start_time else now
+        for appear_time in range(first_time, self.clock.now + 1, sim_time):
+            for flight in self.scenario.get_departures_at(appear_time):
+                flight.release_aircraft()
+            for flight in self.scenario.get_arrivals_at(appear_time):
+                flight.release_aircraft()
+
+        self.clock.now = now
+        self.airport.restore(airport_snapshot)
+
     def pre_tick(self, scheduler):
         """Adds aircraft before a tick."""
+        if self.now == self.start_time:
+            return
         self.airport.add_aircrafts(self.scenario, self.now,
                                    self.clock.sim_time, scheduler)
 
     def tick(self):
         """Turn off the logger, reschedule, and analyst."""
-        self.logger.debug("\nPredicted Time: %s", self.now)
+        self.logger.debug("\nPredicted Time: %s", seconds2str(self.now))
         self.airport.tick(True)
         try:
             self.clock.tick()
@@ -46,6 +46,7 @@ import numpy
 import coloredlogs
 
 from simulation import Simulation, SimulationException
+from aircraft import Aircraft
 from clock import ClockException
 from config import Config as cfg
 from utils import get_output_dir_name, get_batch_plan_name
@@ -245,6 +246,9 @@ def run_generator():
         logger.debug("Caught keyboard interrupt, simulation exits")
     except ClockException:
         logger.debug("Simulation ends")
+        hit_rate = Aircraft.get_ahead_cache_hit_rate()
+        if hit_rate is not None:
+            logger.debug("Look-ahead cache hit rate: %.2f", hit_rate)
     except SimulationException as exception:
         logger.error("Conflict found in the airport, abort")
         raise exception
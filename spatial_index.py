@@ -0,0 +1,107 @@
+"""Class file for `SpatialIndex`."""
+import math
+from collections import defaultdict
+
+from projection import get_projection
+
+# The distances of the nodes without planar coordinates are geodesic, so the
+# query radius is padded to never miss a close node.
+QUERY_PADDING_RATIO = 0.01
+QUERY_PADDING_FEET = 1.0
+
+
+class SpatialIndex:
+    """`SpatialIndex` is a uniform grid over the nodes of an airport surface.
+    Nodes are projected onto a local plane (in feet, see `Projection`) and
+    bucketed into square cells, so finding the nodes around a location only
+    looks into the cells next to it instead of comparing with every node.
+
+    The plane is the one of the first node added if it has one (i.e. the
+    plane of the airport surface), so the planar coordinates cached on the
+    nodes are used as they are; otherwise it's centered on that node.
+
+    The index returns candidates: it may return items a little bit further
+    than the given radius but it never misses one within. The caller is
+    expected to confirm the candidates with `Node.is_close_to` or alike.
+    """
+
+    def __init__(self, cell_size, origin=None):
+
+        if cell_size <= 0:
+            raise Exception("Cell size must be positive")
+
+        self.cell_size = cell_size
+        self.projection = None
+        if origin is not None:
+            self.projection = get_projection(origin["lat"], origin["lng"])
+
+        # cells[(cx, cy)] = [(seq, x, y, item)]
+        self.cells = defaultdict(list)
+        self.size = 0
+
+    @classmethod
+    def from_nodes(cls, nodes, cell_size):
+        """Creates an index containing the given nodes."""
+        index = cls(cell_size)
+        for node in nodes:
+            index.add(node)
+        return index
+
+    @classmethod
+    def from_link_ends(cls, links, cell_size):
+        """Creates an index containing the start and end nodes of the given
+        links. The item stored for both ends is the position of the link in
+        `links`.
+        """
+        index = cls(cell_size)
+        for i, link in enumerate(links):
+            index.add(link.start, i)
+            index.add(link.end, i)
+        return index
+
+    def project(self, node):
+        """Projects a node onto the local plane in feet."""
+        if self.projection is None:
+            self.projection = node.projection or \
+                get_projection(node.geo_pos["lat"], node.geo_pos["lng"])
+        if node.projection is self.projection:
+            return node.x, node.y
+        return self.projection.project(node.geo_pos["lat"],
+                                       node.geo_pos["lng"])
+
+    def add(self, node, item=None):
+        """Adds `item` located at `node` into the index. If `item` is not
+        given, the node itself is stored.
+        """
+        x, y = self.project(node)
+        cell = (math.floor(x / self.cell_size), math.floor(y / self.cell_size))
+        self.cells[cell].append(
+            (self.size, x, y, node if item is None else item))
+        self.size += 1
+
+    def query(self, node, radius):
+        """Returns the items around `node` within `radius` feet. The items are
+        returned in the order they were added.
+        """
+        x, y = self.project(node)
+        radius = radius * (1 + QUERY_PADDING_RATIO) + QUERY_PADDING_FEET
+        radius_square = radius * radius
+
+        min_cx = math.floor((x - radius) / self.cell_size)
+        max_cx = math.floor((x + radius) / self.cell_size)
+        min_cy = math.floor((y - radius) / self.cell_size)
+        max_cy = math.floor((y + radius) / self.cell_size)
+
+        found = []
+        for cx in range(min_cx, max_cx + 1):
+            for cy in range(min_cy, max_cy + 1):
+                for seq, item_x, item_y, item in self.cells.get((cx, cy), ()):
+                    dx, dy = item_x - x, item_y - y
+                    if dx * dx + dy * dy <= radius_square:
+                        found.append((seq, item))
+
+        found.sort(key=lambda pair: pair[0])
+        return [item for _, item in found]
+
+    def __len__(self):
+        return self.size
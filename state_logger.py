@@ -4,8 +4,7 @@ import json
 import logging
 
 from link import HoldLink
-from utils import get_output_dir_name
-from datetime import datetime
+from utils import get_output_dir_name, seconds2str
 
 class StateLogger:
     """`StateLogger` logs the airport states in each tick, parses them into a
@@ -33,7 +32,7 @@ class StateLogger:
         ]
 
         state = {
-            "time": self.__parse_time(simulation.now),
+            "time": seconds2str(simulation.now),
             "aircrafts": aircrafts,
             'takeoff_count': simulation.airport.takeoff_count,
             'total_ticks_on_surface': simulation.airport.takeoff_ticks_count
@@ -77,10 +76,6 @@ class StateLogger:
             for target in itinerary.targets
         ] if itinerary is not None else None
 
-    @classmethod
-    def __parse_time(cls, time):
-        return "%02d:%02d:%02d" % (time.hour, time.minute, time.second)
-
     @property
     def output_filename(self):
         """Gets the output filename of json file storing all the states."""
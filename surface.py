@@ -10,6 +10,9 @@ import cache
 from node import Node
 from link import Link
 from config import Config
+from spatial_index import SpatialIndex
+from projection import get_projection, set_active_projection
+from distance_matrix import DistanceMatrix, set_active_distance_matrix
 from copy import deepcopy
 
 
@@ -35,6 +38,8 @@ class Surface:
         self.center = center
         self.corners = corners
         self.image_filepath = image_filepath
+        self.projection = None
+        self.distance_matrix = None
 
         self.break_nodes = set([])
 
@@ -317,6 +322,7 @@ class SurfaceFactory:
         cls.logger = logging.getLogger(__name__)
         surface = Surface(airport_raw["center"], airport_raw["corners"],
                           dir_path + "airport.jpg")
+        SurfaceFactory.__set_projection(surface)
         SurfaceFactory.__load_gates(surface, dir_path)
         SurfaceFactory.__load_spots(surface, dir_path)
         SurfaceFactory.__load_gates_to_spots_mapping(surface, dir_path)
@@ -325,14 +331,69 @@ class SurfaceFactory:
         SurfaceFactory.__load_runway(surface, dir_path)
         SurfaceFactory.__load_taxiway(surface, dir_path)
         SurfaceFactory.__load_pushback_way(surface, dir_path)
+        SurfaceFactory.__build_distance_matrix(surface)
         surface.break_links()
         SurfaceFactory.__find_link_around_intersection(surface)
         return surface
 
+    @classmethod
+    def __set_projection(cls, surface):
+        """Sets up the local plane of the airport used for computing the
+        distances between the nodes created from now on.
+        """
+        distance_model = Config.params["simulation"]["distance_model"]
+        if distance_model == "planar":
+            surface.projection = get_projection(surface.center["lat"],
+                                                surface.center["lng"])
+        elif distance_model == "geodesic":
+            surface.projection = None
+        else:
+            raise Exception("Unknown distance model")
+        set_active_projection(surface.projection)
+        cls.logger.info("Using %s distance model", distance_model)
+
+    @classmethod
+    def __build_distance_matrix(cls, surface):
+        """Computes the distances between all the nodes on the surface once
+        so that the closeness checks between them are lookups. The matrix is
+        only used with the planar distance model.
+        """
+        set_active_distance_matrix(None)
+        if surface.projection is None:
+            return
+
+        thresholds = [
+            Config.params["simulation"]["close_node_threshold"],
+            Config.params["simulation"]["close_node_link_threshold"]
+        ]
+        nodes = surface.gates + surface.spots + surface.intersections + \
+            [node for link in surface.links for node in link.nodes]
+
+        cache_enabled = Config.params["simulation"]["cache"]
+        if cache_enabled:
+            hash_key = "distances-%s-%s" % (
+                cache.get_hash(surface.links, nodes),
+                "-".join(str(threshold) for threshold in thresholds))
+            surface.distance_matrix = cache.get(hash_key)
+
+        if surface.distance_matrix is None:
+            surface.distance_matrix = DistanceMatrix(nodes, thresholds)
+            if cache_enabled:
+                cache.put(hash_key, surface.distance_matrix)
+
+        set_active_distance_matrix(surface.distance_matrix)
+        cls.logger.info("Distance matrix of %d nodes is ready",
+                        len(surface.distance_matrix))
+
     @classmethod
     def __find_link_around_intersection(cls, surface):
+        links = surface.links
+        threshold = Config.params["simulation"]["close_node_threshold"]
+        link_end_index = SpatialIndex.from_link_ends(links, threshold)
         for intersection in surface.intersections:
-            for link in surface.links:
+            for i in sorted(set(link_end_index.query(intersection,
+                                                     threshold))):
+                link = links[i]
                 if link.contain_node(intersection):
                     if intersection not in surface.intersections_to_link_mapping:
                         surface.intersections_to_link_mapping[intersection] = []
@@ -163,4 +163,20 @@ class TerminalController:
         # if there any arrival, then cannot add departure
         if self.terminal_spot_id_2_access[tgt_terminal_spot_id] > 0:
             return False
-        return True
\ No newline at end of file
+        return True
+
+    def snapshot(self):
+        """Returns the state of the terminal areas to be restored by
+        `restore`.
+        """
+        return (dict(self.terminal_spot_id_2_access), dict(self.arrival_2_gate),
+                dict(self.depature_2_gate), set(self.visited_arrivals),
+                set(self.visited_departures))
+
+    def restore(self, snapshot):
+        access, arrival_2_gate, depature_2_gate, visited_arrivals, visited_departures = snapshot
+        self.terminal_spot_id_2_access = dict(access)
+        self.arrival_2_gate = dict(arrival_2_gate)
+        self.depature_2_gate = dict(depature_2_gate)
+        self.visited_arrivals = set(visited_arrivals)
+        self.visited_departures = set(visited_departures)
@@ -3,6 +3,7 @@
 from node import Node
 from aircraft import Aircraft, State
 from itinerary import Itinerary
+from link import Link
 from copy import deepcopy
 from config import Config
 
@@ -25,7 +26,9 @@ class TestAircraft(unittest.TestCase):
 
     m = Node("M", {"lat": 47.755333, "lng": -122.079057})
 
-    itinerary_template = Itinerary([n1, n2, n3])
+    @property
+    def itinerary_template(self):
+        return Itinerary([self.n1, self.n2, self.n3])
 
     def test_init(self):
 
@@ -97,4 +100,101 @@ class TestAircraft(unittest.TestCase):
         aircraft.tick()
         # targets: n2 - n3
         self.assertEqual(aircraft.itinerary.current_target, self.n2)
-    
\ No newline at end of file
+
+    def test_profile(self):
+        aircraft = Aircraft("F1", "M1", self.n1, State.unknown)
+        another_aircraft = Aircraft("F2", "M1", self.n1, State.unknown)
+        self.assertIs(aircraft.profile, another_aircraft.profile)
+        self.assertIs(deepcopy(aircraft).profile, aircraft.profile)
+        self.assertEqual(deepcopy(aircraft).callsign, aircraft.callsign)
+
+        # Overrides the max speed of model M2 only
+        profiles = Config.params["aircraft_model"]["profiles"]
+        Config.params["aircraft_model"]["profiles"] = {"M2": {"max_speed": 1}}
+        try:
+            aircraft = Aircraft("F3", "M2", self.n1, State.unknown)
+            another_aircraft = Aircraft("F4", "M1", self.n1, State.unknown)
+        finally:
+            Config.params["aircraft_model"]["profiles"] = profiles
+        self.assertEqual(aircraft.MAX_SPEED, 1.0)
+        self.assertEqual(another_aircraft.MAX_SPEED,
+                         Config.params["aircraft_model"]["max_speed"])
+
+        aircraft.set_speed(100)
+        self.assertEqual(aircraft.speed, 1.0)
+
+    def test_ahead_cache(self):
+        n2 = Node("N2", {"lat": 47.7225, "lng": -122.079057})
+        n3 = Node("N3", {"lat": 47.7230, "lng": -122.079057})
+        itinerary = Itinerary([Link("L1", [self.n1, n2]),
+                               Link("L2", [n2, n3])])
+        aircraft = Aircraft("F1", "M1", self.n1, State.unknown)
+        aircraft.set_itinerary(itinerary)
+
+        hits, misses = Aircraft.ahead_cache_hits, Aircraft.ahead_cache_misses
+        ahead = aircraft.get_ahead_intersections_and_link()
+        self.assertEqual(ahead[0], [n2, n3])
+        self.assertIs(aircraft.get_ahead_intersections_and_link(), ahead)
+        self.assertEqual(Aircraft.ahead_cache_hits - hits, 1)
+        self.assertEqual(Aircraft.ahead_cache_misses - misses, 1)
+
+        # Computed again once the itinerary is delayed or the aircraft moves
+        itinerary.add_scheduler_delay()
+        aircraft.get_ahead_intersections_and_link()
+        aircraft.set_speed(100.0)
+        aircraft.move()
+        aircraft.move()
+        self.assertEqual(aircraft.get_ahead_intersections_and_link(),
+                         itinerary.get_ahead_intersections_and_link(800.0))
+        self.assertEqual(Aircraft.ahead_cache_hits - hits, 1)
+        self.assertEqual(Aircraft.ahead_cache_misses - misses, 3)
+
+    def test_state(self):
+        n2 = Node("I2", {"lat": 47.7225, "lng": -122.079057})
+        n3 = Node("N3", {"lat": 47.7230, "lng": -122.079057})
+        n4 = Node("N4", {"lat": 47.7235, "lng": -122.079057})
+        itinerary = Itinerary([Link("L1", [self.n1, n2]),
+                               Link("L2", [n2, n3]),
+                               Link("L3", [n3, n4])])
+
+        # An arrival is on the ramp once no intersection is ahead
+        aircraft = Aircraft("F1", "M1", self.n1, False)
+        self.assertIs(aircraft.state, State.stop)
+        aircraft.set_itinerary(itinerary)
+        self.assertEqual(itinerary.n_intersections_ahead, 1)
+        self.assertIs(aircraft.state, State.taxi)
+        self.assertEqual(aircraft.ramp_flag, 1)
+
+        aircraft.set_speed(100.0)
+        while itinerary.current_target.end is not n3:
+            aircraft.move()
+        self.assertEqual(itinerary.n_intersections_ahead, 0)
+        self.assertIs(aircraft.state, State.ramp)
+        self.assertEqual(aircraft.ramp_flag, 0)
+        self.assertIs(aircraft.state, State.ramp)
+
+    def test_snapshot(self):
+        n2 = Node("N2", {"lat": 47.7225, "lng": -122.079057})
+        n3 = Node("N3", {"lat": 47.7230, "lng": -122.079057})
+        itinerary = Itinerary([Link("L1", [self.n1, n2]),
+                               Link("L2", [n2, n3])])
+        aircraft = Aircraft("F1", "M1", self.n1, True)
+        aircraft.set_itinerary(itinerary)
+        aircraft.set_speed(100.0)
+
+        snapshot = aircraft.snapshot()
+        for _ in range(2):
+            aircraft.tick()
+        self.assertEqual(itinerary.index, 1)
+        self.assertNotEqual(itinerary.distance, 0)
+
+        aircraft.restore(snapshot)
+        self.assertEqual(aircraft.speed, 100.0)
+        self.assertEqual(aircraft.tick_count, 0)
+        self.assertEqual((itinerary.index, itinerary.distance), (0, 0))
+        self.assertIs(aircraft.itinerary, itinerary)
+
+        # Delays added after the snapshot are kept
+        aircraft.add_scheduler_delay()
+        aircraft.restore(snapshot)
+        self.assertEqual(itinerary.n_scheduler_delay, 1)
@@ -1,9 +1,14 @@
 #!/usr/bin/env python
 
 import datetime
+import itertools
+import random
 from node import Node
 from airport import Airport
 from aircraft import Aircraft, State
+from surface import Surface, Gate
+from itinerary import Itinerary
+from schedule import Schedule
 from config import Config
 
 import sys
@@ -24,6 +29,18 @@ class TestAirport(unittest.TestCase):
         def now(self):
             return datetime.time(0, 0)
 
+    @classmethod
+    def create_airport(cls):
+        # A surface of a few gates, about 1000 feet apart
+        center = {"lat": 47.822000, "lng": -122.079057}
+        surface = Surface(center, [], None)
+        for i in range(3):
+            surface.gates.append(Gate("G%d" % i, {
+                "lat": center["lat"],
+                "lng": center["lng"] + 0.004 * i
+            }))
+        return Airport("test", surface)
+
     def test_conflicts(self):
 
         simulation = self.SimulationMock()
@@ -53,3 +70,71 @@ class TestAirport(unittest.TestCase):
 
         # Test if the third aircraft shown in conflict correctly
         self.assertEqual(len(airport.conflicts), 3)
+
+    def test_conflicts_match_all_pairs(self):
+
+        airport = self.create_airport()
+        center = airport.surface.center
+
+        # Aircraft scattered around the center, about 1000 feet wide
+        rand = random.Random(0)
+        for i in range(200):
+            node = Node("N%d" % i, {
+                "lat": center["lat"] + rand.uniform(-0.0015, 0.0015),
+                "lng": center["lng"] + rand.uniform(-0.0015, 0.0015)
+            })
+            airport.aircrafts.append(
+                Aircraft("A%d" % i, None, node, State.stop))
+
+        expected = []
+        for a1, a2 in itertools.combinations(airport.aircrafts, 2):
+            loc1, loc2 = a1.precise_location, a2.precise_location
+            if loc1.is_close_to(loc2):
+                expected.append(((a1, a2), loc1.get_distance_to(loc2)))
+
+        conflicts, distances = airport.conflicts
+        self.assertTrue(expected)
+        self.assertEqual([(conflict.aircrafts, distance)
+                          for conflict, distance in zip(conflicts, distances)],
+                         expected)
+
+    def test_conflicts_snapshot(self):
+
+        airport = self.create_airport()
+        node = airport.surface.gates[0]
+
+        airport.add_aircraft(Aircraft("A1", None, node, State.stop))
+        airport.add_aircraft(Aircraft("A2", None, node, State.stop))
+        conflicts, _ = airport.conflicts
+        self.assertEqual(len(conflicts), 1)
+
+        # The same snapshot is returned until the airport changes
+        self.assertIs(airport.conflicts, airport.conflicts)
+
+        airport.add_aircraft(Aircraft("A3", None, node, State.stop))
+        conflicts, _ = airport.conflicts
+        self.assertEqual(len(conflicts), 3)
+
+    def test_aircrafts_to_schedule(self):
+
+        airport = self.create_airport()
+        gates = airport.surface.gates
+
+        a1 = Aircraft("A1", None, gates[0], State.stop)
+        a2 = Aircraft("A2", None, gates[1], State.stop)
+        a3 = Aircraft("A3", None, gates[2], State.stop)
+
+        # A3 has an itinerary cached before it's added
+        airport.apply_schedule(Schedule({a3: Itinerary()}, 0, 0))
+        for aircraft in (a1, a2, a3):
+            airport.add_aircraft(aircraft)
+        self.assertEqual(airport.aircrafts_to_schedule, [a1, a2])
+        self.assertIsNotNone(a3.itinerary)
+
+        snapshot = airport.snapshot()
+        airport.apply_schedule(Schedule({a2: Itinerary()}, 0, 0))
+        self.assertEqual(airport.aircrafts_to_schedule, [a1])
+
+        # Rolled back with the airport
+        airport.restore(snapshot)
+        self.assertEqual(airport.aircrafts_to_schedule, [a1, a2])
@@ -0,0 +1,37 @@
+#!/usr/bin/env python
+
+import cache
+from copy import deepcopy
+from node import Node
+from config import Config
+
+import sys
+import unittest
+sys.path.append('..')
+
+
+class TestCache(unittest.TestCase):
+
+    n1 = Node("N1", {"lat": 47.822000, "lng": -122.079057})
+    n2 = Node("N2", {"lat": 47.822000, "lng": -122.077057})
+
+    def setUp(self):
+        self.params = deepcopy(Config.params)
+
+    def tearDown(self):
+        Config.params.clear()
+        Config.params.update(self.params)
+
+    def test_get_hash(self):
+        Config.params["simulation"]["distance_model"] = "planar"
+        planar = cache.get_hash([], [self.n1, self.n2])
+        self.assertEqual(cache.get_hash([], [self.n1, self.n2]), planar)
+        self.assertNotEqual(cache.get_hash([], [self.n1]), planar)
+
+        # Links cached in one distance model aren't used in the other
+        Config.params["simulation"]["distance_model"] = "geodesic"
+        self.assertNotEqual(cache.get_hash([], [self.n1, self.n2]), planar)
+
+
+if __name__ == '__main__':
+    unittest.main()
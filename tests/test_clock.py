@@ -1,6 +1,6 @@
 #!/usr/bin/env python
 
-from clock import Clock
+from clock import Clock, ClockException
 from config import Config
 
 import sys
@@ -12,25 +12,60 @@ class TestClock(unittest.TestCase):
 
     SIM_TIME = 300
 
+    def setUp(self):
+        self.params = dict(Config.params["simulation"])
+        Config.params["simulation"]["time_unit"] = self.SIM_TIME
+
+    def tearDown(self):
+        Config.params["simulation"].update(self.params)
+
     def test_init(self):
 
         clock = Clock()
-        Config.params["simulation"]["time_unit"] = self.SIM_TIME
 
-        self.assertEqual(clock.now.minute, 0)
-        self.assertEqual(clock.now.hour, 0)
+        self.assertEqual(clock.now, 7 * 60 * 60)
+        self.assertEqual(repr(clock), "<Clock: 07:00:00>")
 
     def test_tick(self):
 
         clock = Clock()
-        Config.params["simulation"]["time_unit"] = self.SIM_TIME
 
         clock.tick()
-        self.assertEqual(clock.now.minute, self.SIM_TIME / 60)
+        self.assertEqual(clock.now - Clock.START_TIME, self.SIM_TIME)
 
         clock.tick()
         clock.tick()
-        self.assertEqual(clock.now.minute, (self.SIM_TIME * 3) / 60)
+        self.assertEqual(clock.now - Clock.START_TIME, self.SIM_TIME * 3)
+
+    def test_skip(self):
+
+        Config.params["simulation"]["end_time"] = "8:00"
+        clock = Clock()
+
+        self.assertEqual(clock.skip(0), 0)
+        self.assertEqual(clock.skip(3), 3)
+        self.assertEqual(clock.now - Clock.START_TIME, self.SIM_TIME * 3)
+
+        # Stops at the last tick of the day
+        self.assertEqual(clock.skip(100), 9)
+        self.assertEqual(repr(clock), "<Clock: 08:00:00>")
+        with self.assertRaises(ClockException):
+            clock.tick()
+
+    def test_past_midnight(self):
+
+        Config.params["simulation"]["end_time"] = "26:00"
+        clock = Clock()
+
+        ticks = 0
+        with self.assertRaises(ClockException):
+            while True:
+                clock.tick()
+                ticks += 1
+
+        # From 07:00 to 26:00 without wrapping at midnight
+        self.assertEqual(ticks, 19 * 60 * 60 // self.SIM_TIME)
+        self.assertEqual(repr(clock), "<Clock: 26:00:00>")
 
 
 if __name__ == '__main__':
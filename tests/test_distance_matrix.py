@@ -0,0 +1,55 @@
+#!/usr/bin/env python
+
+from copy import deepcopy
+
+from node import Node
+from distance_matrix import DistanceMatrix
+from projection import get_projection, set_active_projection
+
+import sys
+import unittest
+sys.path.append('..')
+
+
+class TestDistanceMatrix(unittest.TestCase):
+
+    def setUp(self):
+        set_active_projection(get_projection(37.615223, -122.389977))
+
+        # n2, n3 and n4 are about 20, 360 and 90 feet away from n1
+        self.n1 = Node("N1", {"lat": 37.615223, "lng": -122.389977})
+        self.n2 = Node("N2", {"lat": 37.615278, "lng": -122.389977})
+        self.n3 = Node("N3", {"lat": 37.616223, "lng": -122.389977})
+        self.n4 = Node("N4", {"lat": 37.615223, "lng": -122.390277})
+        self.nodes = [self.n1, self.n2, self.n3, self.n4]
+
+    def tearDown(self):
+        set_active_projection(None)
+
+    def test_masks(self):
+        matrix = DistanceMatrix(self.nodes + [self.n1], [30, 100])
+        self.assertEqual(len(matrix), 4)
+
+        for threshold in [30, 100]:
+            for node in self.nodes:
+                for another_node in self.nodes:
+                    self.assertEqual(
+                        matrix.is_close(node, another_node, threshold),
+                        node.is_within(another_node, threshold))
+
+        self.assertAlmostEqual(matrix.get_distance(self.n1, self.n3),
+                               self.n1.get_distance_to(self.n3), 5)
+
+    def test_unknown(self):
+        matrix = DistanceMatrix(self.nodes[:3], [30])
+        self.assertIsNone(matrix.is_close(self.n1, self.n4, 30))
+        self.assertIsNone(matrix.is_close(self.n1, self.n2, 50))
+        self.assertIsNone(matrix.get_distance(self.n4, self.n1))
+
+        # Copies of the nodes are found as well
+        self.assertTrue(matrix.is_close(deepcopy(self.n1), self.n2, 30))
+        self.assertIs(deepcopy(matrix), matrix)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,32 @@
+#!/usr/bin/env python3
+
+from id_generator import InternedIds, get_interned_id, reset_interned_ids
+
+import sys
+import unittest
+sys.path.append('..')
+
+
+class TestIdGenerator(unittest.TestCase):
+
+    def test_interned_id(self):
+        key = ("TestIdGenerator", 47.722, -122.079057)
+        self.assertEqual(get_interned_id(key), get_interned_id(key))
+        self.assertNotEqual(get_interned_id(key),
+                            get_interned_id(key[:1] + (47.723, -122.079057)))
+
+    def test_reset_interned_ids(self):
+        ids = InternedIds.ids
+        key = ("TestIdGenerator",)
+        try:
+            before = get_interned_id(key)
+            other = get_interned_id(key + ("other",))
+            reset_interned_ids()
+            self.assertEqual(len(InternedIds.ids), 0)
+            # IDs aren't reused after a reset
+            after = get_interned_id(key)
+            self.assertNotIn(after, (before, other))
+            self.assertGreater(after, other)
+            self.assertEqual(len(InternedIds.ids), 1)
+        finally:
+            InternedIds.ids = ids
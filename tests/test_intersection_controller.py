@@ -0,0 +1,72 @@
+#!/usr/bin/env python
+
+from intersection_controller import LockQueue
+
+import sys
+import unittest
+sys.path.append('..')
+
+
+class TestLockQueue(unittest.TestCase):
+
+    def test_distance(self):
+
+        queue = LockQueue("distance")
+        self.assertIsNone(queue.peek())
+
+        queue.push(300, "A1", "L1")
+        queue.push(100, "A2", "L2")
+        queue.push(100, "A3", "L1")
+        # Ties are given to the first request
+        self.assertEqual(queue.peek(), "A2")
+        self.assertEqual(queue.last, "A3")
+
+        queue.remove("A2")
+        self.assertEqual(queue.peek(), "A3")
+        self.assertEqual(len(queue), 2)
+
+        queue.remove("A3")
+        self.assertEqual(queue.peek(), "A1")
+        self.assertEqual(queue.last, "A1")
+
+        queue.clear()
+        self.assertEqual(len(queue), 0)
+        self.assertIsNone(queue.peek())
+
+    def test_qsize(self):
+
+        queue = LockQueue("qsize")
+        queue.push(100, "A1", "L1")
+        queue.push(500, "A2", "L2")
+        queue.push(300, "A3", "L2")
+        # The closest aircraft of the longest approach
+        self.assertEqual(queue.peek(), "A3")
+
+        queue.push(200, "A4", "L1")
+        # Same length, the closest aircraft wins
+        self.assertEqual(queue.peek(), "A1")
+
+        queue.remove("A1")
+        self.assertEqual(queue.peek(), "A3")
+        self.assertEqual(sorted(queue), ["A2", "A3", "A4"])
+
+    def test_snapshot(self):
+
+        queue = LockQueue("distance")
+        queue.push(300, "A1", "L1")
+        snapshot = queue.snapshot()
+
+        queue.push(100, "A2", "L2")
+        self.assertEqual(queue.peek(), "A2")
+        queue.restore(snapshot)
+        self.assertEqual(queue.peek(), "A1")
+        self.assertEqual(queue.last, "A1")
+        self.assertEqual(len(queue), 1)
+
+    def test_unknown_policy(self):
+        with self.assertRaises(Exception):
+            LockQueue("random")
+
+
+if __name__ == '__main__':
+    unittest.main()
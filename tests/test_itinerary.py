@@ -4,6 +4,7 @@ from config import Config
 from copy import deepcopy
 from node import Node
 from itinerary import Itinerary
+from link import Link, HoldLink
 
 import sys
 import unittest
@@ -18,7 +19,18 @@ class TestItinerary(unittest.TestCase):
     n2 = Node("N2", {"lat": 47.822000, "lng": -122.079057})
     n3 = Node("N3", {"lat": 47.922000, "lng": -122.079057})
 
-    itinerary_template = Itinerary(targets=[n1, n2, n3])
+    # A route of three links, the first and the last ending at intersections
+    i2 = Node("I2", {"lat": 47.723500, "lng": -122.079057})
+    n4 = Node("N4", {"lat": 47.724000, "lng": -122.079057})
+    i5 = Node("I5", {"lat": 47.724500, "lng": -122.079057})
+
+    l1 = Link("L1", [n1, i2])
+    l2 = Link("L2", [i2, n4])
+    l3 = Link("L3", [n4, i5])
+
+    @property
+    def itinerary_template(self):
+        return Itinerary(targets=[self.n1, self.n2, self.n3])
 
     def test_init(self):
 
@@ -131,3 +143,151 @@ class TestItinerary(unittest.TestCase):
         itinerary.add_scheduler_delay()
         # n1 - [n1] - n1 - n2 - n3
         self.assertTrue(itinerary.is_delayed)
+
+    def test_shared_links(self):
+        n2 = Node("N2", {"lat": 47.722500, "lng": -122.079057})
+        links = [Link("L1", [self.n1, n2])]
+        itinerary = Itinerary(links)
+        self.assertIs(itinerary.backup[0], links[0])
+        self.assertIsNot(itinerary.backup, links)
+
+        # Copies share the links but not the delays
+        copied = deepcopy(itinerary)
+        self.assertIs(copied.targets[1], links[0])
+        copied.add_scheduler_delay()
+        self.assertEqual(copied.length, 3)
+        self.assertEqual(itinerary.length, 2)
+
+    def test_hash_after_delay(self):
+        n2 = Node("N2", {"lat": 47.722500, "lng": -122.079057})
+        itinerary = Itinerary([Link("L1", [self.n1, n2])])
+        another_itinerary = deepcopy(itinerary)
+        self.assertEqual(itinerary.hash, another_itinerary.hash)
+
+        # The targets are changed by the delay so is the hash
+        itinerary.add_scheduler_delay()
+        self.assertNotEqual(itinerary.hash, another_itinerary.hash)
+
+    def test_tick_through_links(self):
+        itinerary = Itinerary([self.l1, self.l2, self.l3])
+
+        # The hold at the head is consumed first
+        itinerary.tick(100.0)
+        self.assertEqual((itinerary.index, itinerary.distance), (1, 0))
+
+        # Passes the first two links in a single tick
+        tick_distance = self.l1.length + self.l2.length + 10.0
+        passed = itinerary.tick(tick_distance)
+        self.assertEqual(passed, [self.l1, self.l2])
+        self.assertEqual(itinerary.links_this_tick, [self.l1, self.l2])
+        self.assertIs(itinerary.current_target, self.l3)
+        self.assertAlmostEqual(itinerary.distance, 10.0)
+
+        # Ends exactly at the end of a link
+        itinerary.tick(self.l3.length - 10.0)
+        self.assertTrue(itinerary.is_completed)
+        self.assertEqual(itinerary.current_precise_location, self.i5)
+
+    def test_tick_to_link_end(self):
+        itinerary = Itinerary([self.l1, self.l2, self.l3])
+        itinerary.tick(100.0)
+        itinerary.tick(2.0)
+
+        # Ends at the start of the last link, where summing up the lengths
+        # one by one gives a (slightly) negative distance
+        tick_distance = self.l1.length + self.l2.length - 2.0
+        index, distance, location = itinerary.get_next_location(tick_distance)
+        self.assertIs(itinerary.targets[index], self.l3)
+        self.assertEqual(distance, 0)
+        self.assertIsNotNone(location)
+
+        itinerary.tick(tick_distance)
+        self.assertIs(itinerary.current_target, self.l3)
+        self.assertIsNotNone(itinerary.current_precise_location)
+
+    def test_hold_between_links(self):
+        hold = HoldLink()
+        itinerary = Itinerary([self.l1, hold, self.l2])
+        itinerary.tick(100.0)
+        self.assertEqual(itinerary.distance_left,
+                         self.l1.length + self.l2.length)
+
+        # The hold takes no distance
+        passed = itinerary.tick(self.l1.length + 10.0)
+        self.assertEqual(passed, [self.l1, hold])
+        self.assertEqual(itinerary.links_this_tick, [self.l1])
+        self.assertIs(itinerary.current_target, self.l2)
+        self.assertAlmostEqual(itinerary.distance, 10.0)
+        self.assertEqual(itinerary.get_end_index(0), itinerary.index + 1)
+
+    def test_delay_while_moving(self):
+        itinerary = Itinerary([self.l1, self.l2])
+        itinerary.tick(100.0)
+        itinerary.tick(50.0)
+
+        # The aircraft holds at its location for a tick then moves on
+        itinerary.add_scheduler_delay()
+        self.assertIs(itinerary.current_target, self.l1)
+        self.assertEqual(itinerary.n_intersections_ahead, 1)
+        itinerary.tick(100.0)
+        self.assertIs(itinerary.current_target, self.l1)
+        self.assertEqual(itinerary.distance, 50.0)
+
+        itinerary.tick(self.l1.length)
+        self.assertIs(itinerary.current_target, self.l2)
+        self.assertAlmostEqual(itinerary.distance, 50.0)
+        self.assertEqual(itinerary.index, 3)
+
+    def test_get_ahead_intersections_and_link(self):
+        itinerary = Itinerary([self.l1, self.l2, self.l3])
+        itinerary.tick(100.0)
+        itinerary.tick(10.0)
+
+        intersections, distances = \
+            itinerary.get_ahead_intersections_and_link(self.l1.length)
+        self.assertEqual(intersections, [self.i2])
+        self.assertAlmostEqual(distances[0], self.l1.length - 10.0)
+
+        intersections, distances = \
+            itinerary.get_ahead_intersections_and_link(1000.0)
+        self.assertEqual(intersections, [self.i2, self.n4, self.i5])
+        self.assertAlmostEqual(
+            distances[2],
+            self.l1.length + self.l2.length + self.l3.length - 10.0)
+
+        # Also after a delay inserted at the head
+        itinerary.add_scheduler_delay()
+        self.assertEqual(
+            itinerary.get_ahead_intersections_and_link(self.l1.length)[0],
+            [self.i2])
+
+    def test_get_end_index(self):
+        itinerary = Itinerary([self.l1, self.l2, self.l3])
+        itinerary.tick(100.0)
+
+        # The index right after the last link starting within the distance
+        self.assertEqual(itinerary.get_end_index(0), 2)
+        self.assertEqual(itinerary.get_end_index(self.l1.length + 1.0), 3)
+        self.assertEqual(itinerary.get_end_index(1000.0), 4)
+
+        itinerary.add_scheduler_delay()
+        self.assertEqual(itinerary.get_end_index(0), 3)
+
+    def test_n_intersections_ahead(self):
+        itinerary = Itinerary([self.l1, self.l2, self.l3])
+        self.assertEqual(itinerary.n_intersections_ahead, 2)
+        itinerary.add_scheduler_delay()
+        self.assertEqual(itinerary.n_intersections_ahead, 2)
+
+        itinerary.tick(100.0)
+        itinerary.tick(100.0)
+        self.assertIs(itinerary.current_target, self.l1)
+        self.assertEqual(itinerary.n_intersections_ahead, 2)
+
+        itinerary.tick(self.l1.length + 1.0)
+        self.assertEqual(itinerary.n_intersections_ahead, 1)
+        itinerary.tick(self.l2.length)
+        self.assertIs(itinerary.current_target, self.l3)
+        self.assertEqual(itinerary.n_intersections_ahead, 1)
+        itinerary.tick(self.l3.length)
+        self.assertTrue(itinerary.is_completed)
@@ -0,0 +1,80 @@
+#!/usr/bin/env python
+
+import random
+
+from node import Node
+from aircraft import Aircraft, State
+from kinematics import Kinematics
+from config import Config
+
+import sys
+import unittest
+sys.path.append('..')
+
+
+class TestKinematics(unittest.TestCase):
+
+    Config.params["simulator"]["test_mode"] = True
+
+    n1 = Node("N1", {"lat": 47.722000, "lng": -122.079057})
+
+    class AircraftInState(Aircraft):
+        """Aircraft whose state is given instead of read from an itinerary."""
+
+        __slots__ = ("given_state",)
+
+        @property
+        def state(self):
+            return self.given_state
+
+    def __create_aircraft(self, i, state, speed, fronter_info):
+        aircraft = self.AircraftInState("F%d" % i, "M1", self.n1, True)
+        aircraft.given_state = state
+        aircraft.speed = speed
+        aircraft.set_fronter_info(fronter_info)
+        return aircraft
+
+    def test_parity(self):
+
+        rnd = random.Random(42)
+        params = Config.params["aircraft_model"]
+        max_speed = params["max_speed"]
+        distances = [0, params["min_distance"], params["ideal_distance"],
+                     params["min_distance"] + 1, params["ideal_distance"] + 1]
+        states = [State.pushback, State.ramp, State.taxi, State.stop]
+
+        aircrafts = []
+        for i in range(2000):
+            speed = rnd.choice([0, max_speed, max_speed + 10,
+                                rnd.uniform(0, max_speed)])
+            fronter_info = rnd.choice([
+                None, (-1, -1), (0, rnd.uniform(0, 2000)),
+                (rnd.uniform(0, max_speed), rnd.choice(distances)),
+                (rnd.uniform(0, max_speed), rnd.uniform(1, 2000))
+            ])
+            aircrafts.append(self.__create_aircraft(
+                i, rnd.choice(states), speed, fronter_info))
+
+        next_speeds = Kinematics(aircrafts).get_next_speeds()
+        for aircraft, next_speed in zip(aircrafts, next_speeds):
+            expected = aircraft.get_next_speed(aircraft.fronter_info,
+                                               aircraft.state)
+            # NumPy's power may differ from Python's in the last bit
+            self.assertAlmostEqual(next_speed, expected, 9,
+                                   (aircraft.speed, aircraft.fronter_info,
+                                    aircraft.state))
+
+    def test_update(self):
+
+        aircrafts = [self.__create_aircraft(0, State.pushback, 0.0, None),
+                     self.__create_aircraft(1, State.taxi, 100.0, (0, 500))]
+        aircrafts[0].add_speed_uncertainty(-1000.0)
+        Kinematics(aircrafts).update()
+        self.assertEqual(aircrafts[0].speed, 0)
+        self.assertEqual(aircrafts[1].speed, 0)
+
+        Kinematics([]).update()
+
+
+if __name__ == '__main__':
+    unittest.main()
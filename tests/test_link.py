@@ -30,6 +30,24 @@ class TestLink(unittest.TestCase):
         link = Link("link-123", self.nodes)
         self.assertAlmostEqual(link.length, 7307.4965586731)
 
+    def test_get_middle_node(self):
+        link = Link("link-123", self.nodes)
+        first_segment = link.segment_lengths[0]
+
+        self.assertEqual(link.get_middle_node(0.0), self.n1)
+        self.assertIsNone(link.get_middle_node(link.length + 1))
+
+        # On the node between the segments
+        middle = link.get_middle_node(first_segment)
+        self.assertAlmostEqual(middle.geo_pos["lat"], self.n2.geo_pos["lat"])
+        self.assertAlmostEqual(middle.geo_pos["lng"], self.n2.geo_pos["lng"])
+
+        # Halfway on the second segment
+        middle = link.get_middle_node(
+            first_segment + link.segment_lengths[1] / 2)
+        self.assertAlmostEqual(middle.geo_pos["lat"], 51.5183640)
+        self.assertAlmostEqual(middle.geo_pos["lng"], -0.1281250)
+
     def test_contains_node(self):
         link = Link("link-123", self.nodes)
         Config.params["simulation"]["close_node_link_threshold"] = 10
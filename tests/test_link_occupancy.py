@@ -0,0 +1,71 @@
+#!/usr/bin/env python
+
+from config import Config
+from node import Node
+from link import Link
+from itinerary import Itinerary
+from link_occupancy import LinkOccupancy
+
+import sys
+import unittest
+sys.path.append('..')
+
+
+class TestLinkOccupancy(unittest.TestCase):
+
+    Config.params["simulator"]["test_mode"] = True
+
+    n1 = Node("N1", {"lat": 47.722000, "lng": -122.079057})
+    n2 = Node("N2", {"lat": 47.822000, "lng": -122.079057})
+    n3 = Node("N3", {"lat": 47.922000, "lng": -122.079057})
+
+    l1 = Link("L1", [n1, n2])
+    l2 = Link("L2", [n2, n3])
+
+    class FakeAircraft:
+        """Stands for an aircraft since the index only reads its itinerary."""
+
+        def __init__(self, itinerary):
+            self.itinerary = itinerary
+
+    def __create_aircraft(self, distance):
+        itinerary = Itinerary([self.l1, self.l2], distance)
+        return self.FakeAircraft(itinerary)
+
+    def test_update(self):
+
+        occupancy = LinkOccupancy()
+        a1, a2, a3 = [self.__create_aircraft(distance)
+                      for distance in (100, 300, 100)]
+        for aircraft in (a1, a2, a3):
+            occupancy.update(aircraft)
+        self.assertEqual(len(occupancy), 3)
+
+        # Ties are in the order the aircraft were indexed
+        self.assertEqual(list(occupancy.get_aircraft_ahead(self.l1)),
+                         [(100, a1), (100, a3), (300, a2)])
+        self.assertEqual(list(occupancy.get_aircraft_ahead(self.l1, 100)),
+                         [(300, a2)])
+        self.assertEqual(list(occupancy.get_aircraft_ahead(self.l2)), [])
+
+        # Moves a1 onto the next link
+        a1.itinerary.tick(self.l1.length)
+        occupancy.update(a1)
+        self.assertEqual(list(occupancy.get_aircraft_ahead(self.l2)),
+                         [(a1.itinerary.distance, a1)])
+        self.assertEqual(list(occupancy.get_aircraft_ahead(self.l1)),
+                         [(100, a3), (300, a2)])
+
+        # Completed itineraries are not indexed
+        a2.itinerary.tick(self.l1.length + self.l2.length)
+        occupancy.update(a2)
+        self.assertEqual(list(occupancy.get_aircraft_ahead(self.l1)),
+                         [(100, a3)])
+
+        occupancy.remove(a3)
+        occupancy.remove(a3)
+        self.assertEqual(len(occupancy), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,8 @@
 #!/usr/bin/env python
 
-from node import Node
+from copy import deepcopy
+
+from node import Node, get_middle_node
 
 import sys
 import unittest
@@ -46,6 +48,23 @@ class TestNode(unittest.TestCase):
         self.assertNotEqual(n1.__hash__(), n2.__hash__())
         self.assertFalse(n1.__eq__(n2))
 
+    def test_middle_position(self):
+
+        n1 = Node("node-1", {"lat": 51.5033640, "lng": -0.1276250})
+        n2 = Node("node-2", {"lat": 51.5133640, "lng": -0.1276250})
+        position = get_middle_node(n1, n2, ratio=0.25)
+
+        self.assertAlmostEqual(position.geo_pos["lat"], 51.5058640)
+        self.assertAlmostEqual(position.get_distance_to(n1) * 3,
+                               position.get_distance_to(n2), 1)
+        self.assertEqual(position.get_distance_to(n1),
+                         n1.get_distance_to(position))
+        self.assertFalse(position.is_close_to(n1))
+        self.assertNotEqual(n1, position)
+
+        self.assertRaises(AttributeError, setattr, position, "x", 0)
+        self.assertEqual(deepcopy(position).geo_pos, position.geo_pos)
+
 
 if __name__ == '__main__':
     unittest.main()
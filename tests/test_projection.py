@@ -0,0 +1,89 @@
+#!/usr/bin/env python
+
+import os
+import json
+import itertools
+
+from node import Node
+from config import Config
+from projection import get_projection, set_active_projection
+
+import sys
+import unittest
+sys.path.append('..')
+
+
+class TestProjection(unittest.TestCase):
+
+    # Maximum error in feet allowed between the planar and geodesic distance
+    MAX_ERROR = 0.01
+
+    def tearDown(self):
+        set_active_projection(None)
+
+    def test_shipped_airports(self):
+
+        airports = sorted(os.listdir(Config.DATA_GENERATION_DIR_PATH % ""))
+
+        for airport in airports:
+            dir_path = Config.DATA_ROOT_DIR_PATH % airport
+            if not os.path.exists(dir_path + "airport-metadata.json"):
+                continue
+
+            with self.subTest(airport=airport):
+                nodes = self.__load_nodes(dir_path)
+                max_error = max(
+                    abs(n1.get_distance_to(n2) -
+                        n1.get_geodesic_distance_to(n2))
+                    for n1, n2 in nodes
+                )
+                self.assertLess(max_error, self.MAX_ERROR,
+                                "%s: max planar distance error %.6f feet "
+                                "over %d node pairs"
+                                % (airport, max_error, len(nodes)))
+
+    def test_geodesic_fallback(self):
+
+        n1 = Node("N1", {"lat": 37.615223, "lng": -122.389977})
+        set_active_projection(get_projection(37.615223, -122.389977))
+        n2 = Node("N2", {"lat": 37.616223, "lng": -122.389977})
+        n3 = Node("N3", {"lat": 37.615223, "lng": -122.390277})
+
+        # n1 is created without a projection
+        self.assertIsNone(n1.projection)
+        self.assertEqual(n1.get_distance_to(n2),
+                         n1.get_geodesic_distance_to(n2))
+
+        # n2 and n3 are on the same plane
+        self.assertIs(n2.projection, n3.projection)
+        self.assertAlmostEqual(n2.get_distance_to(n3),
+                               n2.get_geodesic_distance_to(n3), 1)
+
+    @classmethod
+    def __load_nodes(cls, dir_path):
+        """Loads the gates and the link nodes of an airport, and returns the
+        pairs of gates and the pairs of consecutive link nodes.
+        """
+
+        with open(dir_path + "airport-metadata.json") as fin:
+            center = json.load(fin)["center"]
+        set_active_projection(get_projection(center["lat"], center["lng"]))
+
+        pairs = []
+        with open(dir_path + "gates.json") as fin:
+            gates = [Node(raw["name"], {"lat": raw["lat"], "lng": raw["lng"]})
+                     for raw in json.load(fin)]
+        pairs += list(itertools.combinations(gates, 2))
+
+        for type_name in ["runways", "taxiways", "pushback_ways"]:
+            with open(dir_path + type_name + ".json") as fin:
+                for link_raw in json.load(fin):
+                    nodes = [Node(None, {"lat": lat, "lng": lng})
+                             for lng, lat in link_raw["nodes"]]
+                    pairs += list(zip(nodes, nodes[1:]))
+
+        return pairs
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+
+import itertools
+from copy import deepcopy
+from aircraft import Aircraft, State
+from clock import Clock
+from config import Config
+from flight import DepartureFlight
+from node import Node
+from routing_expert import RoutingExpert
+from simulation import get_scheduler
+from surface import Runway, Taxiway
+
+import sys
+import unittest
+sys.path.append('..')
+
+
+class TestReservationScheduler(unittest.TestCase):
+
+    #           (R2)
+    #            |
+    #           (N)
+    #            |
+    #  (W)------(I1)------(E)--(R1)
+    #            |
+    #           (S)
+    #
+    # A1 departs from W on runway R1 and A2 from S on runway R2, their routes
+    # cross at I1 after the same distance
+
+    i1 = Node("I1", {"lat": 47.822000, "lng": -122.079057})
+    w = Node("W", {"lat": 47.822000, "lng": -122.081057})
+    e = Node("E", {"lat": 47.822000, "lng": -122.077057})
+    r1 = Node("R1", {"lat": 47.822000, "lng": -122.076057})
+    s = Node("S", {"lat": 47.820654, "lng": -122.079057})
+    n = Node("N", {"lat": 47.823346, "lng": -122.079057})
+    r2 = Node("R2", {"lat": 47.824346, "lng": -122.079057})
+
+    class ScenarioMock():
+
+        def __init__(self, flights):
+            self.flights = flights
+
+        def get_flight(self, aircraft):
+            return self.flights[aircraft.callsign]
+
+    class AirportMock():
+
+        def __init__(self):
+            self.aircrafts_to_schedule = []
+            self.completed_aircrafts = {}
+
+    class SimulationMock():
+
+        def __init__(self, routing_expert, scenario):
+            self.airport = TestReservationScheduler.AirportMock()
+            self.scenario = scenario
+            self.routing_expert = routing_expert
+            self.clock = Clock()
+
+        @property
+        def now(self):
+            return self.clock.now
+
+    def setUp(self):
+        self.params = deepcopy(Config.params)
+        Config.params["simulator"]["test_mode"] = True
+        Config.params["scheduler"]["name"] = "reservation_scheduler"
+        Config.params["scheduler"]["max_reservation_wait"] = 20
+        Config.params["scheduler"]["reservation_buffer"] = 1
+
+        runway1 = Runway("R1", [self.e, self.r1])
+        runway2 = Runway("R2", [self.n, self.r2])
+        links = [Taxiway("WI1", [self.w, self.i1]),
+                 Taxiway("I1E", [self.i1, self.e]),
+                 Taxiway("SI1", [self.s, self.i1]),
+                 Taxiway("I1N", [self.i1, self.n]),
+                 runway1, runway2]
+        routing_expert = RoutingExpert(links, [], False)
+
+        self.a1 = Aircraft("A1", None, self.w, State.stop)
+        self.a2 = Aircraft("A2", None, self.s, State.stop)
+        flights = {}
+        now = Clock.START_TIME
+        for aircraft, runway in ((self.a1, runway1), (self.a2, runway2)):
+            flight = DepartureFlight(aircraft.callsign, None, None,
+                                     aircraft.location, now, now)
+            flight.set_runway(runway)
+            flights[aircraft.callsign] = flight
+
+        self.simulation = self.SimulationMock(routing_expert,
+                                              self.ScenarioMock(flights))
+        self.scheduler = get_scheduler()
+
+    def tearDown(self):
+        Config.params.clear()
+        Config.params.update(self.params)
+
+    def __schedule(self, aircrafts):
+        self.simulation.airport.aircrafts_to_schedule = aircrafts
+        schedule, _ = self.scheduler.schedule(self.simulation)
+        self.simulation.airport.completed_aircrafts = {}
+        return schedule
+
+    def test_crossing_routes(self):
+
+        schedule = self.__schedule([self.a1, self.a2])
+        self.assertEqual(schedule.n_unsolvable_conflicts, 0)
+
+        # A1 is planned first, A2 waits until A1 is out of the crossing
+        itinerary1 = schedule.itineraries[self.a1]
+        itinerary2 = schedule.itineraries[self.a2]
+        self.assertEqual(itinerary1.n_scheduler_delay, 0)
+        self.assertGreater(itinerary2.n_scheduler_delay, 0)
+        self.assertEqual(schedule.n_delay_added,
+                         itinerary2.n_scheduler_delay)
+        self.assertEqual([link.name for link in itinerary1.backup],
+                         ["WI1", "I1E"])
+        self.assertEqual([link.name for link in itinerary2.backup],
+                         ["SI1", "I1N"])
+
+        # No resource is reserved by both aircraft at the same time
+        reservations = self.scheduler.reservations
+        for intervals in reservations.intervals.values():
+            for first, second in itertools.combinations(intervals, 2):
+                self.assertTrue(first[1] <= second[0] or
+                                second[1] <= first[0])
+        self.assertEqual(set(reservations.owned),
+                         {self.a1.callsign, self.a2.callsign})
+
+        # A2 holds its start node while it waits
+        self.assertFalse(reservations.is_free(
+            self.s, self.simulation.now,
+            self.simulation.now + itinerary2.n_scheduler_delay * 30))
+
+    def test_max_reservation_wait(self):
+
+        Config.params["scheduler"]["max_reservation_wait"] = 0
+        schedule = self.__schedule([self.a1, self.a2])
+
+        # A2 falls back to its shortest route without any reservation
+        self.assertEqual(schedule.n_unsolvable_conflicts, 1)
+        self.assertEqual(schedule.n_delay_added, 0)
+        self.assertEqual(schedule.itineraries[self.a2].n_scheduler_delay, 0)
+        self.assertEqual(
+            [link.name for link in schedule.itineraries[self.a2].backup],
+            ["SI1", "I1N"])
+        self.assertNotIn(self.a2.callsign, self.scheduler.reservations.owned)
+
+    def test_completed_aircrafts(self):
+
+        self.__schedule([self.a1])
+        self.assertIn(self.a1.callsign, self.scheduler.reservations.owned)
+
+        # The reservations of a completed aircraft are released on the next
+        # schedule, so A2 doesn't wait anymore
+        self.simulation.airport.completed_aircrafts = {self.a1: None}
+        self.__schedule([])
+        self.assertEqual(len(self.scheduler.reservations), 0)
+        self.assertNotIn(self.a1.callsign,
+                         self.scheduler.reservations.owned)
+
+        schedule = self.__schedule([self.a2])
+        self.assertEqual(schedule.n_delay_added, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
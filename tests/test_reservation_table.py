@@ -0,0 +1,62 @@
+#!/usr/bin/env python
+
+from reservation_table import ReservationTable
+
+import sys
+import unittest
+sys.path.append('..')
+
+
+class TestReservationTable(unittest.TestCase):
+
+    def test_is_free(self):
+
+        table = ReservationTable()
+        self.assertTrue(table.is_free("L1", 0, 100))
+
+        table.reserve("L1", 100, 200, "A1")
+        table.reserve("L1", 300, 400, "A2")
+        self.assertEqual(len(table), 2)
+
+        # Intervals are half-open
+        self.assertTrue(table.is_free("L1", 0, 100))
+        self.assertTrue(table.is_free("L1", 200, 300))
+        self.assertFalse(table.is_free("L1", 150, 160))
+        self.assertFalse(table.is_free("L1", 250, 301))
+        self.assertFalse(table.is_free("L1", 0, 500))
+        self.assertTrue(table.is_free("L1", 400, 500))
+        self.assertTrue(table.is_free("L2", 150, 160))
+
+    def test_release_before(self):
+
+        table = ReservationTable()
+        table.reserve("L1", 100, 200, "A1")
+        table.reserve("L1", 300, 400, "A2")
+        table.reserve("L2", 0, 50, "A1")
+
+        table.release_before(200)
+        self.assertEqual(len(table), 1)
+        self.assertTrue(table.is_free("L1", 100, 200))
+        self.assertFalse(table.is_free("L1", 350, 360))
+        self.assertNotIn("L2", table.intervals)
+
+    def test_release(self):
+
+        table = ReservationTable()
+        table.reserve("L1", 100, 200, "A1")
+        table.reserve("N1", 200, 210, "A1")
+        table.reserve("L1", 300, 400, "A2")
+
+        table.release("A1")
+        self.assertEqual(len(table), 1)
+        self.assertTrue(table.is_free("L1", 100, 200))
+        self.assertNotIn("N1", table.intervals)
+
+        # The released intervals are skipped when they expire
+        table.release_before(400)
+        self.assertEqual(len(table), 0)
+        self.assertEqual(table.owned, {})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -91,6 +91,22 @@ class TestRoutingExpert(unittest.TestCase):
         # Checks if the shortest distance is expected
         self.assertAlmostEqual(route.distance, 218489.353890, 6)
 
+    def test_route_built_on_request(self):
+        routing_expert = RoutingExpert(self.links, self.nodes, False)
+
+        route = routing_expert.get_shortest_route(self.G1, self.S1)
+        another_route = routing_expert.get_shortest_route(self.G1, self.S1)
+
+        # Each request gets its own route built from the same links
+        self.assertIsNot(route, another_route)
+        self.assertEqual(route.links, another_route.links)
+
+        # Modifying a route doesn't affect the routing table
+        route.reset_links()
+        self.assertEqual(
+            routing_expert.get_shortest_route(self.G1, self.S1).links[1],
+            self.L1)
+
     def test_simple_data(self):
         airport_code = "simple"
 
@@ -0,0 +1,91 @@
+#!/usr/bin/env python
+
+import logging
+
+from node import Node
+from clock import Clock
+from config import Config
+from scenario import Scenario
+from flight import ArrivalFlight, DepartureFlight
+from sortedcontainers import SortedList
+
+import sys
+import unittest
+sys.path.append('..')
+
+
+class TestScenario(unittest.TestCase):
+
+    SIM_TIME = 30
+
+    gate = Node("G1", {"lat": 47.822000, "lng": -122.079057})
+
+    def setUp(self):
+        self.params = dict(Config.params["simulation"])
+        Config.params["simulation"]["time_unit"] = self.SIM_TIME
+
+    def tearDown(self):
+        Config.params["simulation"].update(self.params)
+
+    def __create_scenario(self, arrival_times, departure_times):
+        arrivals = SortedList(
+            ArrivalFlight("A%d" % i, "A320", "LAX", self.gate,
+                          appear_time + 600, appear_time)
+            for i, appear_time in enumerate(arrival_times))
+        departures = SortedList(
+            DepartureFlight("D%d" % i, "A320", "LAX", self.gate,
+                            appear_time + 600, appear_time)
+            for i, appear_time in enumerate(departure_times))
+        return Scenario(arrivals, departures)
+
+    def test_appearance_table(self):
+
+        start = Clock.START_TIME
+        scenario = self.__create_scenario(
+            [start + 45, start + 30, start - 30],
+            [start, start + 29, start + 95, start + 90])
+
+        # Same flights as the ones appearing within [now, now + sim_time)
+        for tick in range(-2, 5):
+            now = start + tick * self.SIM_TIME
+            for flights, found in [
+                    (scenario.arrivals, scenario.get_arrivals_at(now)),
+                    (scenario.departures, scenario.get_departures_at(now))]:
+                expected = [flight for flight in flights
+                            if now <= flight.appear_time
+                            < now + self.SIM_TIME]
+                self.assertEqual(list(found), expected)
+
+        self.assertEqual(scenario.get_next_appear_time(start), start)
+        self.assertEqual(scenario.get_next_appear_time(start + 30),
+                         start + 30)
+        self.assertEqual(scenario.get_next_appear_time(start + 60),
+                         start + 90)
+        self.assertIsNone(scenario.get_next_appear_time(start + 120))
+
+    def test_lazy_aircraft(self):
+
+        start = Clock.START_TIME
+        scenario = self.__create_scenario([start], [start, start + 30])
+        quiet_logger = logging.getLogger("QUIET_MODE")
+        scenario.set_quiet(quiet_logger)
+
+        flight = scenario.departures[0]
+        self.assertFalse(flight.has_aircraft)
+
+        # The same aircraft is returned until it's released
+        aircraft = flight.aircraft
+        self.assertIs(flight.aircraft, aircraft)
+        self.assertIs(aircraft.logger, quiet_logger)
+        self.assertTrue(aircraft.is_departure)
+        self.assertIs(scenario.get_flight(aircraft), flight)
+
+        flight.release_aircraft()
+        self.assertFalse(flight.has_aircraft)
+        self.assertIs(scenario.get_flight(aircraft), flight)
+        self.assertFalse(scenario.departures[1].has_aircraft)
+        self.assertFalse(scenario.arrivals[0].has_aircraft)
+
+
+if __name__ == '__main__':
+    unittest.main()
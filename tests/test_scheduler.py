@@ -2,7 +2,6 @@
 import logging
 from clock import Clock
 from copy import deepcopy
-from datetime import time
 from aircraft import Aircraft, State
 from flight import DepartureFlight
 from node import Node
@@ -10,6 +9,7 @@ from surface import RunwayNode, Spot
 from config import Config
 from simulation import get_scheduler
 from conflict import Conflict
+from link import Link, HoldLink
 
 import sys
 import unittest
@@ -50,6 +50,11 @@ class TestScheduler(unittest.TestCase):
             self.aircraft1 = aircraft1
             self.aircraft2 = aircraft2
 
+        @property
+        def aircrafts_to_schedule(self):
+            return [aircraft for aircraft in self.aircrafts
+                    if aircraft.itinerary is None]
+
         def apply_schedule(self, schedule):
             for aircraft, itinerary in schedule.itineraries.items():
                 if aircraft == self.aircraft1:
@@ -103,27 +108,27 @@ class TestScheduler(unittest.TestCase):
             if aircraft.callsign == "A1":
                 return DepartureFlight(
                     "A1", None, None, self.g1, self.s1, self.runway,
-                    time(2, 36), time(2, 36)
+                    (2 * 60 + 36) * 60, (2 * 60 + 36) * 60
                 )
             elif aircraft.callsign == "A2":
                 return DepartureFlight(
                     "A2", None, None, self.g2, self.s1, self.runway,
-                    time(2, 36, 30), time(2, 36, 30)
+                    (2 * 60 + 36) * 60 + 30, (2 * 60 + 36) * 60 + 30
                 )
             elif aircraft.callsign == "A3":
                 return DepartureFlight(
                     "A3", None, None, self.g2, self.s1, self.runway,
-                    time(2, 36, 1), time(2, 36, 1)
+                    (2 * 60 + 36) * 60 + 1, (2 * 60 + 36) * 60 + 1
                 )
             elif aircraft.callsign == "A4":
                 return DepartureFlight(
                     "A4", None, None, self.g2, self.s1, self.runway,
-                    time(2, 36, 1), time(2, 36, 1)
+                    (2 * 60 + 36) * 60 + 1, (2 * 60 + 36) * 60 + 1
                 )
             elif aircraft.callsign == "A5":
                 return DepartureFlight(
                     "A5", None, None, self.g2, self.s1, self.runway,
-                    time(2, 36, 2), time(2, 36, 2)
+                    (2 * 60 + 36) * 60 + 2, (2 * 60 + 36) * 60 + 2
                 )
 
     class RouteMock():
@@ -162,7 +167,7 @@ class TestScheduler(unittest.TestCase):
             self.routing_expert = TestScheduler.RoutingExpertMock(
                 g1, g2, s1, runway_start)
             self.clock = Clock()
-            self.clock.now = time(2, 30)
+            self.clock.now = (2 * 60 + 30) * 60
 
         def set_quiet(self, logger):
             self.airport.set_quiet(logger)
@@ -249,3 +254,269 @@ class TestScheduler(unittest.TestCase):
         self.assertEqual(iti2.targets[0], self.s1)
         self.assertEqual(iti2.targets[1], self.s1)
         self.assertEqual(iti2.targets[2], self.runway_start)
+
+
+class TestConflictResolution(unittest.TestCase):
+    """Resolves the conflicts of crossing routes with both modes of the
+    deterministic scheduler, predicting from the first tick after each delay
+    or from the tick the delay takes effect at.
+    """
+
+    #            (N)
+    #             |
+    #  (W1)-(W2)-(I1)-(E)
+    #             |
+    #            (S)
+    #
+    # A1 goes from W1 to E, A2 from S to N and A3, appearing a tick after A1,
+    # from W2 to E
+
+    i1 = Node("I1", {"lat": 47.822000, "lng": -122.079057})
+    w1 = Node("W1", {"lat": 47.822000, "lng": -122.081057})
+    w2 = Node("W2", {"lat": 47.822000, "lng": -122.080057})
+    e = Node("E", {"lat": 47.822000, "lng": -122.077057})
+    s = Node("S", {"lat": 47.821000, "lng": -122.079057})
+    n = Node("N", {"lat": 47.823000, "lng": -122.079057})
+
+    class AircraftMock(Aircraft):
+        """Only the aircraft delayed by the scheduler are predicted to be
+        delayed.
+        """
+
+        @property
+        def is_predict_delayed(self):
+            targets = self.itinerary.targets if self.itinerary else []
+            return len(targets) > 1 and type(targets[1]) is HoldLink
+
+    class RouteMock():
+
+        def __init__(self, links):
+            self.links = links
+
+    class RoutingExpertMock():
+
+        def __init__(self, routes):
+            self.routes = routes
+
+        def get_shortest_route(self, src, dst):
+            return TestConflictResolution.RouteMock(self.routes[(src, dst)])
+
+    class ScenarioMock():
+
+        def __init__(self, flights):
+            self.flights = flights
+
+        def get_flight(self, aircraft):
+            return self.flights[aircraft.callsign]
+
+    class AirportMock():
+
+        def __init__(self, arrivals):
+            # arrivals[time] = [(aircraft, location)]
+            self.arrivals = arrivals
+            self.aircrafts = []
+            self.itinerary_cache = {}
+            self.priority = None
+
+        @property
+        def aircrafts_to_schedule(self):
+            return [aircraft for aircraft in self.aircrafts
+                    if aircraft.itinerary is None]
+
+        def add_aircrafts(self, now):
+            for aircraft, location in self.arrivals.get(now, []):
+                aircraft.set_location(location, Aircraft.LOCATION_LEVEL_COARSE)
+                aircraft.set_itinerary(self.itinerary_cache.pop(aircraft,
+                                                                None))
+                self.aircrafts.append(aircraft)
+
+        def apply_schedule(self, schedule):
+            for aircraft, itinerary in schedule.itineraries.items():
+                if aircraft in self.aircrafts:
+                    aircraft.set_itinerary(itinerary)
+                else:
+                    self.itinerary_cache[aircraft] = itinerary
+
+        def apply_priority(self, priority):
+            self.priority = priority
+
+        def set_quiet(self, logger):
+            for aircrafts in self.arrivals.values():
+                for aircraft, _ in aircrafts:
+                    aircraft.set_quiet(logger)
+
+        @property
+        def next_conflicts(self):
+            threshold = Config.params["scheduler"]["conflict_threshold"]
+            locations = [aircraft.get_next_location(
+                Aircraft.LOCATION_LEVEL_PRECISE)
+                for aircraft in self.aircrafts]
+            conflicts = []
+            for i, first in enumerate(self.aircrafts):
+                for j in range(i + 1, len(self.aircrafts)):
+                    if locations[i].is_within(locations[j], threshold):
+                        conflicts.append(Conflict(
+                            (locations[i], locations[j]),
+                            [first, self.aircrafts[j]]))
+            return conflicts
+
+        def tick(self):
+            for aircraft in self.aircrafts:
+                aircraft.tick()
+
+        def remove_aircrafts(self):
+            self.aircrafts = [aircraft for aircraft in self.aircrafts
+                              if not aircraft.itinerary.is_completed]
+
+        def snapshot(self):
+            return (list(self.aircrafts), dict(self.itinerary_cache),
+                    {aircraft: aircraft.snapshot()
+                     for aircraft in self.aircrafts})
+
+        def restore(self, snapshot):
+            aircrafts, itinerary_cache, aircraft_snapshots = snapshot
+            self.aircrafts = list(aircrafts)
+            self.itinerary_cache = dict(itinerary_cache)
+            for aircraft in self.aircrafts:
+                aircraft.restore(aircraft_snapshots[aircraft])
+
+    class PredictionMock():
+
+        def __init__(self, simulation):
+            self.airport = deepcopy(simulation.airport)
+            self.airport.set_quiet(logging.getLogger("QUIET_MODE"))
+            self.clock = deepcopy(simulation.clock)
+            self.start_time = self.clock.now
+
+        def snapshot(self):
+            return self.now, self.airport.snapshot()
+
+        def restore(self, snapshot):
+            self.clock.now, airport_snapshot = snapshot
+            self.airport.restore(airport_snapshot)
+
+        def pre_tick(self, scheduler):
+            if self.now != self.start_time:
+                self.airport.add_aircrafts(self.now)
+
+        def tick(self):
+            self.airport.tick()
+            self.clock.tick()
+
+        def post_tick(self):
+            self.airport.remove_aircrafts()
+
+        @property
+        def now(self):
+            return self.clock.now
+
+    class SimulationMock():
+
+        def __init__(self, airport, scenario, routing_expert, now):
+            self.airport = airport
+            self.scenario = scenario
+            self.routing_expert = routing_expert
+            self.clock = Clock()
+            self.clock.now = now
+
+        @property
+        def now(self):
+            return self.clock.now
+
+        @property
+        def copy(self):
+            return TestConflictResolution.PredictionMock(self)
+
+    def setUp(self):
+        self.params = deepcopy(Config.params)
+        Config.params["simulator"]["test_mode"] = True
+        Config.params["scheduler"]["name"] = "deterministic_scheduler"
+        Config.params["scheduler"]["resolve_conflicts"] = True
+        Config.params["simulation"]["reschedule_cycle"] = 300
+
+    def tearDown(self):
+        Config.params.clear()
+        Config.params.update(self.params)
+
+    def __get_simulation(self):
+        w1_i1, w2_i1 = Link("W1I1", [self.w1, self.i1]), \
+            Link("W2I1", [self.w2, self.i1])
+        i1_e, s_i1 = Link("I1E", [self.i1, self.e]), \
+            Link("SI1", [self.s, self.i1])
+        i1_n, n_i1 = Link("I1N", [self.i1, self.n]), \
+            Link("NI1", [self.n, self.i1])
+        i1_s = Link("I1S", [self.i1, self.s])
+        routes = {(self.w1, self.e): [w1_i1, i1_e],
+                  (self.w2, self.e): [w2_i1, i1_e],
+                  (self.s, self.n): [s_i1, i1_n],
+                  (self.n, self.s): [n_i1, i1_s]}
+
+        now = Clock.START_TIME
+        runway_e, runway_n, runway_s = TestScheduler.RunwayMock(self.e), \
+            TestScheduler.RunwayMock(self.n), TestScheduler.RunwayMock(self.s)
+        flights = {}
+        arrivals = {}
+        for callsign, src, runway, time in (("A1", self.w1, runway_e, now),
+                                            ("A2", self.s, runway_n, now),
+                                            ("A3", self.w2, runway_e,
+                                             now + 30),
+                                            ("A4", self.n, runway_s,
+                                             now + 60)):
+            flight = DepartureFlight(callsign, "M1", None, src, time, time)
+            flight.set_runway(runway)
+            flights[flight.callsign] = flight
+            aircraft = self.AircraftMock(callsign, "M1", None, True)
+            arrivals.setdefault(time, []).append((aircraft, src))
+
+        airport = self.AirportMock(arrivals)
+        airport.add_aircrafts(now)
+        return self.SimulationMock(airport, self.ScenarioMock(flights),
+                                   self.RoutingExpertMock(routes), now)
+
+    def __schedule(self, incremental):
+        Config.params["scheduler"]["incremental_resolution"] = incremental
+        simulation = self.__get_simulation()
+        schedule, _ = get_scheduler().schedule(simulation)
+        itineraries = {aircraft.callsign: [type(target).__name__
+                                           if type(target) is HoldLink
+                                           else target.name
+                                           for target in itinerary.targets]
+                       for aircraft, itinerary
+                       in schedule.itineraries.items()}
+        return schedule.n_delay_added, schedule.n_unsolvable_conflicts, \
+            itineraries
+
+    def test_resolve_conflicts(self):
+        n_delay_added, n_unsolvable, itineraries = self.__schedule(False)
+        self.assertEqual(n_delay_added, 2)
+        self.assertEqual(n_unsolvable, 0)
+        self.assertEqual(itineraries["N 1A1"][:3],
+                         ["HoldLink", "HoldLink", "W1I1"])
+
+        self.assertEqual(self.__schedule(True),
+                         (n_delay_added, n_unsolvable, itineraries))
+
+    def test_resolve_conflicts_with_deadlock(self):
+        # Gives up a conflict once a delay is added for it
+        Config.params["scheduler"]["max_resolve_conflict_attempt"] = 1
+
+        n_delay_added, n_unsolvable, itineraries = self.__schedule(False)
+        self.assertEqual(n_unsolvable, 2)
+        # The delay added before giving up is kept
+        self.assertEqual(itineraries["N 4A4"][:3],
+                         ["HoldLink", "HoldLink", "NI1"])
+
+        self.assertEqual(self.__schedule(True),
+                         (n_delay_added, n_unsolvable, itineraries))
+
+    def test_resolve_conflicts_before_end_time(self):
+        # The end of the day comes before the end of the reschedule cycle,
+        # A4 appears on the last tick
+        Config.params["simulation"]["end_time"] = "7:01"
+
+        n_delay_added, n_unsolvable, itineraries = self.__schedule(False)
+        self.assertEqual(n_unsolvable, 0)
+        self.assertEqual(set(itineraries), {"N 1A1", "N 2A2", "N 3A3", "N 4A4"})
+
+        self.assertEqual(self.__schedule(True),
+                         (n_delay_added, n_unsolvable, itineraries))
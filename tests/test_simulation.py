@@ -1,9 +1,15 @@
 #!/usr/bin/env python
 
-from datetime import time
+import os
+import json
+import shutil
+import tempfile
+from copy import deepcopy
 from config import Config
 from simulation import Simulation
-from clock import ClockException
+from projection import set_active_projection
+from distance_matrix import set_active_distance_matrix
+from clock import Clock, ClockException
 from heapdict import heapdict
 from schedule import Schedule
 
@@ -28,7 +34,7 @@ class TestSimulation(unittest.TestCase):
         simulation = Simulation()
 
         self.assertEqual(len(simulation.airport.aircrafts), 0)
-        self.assertEqual(simulation.now, time(0, 0))
+        self.assertEqual(simulation.now, Clock.START_TIME)
 
     def test_add_aircrafts(self):
 
@@ -149,3 +155,129 @@ class TestSimulation(unittest.TestCase):
         self.assertEqual(len(simulation.airport.gate_queue[f1.from_gate]), 1)
         self.assertTrue(f2.aircraft in
                         simulation.airport.gate_queue[f1.from_gate])
+
+
+class TestEventDriven(unittest.TestCase):
+    """Runs a small airport in the fixed-step and event-driven modes. The
+    surface is written into a temporary data directory.
+    """
+
+    #  (55)--P55--(S2)--T1--(I3)--T2--(R1)--10R/28L--(R2)
+    #
+    # I3 is the terminal spot of gate 55; F1 and F2 depart from it half an
+    # hour apart, so the airport is empty in between
+
+    lng = -122.380449
+    gate = {"name": "55", "lat": 37.6174, "lng": lng}
+    spot = {"name": "S2", "lat": 37.6164, "lng": lng}
+    i3 = {"name": "I3", "lat": 37.615431, "lng": lng}
+    r1 = {"lat": 37.6134, "lng": lng}
+    r2 = {"lat": 37.6134, "lng": lng + 0.01}
+
+    def setUp(self):
+        self.params = deepcopy(Config.params)
+        self.data_root_dir_path = Config.DATA_ROOT_DIR_PATH
+        self.tmp_dir = tempfile.mkdtemp()
+
+        Config.params["airport"] = "test"
+        Config.params["simulator"]["test_mode"] = True
+        Config.params["uncertainty"]["enabled"] = False
+        Config.params["simulation"]["cache"] = False
+        Config.params["simulation"]["end_time"] = "8:00"
+        Config.params["scheduler"]["name"] = "deterministic_scheduler"
+        Config.params["scheduler"]["departure_runway"] = ["10R/28L"]
+        Config.DATA_ROOT_DIR_PATH = os.path.join(self.tmp_dir, "%s",
+                                                 "build") + "/"
+        self.__write_airport()
+
+    def tearDown(self):
+        Config.params.clear()
+        Config.params.update(self.params)
+        Config.DATA_ROOT_DIR_PATH = self.data_root_dir_path
+        set_active_projection(None)
+        set_active_distance_matrix(None)
+        shutil.rmtree(self.tmp_dir)
+
+    def __write_airport(self):
+
+        def get_nodes(*nodes):
+            return [[node["lng"], node["lat"]] for node in nodes]
+
+        departures = [{"callsign": callsign, "model": "A319",
+                       "airport": "SJC", "gate": "55", "time": time,
+                       "appear_time": time}
+                      for callsign, time in (("F1", "0700"), ("F2", "0730"))]
+        files = {
+            "airport-metadata": {
+                "center": {"lat": 37.6154, "lng": self.lng}, "corners": []
+            },
+            "gates": [self.gate],
+            "spots": [self.spot],
+            "gates_spots": {"S2": ["55"]},
+            "debug": [self.i3],
+            "inters": [],
+            "pushback_ways": [
+                {"name": "P55", "nodes": get_nodes(self.gate, self.spot)}
+            ],
+            "taxiways": [
+                {"name": "T1", "nodes": get_nodes(self.spot, self.i3)},
+                {"name": "T2", "nodes": get_nodes(self.i3, self.r1)}
+            ],
+            "runways": [
+                {"name": "10R/28L", "nodes": get_nodes(self.r1, self.r2)}
+            ],
+            "scenario": {"arrivals": [], "departures": departures}
+        }
+
+        dir_path = Config.DATA_ROOT_DIR_PATH % "test"
+        os.makedirs(dir_path)
+        for name, content in files.items():
+            with open(dir_path + name + ".json", "w") as fout:
+                json.dump(content, fout)
+        open(dir_path + "airport.jpg", "w").close()
+
+    @classmethod
+    def __run(cls, event_driven):
+        """Runs the simulation until the end of the day and returns the
+        states of the aircraft and the number of take-offs after each tick.
+        """
+        Config.params["simulation"]["event_driven"] = event_driven
+        simulation = Simulation()
+        states = {}
+        while True:
+            try:
+                simulation.tick()
+            except ClockException:
+                break
+            states[simulation.now] = (
+                sorted((aircraft.callsign, aircraft.state,
+                        str(aircraft.precise_location), aircraft.speed)
+                       for aircraft in simulation.airport.aircrafts),
+                simulation.airport.takeoff_count
+            )
+        return states
+
+    def test_event_driven(self):
+
+        fixed_states = self.__run(False)
+        event_states = self.__run(True)
+
+        # Both flights took off in both modes
+        self.assertEqual(fixed_states[max(fixed_states)][1], 2)
+        self.assertEqual(event_states[max(event_states)][1], 2)
+
+        # The ticks run in both modes end in the same states
+        self.assertTrue(set(event_states) < set(fixed_states))
+        for now, state in event_states.items():
+            self.assertEqual(state, fixed_states[now])
+
+        # Only the idle ticks are skipped: nothing is on the airport and
+        # nothing takes off
+        skipped = sorted(set(fixed_states) - set(event_states))
+        self.assertGreater(len(skipped), len(event_states))
+        for now in skipped:
+            aircrafts, takeoff_count = fixed_states[now]
+            self.assertEqual(aircrafts, [])
+            previous = now - Config.params["simulation"]["time_unit"]
+            if previous in fixed_states:
+                self.assertEqual(takeoff_count, fixed_states[previous][1])
@@ -0,0 +1,46 @@
+#!/usr/bin/env python
+
+from node import Node
+from link import Link
+from spatial_index import SpatialIndex
+
+import sys
+import unittest
+sys.path.append('..')
+
+
+class TestSpatialIndex(unittest.TestCase):
+
+    # n2, n3 and n4 are about 20, 360 and 90 feet away from n1
+    n1 = Node("N1", {"lat": 37.615223, "lng": -122.389977})
+    n2 = Node("N2", {"lat": 37.615278, "lng": -122.389977})
+    n3 = Node("N3", {"lat": 37.616223, "lng": -122.389977})
+    n4 = Node("N4", {"lat": 37.615223, "lng": -122.390277})
+    nodes = [n1, n2, n3, n4]
+
+    def test_query(self):
+        index = SpatialIndex.from_nodes(self.nodes, 30)
+        self.assertEqual(len(index), 4)
+        self.assertEqual(index.query(self.n1, 30), [self.n1, self.n2])
+        self.assertEqual(index.query(self.n3, 30), [self.n3])
+
+    def test_query_matches_brute_force(self):
+        index = SpatialIndex.from_nodes(self.nodes, 10)
+        for radius in [5, 30, 100, 500]:
+            for node in self.nodes:
+                expected = [n for n in self.nodes
+                            if node.get_distance_to(n) < radius]
+                found = index.query(node, radius)
+                for close_node in expected:
+                    self.assertIn(close_node, found)
+
+    def test_link_ends(self):
+        l1 = Link("L1", [self.n1, self.n3])
+        l2 = Link("L2", [self.n3, self.n4])
+        index = SpatialIndex.from_link_ends([l1, l2], 30)
+        self.assertEqual(sorted(set(index.query(self.n2, 30))), [0])
+        self.assertEqual(sorted(set(index.query(self.n3, 30))), [0, 1])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2,8 +2,6 @@
 
 from node import Node
 from aircraft import Aircraft, State
-from itinerary import Itinerary
-from copy import deepcopy
 from config import Config
 
 import sys